@@ -0,0 +1,103 @@
+# app/api/admin_routes.py
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.models.schemas import CacheInvalidateRequest
+from app.services.ai_service import ai_service
+from app.services.content_service import content_service
+from app.services.session_tracker import session_tracker
+from app.services.write_behind import write_behind_queue
+from app.utils.database import db_manager
+from app.utils.startup import startup_report
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.get('/db/pool')
+async def get_pool_stats():
+    """Database connection pool statistics"""
+    return db_manager.pool_stats()
+
+
+@router.get('/cache')
+async def get_cache_stats():
+    """Response cache statistics"""
+    # Shared cache backends query their store for the size
+    return await run_in_threadpool(content_service.stats)
+
+
+@router.post('/cache/invalidate')
+async def invalidate_cache(req: CacheInvalidateRequest):
+    """Invalidate cached content for an action payload, an action, or everything"""
+    if req.action is None:
+        return await content_service.invalidate()
+    if req.action not in content_service.stores:
+        raise HTTPException(status_code=400, detail=f"Unknown action: {req.action}")
+
+    payload = {"action": req.action}
+    for field in ("module", "duration", "topic"):
+        value = getattr(req, field)
+        if value is not None:
+            payload[field] = value
+    try:
+        return await content_service.invalidate(payload, include_durable=req.include_durable)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Missing field for {req.action}: {e}")
+
+
+@router.get('/topics/similar')
+async def find_similar_topics(topic: str, kind: str = "lesson_content", limit: int = Query(5, ge=1, le=50)):
+    """Stored topics most similar to ``topic``, with scores, for tuning TOPIC_SIMILARITY_THRESHOLD"""
+    index = content_service.topic_indexes.get(kind)
+    if index is None:
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {kind}")
+    return {
+        "threshold": settings.topic_similarity_threshold,
+        "matches": [match._asdict() for match in index.search(topic, limit=limit)],
+    }
+
+
+@router.post('/topics/reindex')
+async def reindex_topics():
+    """Rebuild the topic similarity indexes from the content store"""
+    return await content_service.load_topic_index()
+
+
+@router.get('/coalescing')
+async def get_coalescing_stats():
+    """How many concurrent identical generations were coalesced"""
+    return {
+        "content": content_service.inflight.stats(),
+        "streams": content_service.streams.stats(),
+        "ai": ai_service.inflight.stats(),
+    }
+
+
+@router.get('/prompts/tokens')
+async def get_prompt_token_report(exact: bool = False):
+    """Per-action prompt size and token usage"""
+    return await run_in_threadpool(ai_service.prompt_token_report, exact)
+
+
+@router.get('/write-behind')
+async def get_write_behind_stats():
+    """Write-behind queue depth and flush latency"""
+    return write_behind_queue.stats()
+
+
+@router.get('/sessions')
+async def get_session_tracker_stats():
+    """Heartbeat aggregation and session flush statistics"""
+    return session_tracker.stats()
+
+
+@router.get('/resilience')
+async def get_resilience_stats():
+    """Gemini concurrency slots and circuit breaker state"""
+    return ai_service.guard.stats()
+
+
+@router.get('/startup')
+async def get_startup_report():
+    """Boot time by phase, plus lazily initialized components"""
+    return startup_report.summary()
@@ -0,0 +1,39 @@
+# app/api/analytics_routes.py
+from typing import Optional
+from fastapi import APIRouter, Query
+from app.core.config import settings
+from app.models.schemas import (
+    ModuleAnalyticsResponse, DayAnalyticsResponse,
+    LearnerAnalyticsResponse, UserAnalyticsResponse
+)
+from app.services.analytics_service import analytics_service
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+@router.get('/modules', response_model=ModuleAnalyticsResponse)
+async def get_module_analytics():
+    """Completion rate, average quiz score and time spent per module"""
+    return await analytics_service.get_modules_async()
+
+
+@router.get('/days', response_model=DayAnalyticsResponse)
+async def get_day_analytics(module: str, week: Optional[int] = None):
+    """Completion rate, average quiz score and time spent per week/day of a module"""
+    return await analytics_service.get_module_days_async(module, week)
+
+
+@router.get('/learners', response_model=LearnerAnalyticsResponse)
+async def get_learner_analytics(
+    module: str,
+    limit: int = Query(100, ge=1, le=settings.progress_page_max),
+    after: Optional[int] = None
+):
+    """Per learner figures for a module; pass ``next_after`` as ``after`` for the next page"""
+    return await analytics_service.get_module_learners_async(module, limit, after)
+
+
+@router.get('/users/{user_id}', response_model=UserAnalyticsResponse)
+async def get_user_analytics(user_id: str):
+    """Per module figures for one learner"""
+    return await analytics_service.get_user_async(user_id)
@@ -1,11 +1,14 @@
 # app/api/assessment_routes.py
 from fastapi import APIRouter
 from app.models.schemas import (
-    AssessmentRequest, TradeEvalRequest, ProgressRequest,
-    Assessment, TradeEvaluation, ProgressDecision
+    AssessmentRequest, TradeEvalRequest, TradeBatchRequest, ProgressRequest, BatchProgressRequest,
+    Assessment, TradeEvaluation, TradeBatchResponse, ProgressDecision, BatchProgressResponse
 )
 from app.services.ai_service import ai_service
-from app.services.progress_service import progress_service
+from app.services.content_service import content_service
+from app.services.decision_service import decision_engine
+from app.services.trade_service import trade_evaluator
+from app.utils.serialization import RawJSONResponse
 
 router = APIRouter(prefix="/api", tags=["assessments"])
 
@@ -14,12 +17,8 @@ router = APIRouter(prefix="/api", tags=["assessments"])
 async def generate_assessment(req: AssessmentRequest):
     """Generate assessment for a module"""
     payload = {"action": "assessment", "module": req.module}
-    result = ai_service.call_gemini_ai(payload)
-    
-    # Save to database
-    progress_service.save_assessment(req.module, result)
-    
-    return result
+    body, _ = await content_service.fetch_body(payload, force=req.force_regenerate)
+    return RawJSONResponse(body)
 
 
 @router.post('/evaluate_trade', response_model=TradeEvaluation)
@@ -35,15 +34,36 @@ async def evaluate_trade(req: TradeEvalRequest):
             "reason": req.reason
         }
     }
-    return ai_service.call_gemini_ai(payload)
+    return await ai_service.call_gemini_ai_async(payload)
+
+
+@router.post('/evaluate_trades', response_model=TradeBatchResponse)
+async def evaluate_trades(req: TradeBatchRequest):
+    """Evaluate a batch of trade decisions"""
+    return {"evaluations": await trade_evaluator.evaluate_batch(req.user_id, req.trades)}
 
 
 @router.post('/progress_decision', response_model=ProgressDecision)
 async def progress_decision(req: ProgressRequest):
     """Make a progress decision for a student"""
-    payload = {"action": "progress_decision", "performance": {
-        "lesson_scores": req.lesson_scores,
-        "assessment_score": req.assessment_score,
-        "trade_score": req.trade_score
-    }}
-    return ai_service.call_gemini_ai(payload)
+    result = decision_engine.decide(req.lesson_scores, req.assessment_score, req.trade_score)
+    if req.explain:
+        result["reason"] = await decision_engine.explain(result, {
+            "lesson_scores": req.lesson_scores,
+            "assessment_score": req.assessment_score,
+            "trade_score": req.trade_score
+        })
+    return result
+
+
+@router.post('/progress_decisions', response_model=BatchProgressResponse)
+async def progress_decisions(req: BatchProgressRequest):
+    """Make progress decisions for a whole cohort in one call"""
+    results = decision_engine.decide_batch(
+        [s.lesson_scores for s in req.students],
+        [s.assessment_score for s in req.students],
+        [s.trade_score for s in req.students]
+    )
+    for student, result in zip(req.students, results):
+        result["student_id"] = student.student_id
+    return {"decisions": results}
@@ -0,0 +1,135 @@
+# app/api/bundle_routes.py
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Set, Tuple
+from fastapi import APIRouter, HTTPException, Request, Response
+from app.services.bundle_service import INDEX_FILE, BundleFile, bundle_service
+
+router = APIRouter(prefix="/api/bundles", tags=["bundles"])
+
+# Exported bundle files are named <name>.<content hash>.json and never change
+IMMUTABLE_FILE = re.compile(r"\.[0-9a-f]{16}\.json(\.gz|\.br)?$")
+MEDIA_TYPES = {".json": "application/json", ".gz": "application/gzip", ".br": "application/octet-stream"}
+
+
+def accepted_encodings(header: str) -> Set[str]:
+    """Codings from Accept-Encoding, without those refused with q=0"""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = params.strip()
+        try:
+            refused = q.startswith("q=") and float(q[2:]) == 0
+        except ValueError:
+            refused = False
+        if coding and not refused:
+            accepted.add(coding)
+    return accepted
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single ``bytes=`` range, or None to send the whole file.
+
+    Malformed and multi-range headers are ignored. Raises ValueError if the
+    range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    if unit.strip().lower() != "bytes" or not dash or not (first or last):
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:
+        if int(last) == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _not_modified(request: Request, found: BundleFile) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or found.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(found.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _serve(request: Request, path: str) -> Response:
+    """Send a bundle file as stored, honoring Accept-Encoding, conditional and Range headers"""
+    found, vary = None, False
+    if path.endswith(".json"):
+        vary = True
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding in ("br", "gzip"):
+            if encoding in accepted:
+                found = bundle_service.read(path, encoding)
+                if found is not None:
+                    break
+    if found is None:
+        found = bundle_service.read(path)
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"Bundle file not found: {path}")
+
+    last_modified = formatdate(found.last_modified, usegmt=True)
+    headers = {
+        "ETag": found.etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=31536000, immutable" if IMMUTABLE_FILE.search(path) else "public, no-cache",
+    }
+    if vary:
+        headers["Vary"] = "Accept-Encoding"
+    if found.encoding is not None:
+        headers["Content-Encoding"] = found.encoding
+    media_type = MEDIA_TYPES.get(path[path.rfind("."):], "application/octet-stream")
+
+    if _not_modified(request, found):
+        return Response(status_code=304, headers=headers)
+
+    data, status = found.data, 200
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() in (found.etag, last_modified)):
+        try:
+            span = parse_range(range_header, len(data))
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{len(data)}"
+            return Response(status_code=416, headers=headers)
+        if span is not None:
+            start, end = span
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            data, status = data[start:end + 1], 206
+
+    if request.method == "HEAD":
+        headers["Content-Length"] = str(len(data))
+        return Response(status_code=status, headers=headers, media_type=media_type)
+    return Response(content=data, status_code=status, headers=headers, media_type=media_type)
+
+
+@router.api_route('', methods=["GET", "HEAD"])
+async def get_bundle_index(request: Request):
+    """Exported plans and the path of each plan's manifest"""
+    return _serve(request, INDEX_FILE)
+
+
+@router.api_route('/{path:path}', methods=["GET", "HEAD"])
+async def get_bundle_file(path: str, request: Request):
+    """A plan manifest (``<slug>/manifest.json``) or bundle file, sent byte-for-byte as exported.
+
+    ``.json`` files are sent brotli- or gzip-encoded when the client
+    accepts it. Supports ``If-None-Match``/``If-Modified-Since`` (304) and
+    single ``Range`` requests (206), including ``If-Range``.
+    """
+    return _serve(request, path)
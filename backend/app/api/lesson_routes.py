@@ -1,11 +1,12 @@
 # app/api/lesson_routes.py
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from app.models.schemas import (
     PlanRequest, LessonRequest, ChartTaskRequest, 
     LessonPlan, LessonContent, ChartTasks
 )
-from app.services.ai_service import ai_service
-from app.services.progress_service import progress_service
+from app.services.content_service import content_service
+from app.utils.serialization import RawJSONResponse, dumps_text
 
 router = APIRouter(prefix="/api/generate", tags=["lessons"])
 
@@ -14,33 +15,40 @@ router = APIRouter(prefix="/api/generate", tags=["lessons"])
 async def generate_plan(req: PlanRequest):
     """Generate a learning plan for a module"""
     payload = {"action": "generate_plan", "module": req.module, "duration": req.duration}
-    result = ai_service.call_gemini_ai(payload)
-    
-    # Save to database
-    progress_service.save_lesson_plan(req.module, req.duration, result)
-    
-    return result
+    body, _ = await content_service.fetch_body(payload, force=req.force_regenerate)
+    return RawJSONResponse(body)
 
 
 @router.post('/lesson-content', response_model=LessonContent)
 async def generate_lesson(req: LessonRequest):
     """Generate lesson content for a topic"""
     payload = {"action": "generate_lesson", "topic": req.topic}
-    result = ai_service.call_gemini_ai(payload)
-    
-    # Save to database
-    progress_service.save_lesson_content(req.topic, result)
-    
-    return result
+    body, _ = await content_service.fetch_body(payload, force=req.force_regenerate)
+    return RawJSONResponse(body)
+
+
+@router.post('/lesson-content/stream')
+async def stream_lesson(req: LessonRequest):
+    """Stream lesson content for a topic as Server-Sent Events.
+
+    Emits one ``step`` event per lesson step as soon as it is ready and a
+    final ``done`` event carrying the full lesson. A ``reset`` event means
+    the steps received so far are discarded and the lesson starts over.
+    """
+    async def events():
+        async for event, data in content_service.stream_lesson(req.topic, force=req.force_regenerate):
+            yield f"event: {event}\ndata: {dumps_text(data)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post('/chart-instructions', response_model=ChartTasks)
 async def generate_chart_tasks(req: ChartTaskRequest):
     """Generate chart tasks for a topic"""
     payload = {"action": "chart_tasks", "topic": req.topic}
-    result = ai_service.call_gemini_ai(payload)
-    
-    # Save to database
-    progress_service.save_chart_tasks(req.topic, result)
-    
-    return result
+    body, _ = await content_service.fetch_body(payload, force=req.force_regenerate)
+    return RawJSONResponse(body)
@@ -1,7 +1,10 @@
 # app/api/progress_routes.py
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from app.core.config import settings
 from app.models.schemas import (
-    UserProgressRequest, SuccessResponse, UserProgressResponse
+    UserProgressRequest, SuccessResponse, UserProgressResponse,
+    UserProgressBatchRequest, UserProgressBatchResponse
 )
 from app.services.progress_service import progress_service
 
@@ -11,10 +14,44 @@ router = APIRouter(prefix="/api", tags=["progress"])
 @router.post('/user_progress', response_model=SuccessResponse)
 async def update_user_progress(progress: UserProgressRequest):
     """Update user progress in the database"""
-    return progress_service.update_user_progress(progress)
+    return await progress_service.update_user_progress_async(progress)
+
+
+@router.post('/user_progress/batch', response_model=UserProgressBatchResponse)
+async def update_user_progress_batch(req: UserProgressBatchRequest):
+    """Upsert many progress records (e.g. an offline client's queue) in one transaction"""
+    if len(req.records) > settings.progress_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.progress_batch_max} records per batch"
+        )
+    return await progress_service.update_user_progress_batch_async(req.records)
 
 
 @router.get('/user_progress/{user_id}', response_model=UserProgressResponse)
-async def get_user_progress(user_id: str):
-    """Get user progress from the database"""
-    return progress_service.get_user_progress(user_id)
+async def get_user_progress(
+    user_id: str,
+    request: Request,
+    response: Response,
+    module: Optional[str] = None,
+    week: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.progress_page_max),
+    cursor: Optional[str] = None
+):
+    """Get user progress from the database.
+
+    Supports module/week filters and keyset pagination (``limit`` plus the
+    returned ``next_cursor``). Responses carry an ETag; a matching
+    ``If-None-Match`` gets a 304.
+    """
+    try:
+        body, etag = await progress_service.get_user_progress_async(user_id, module, week, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return body
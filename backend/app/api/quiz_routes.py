@@ -0,0 +1,22 @@
+# app/api/quiz_routes.py
+from fastapi import APIRouter, HTTPException
+from app.core.config import settings
+from app.models.schemas import QuizSubmitRequest, QuizSubmitResponse
+from app.services.quiz_service import quiz_service
+
+router = APIRouter(prefix="/api/quiz", tags=["quiz"])
+
+
+@router.post('/submit', response_model=QuizSubmitResponse)
+async def submit_quiz(req: QuizSubmitRequest):
+    """Grade answer sheets against a stored assessment and record the responses.
+
+    ``assessment_id`` pins a specific assessment version; without it the
+    module's latest assessment is used.
+    """
+    if len(req.sheets) > settings.quiz_max_sheets:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.quiz_max_sheets} sheets per submission"
+        )
+    return await quiz_service.submit_async(req.module, req.sheets, req.assessment_id)
@@ -0,0 +1,14 @@
+# app/api/session_routes.py
+from fastapi import APIRouter, HTTPException
+from app.models.schemas import HeartbeatRequest, SuccessResponse
+from app.services.session_tracker import session_tracker
+
+router = APIRouter(prefix="/api/sessions", tags=["sessions"])
+
+
+@router.post('/heartbeat', response_model=SuccessResponse, status_code=202)
+async def session_heartbeat(req: HeartbeatRequest):
+    """Record lesson activity; written to user_sessions on the next periodic flush"""
+    if not session_tracker.record(req.user_id, req.topic, req.step, req.completed):
+        raise HTTPException(status_code=503, detail="Too many active sessions, retry later")
+    return {"status": "accepted", "message": "Heartbeat recorded"}
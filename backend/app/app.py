@@ -1,14 +1,32 @@
 # app/main.py
+import time
+_import_started = time.perf_counter()
+
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
 from app.utils.database import db_manager
+from app.utils.deadline import DeadlineMiddleware
+from app.utils.metrics import MetricsMiddleware, registry
+from app.utils.serialization import FastJSONResponse
+from app.utils.startup import startup_report
+from app.services.content_service import content_service
+from app.services.session_tracker import session_tracker
+from app.services.write_behind import write_behind_queue
 from app.api.lesson_routes import router as lesson_router
 from app.api.assessment_routes import router as assessment_router
 from app.api.progress_routes import router as progress_router
+from app.api.quiz_routes import router as quiz_router
+from app.api.session_routes import router as session_router
+from app.api.analytics_routes import router as analytics_router
+from app.api.bundle_routes import router as bundle_router
+from app.api.admin_routes import router as admin_router
 from app.models.schemas import StatusResponse
 
+startup_report.record("imports", time.perf_counter() - _import_started)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,7 +35,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title=settings.api_title,
     version=settings.api_version,
-    description="AI-Powered Forex Training Backend for African Beginners"
+    description="AI-Powered Forex Training Backend for African Beginners",
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -29,27 +48,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request deadline (X-Request-Timeout header or REQUEST_TIMEOUT)
+app.add_middleware(DeadlineMiddleware, default=settings.request_timeout)
+
+# Request latency metrics
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(lesson_router)
 app.include_router(assessment_router)
 app.include_router(progress_router)
+app.include_router(quiz_router)
+app.include_router(session_router)
+app.include_router(analytics_router)
+app.include_router(bundle_router)
+app.include_router(admin_router)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
     logger.info("Starting FinaLearn AI Backend...")
-    success = db_manager.init_database()
-    if success:
-        logger.info("Database initialized successfully")
-    else:
-        logger.error("Failed to initialize database")
+    if settings.db_migrate_on_startup:
+        with startup_report.phase("database_migrations"):
+            success = db_manager.init_database()
+        if success:
+            logger.info("Database initialized successfully")
+        else:
+            logger.error("Failed to initialize database")
+    with startup_report.phase("write_behind_start"):
+        await write_behind_queue.start()
+    with startup_report.phase("session_tracker_start"):
+        await session_tracker.start()
+    if settings.topic_reuse_enabled:
+        with startup_report.phase("topic_index_load"):
+            await content_service.load_topic_index()
+    startup_report.finish()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down FinaLearn AI Backend...")
+    await write_behind_queue.drain()
+    await session_tracker.drain()
+    db_manager.pool.dispose()
 
 
 @app.get('/', response_model=StatusResponse)
@@ -70,6 +114,12 @@ async def health_check():
     }
 
 
+@app.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
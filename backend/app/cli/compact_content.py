@@ -0,0 +1,59 @@
+# app/cli/compact_content.py
+"""Compact the versioned content store.
+
+Removes superseded content versions, keeping each key's latest version and
+optionally a few older ones. ``--import-legacy`` first copies rows from the
+old append-only tables (lesson_plans, lesson_content, chart_tasks,
+assessments) into the store, collapsing identical blobs.
+
+Usage:
+    python -m app.cli.compact_content [--keep 1] [--kind lesson_content]
+                                      [--import-legacy [--purge-legacy]]
+"""
+import argparse
+import json
+import logging
+import sys
+from typing import List, Optional
+from mysql.connector import Error
+from app.services.progress_service import CONTENT_KINDS, progress_service
+from app.utils.database import db_manager
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Remove superseded versions from the content store")
+    parser.add_argument("--keep", type=int, default=1,
+                        help="Versions to keep per key, including the latest")
+    parser.add_argument("--kind", choices=CONTENT_KINDS, help="Only compact this kind of content")
+    parser.add_argument("--import-legacy", action="store_true",
+                        help="Copy rows from the legacy per-kind tables into the store first")
+    parser.add_argument("--purge-legacy", action="store_true",
+                        help="Delete legacy rows once imported (with --import-legacy)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if not db_manager.init_database():
+        return 1
+
+    kinds = [args.kind] if args.kind else list(CONTENT_KINDS)
+    summary = {"imported": {}, "removed": {}}
+    try:
+        if args.import_legacy:
+            for kind in kinds:
+                summary["imported"][kind] = progress_service.import_legacy_content(
+                    kind, purge=args.purge_legacy
+                )
+                logger.info(f"Imported {summary['imported'][kind]} legacy {kind} rows")
+        summary["removed"] = progress_service.compact_content(keep=args.keep, kind=args.kind)
+    except (Error, RuntimeError) as e:
+        logger.error(f"Compaction failed: {e}")
+        return 2
+
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
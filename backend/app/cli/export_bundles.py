@@ -0,0 +1,56 @@
+# app/cli/export_bundles.py
+"""Export stored plans as precompressed static bundles.
+
+Writes one content-hashed JSON bundle per plan week (lessons and chart
+tasks for every day) plus the module assessment, each with .gz (and .br
+when the brotli package is installed) copies, a manifest per plan and an
+index of plans under BUNDLE_DIR. The directory can be served by the API
+(/api/bundles) or synced to a CDN as-is. Days whose content has not been
+generated yet are listed as ``missing`` in the manifest; run
+``app.cli.pregenerate`` first to fill them in.
+
+Usage:
+    python -m app.cli.export_bundles [--module NAME] [--out DIR] [--prune]
+"""
+import argparse
+import json
+import logging
+import sys
+from typing import List, Optional
+from app.services.bundle_service import bundle_service
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export stored plans as static content bundles")
+    parser.add_argument("--module", help="Only export plans for this module")
+    parser.add_argument("--out", help="Bundle directory (default: BUNDLE_DIR)")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete bundle files from earlier exports that the new manifests no longer list")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.out:
+        bundle_service.root = args.out
+    manifests = bundle_service.export(args.module, prune=args.prune)
+    if not manifests:
+        logger.error("No stored lesson plans to export")
+        return 1
+    print(json.dumps([
+        {
+            "module": manifest["module"],
+            "duration": manifest["duration"],
+            "manifest": f"{manifest['slug']}/manifest.json",
+            "bundles": len(manifest["bundles"]),
+            "bytes": sum(bundle["bytes"] for bundle in manifest["bundles"]),
+            "gzip_bytes": sum(bundle["encodings"]["gzip"]["bytes"] for bundle in manifest["bundles"]),
+            "missing": sum(len(bundle.get("missing", [])) for bundle in manifest["bundles"]),
+        }
+        for manifest in manifests
+    ], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
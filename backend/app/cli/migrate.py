@@ -0,0 +1,46 @@
+# app/cli/migrate.py
+"""Apply pending schema migrations, or show the schema version.
+
+Useful as a release step when workers start with DB_MIGRATE_ON_STARTUP=false.
+
+Usage:
+    python -m app.cli.migrate [--status]
+"""
+import argparse
+import json
+import logging
+import sys
+from typing import List, Optional
+from mysql.connector import Error
+from app.utils.database import db_manager
+from app.utils.migrations import LATEST_VERSION, MIGRATIONS, current_version
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--status", action="store_true", help="Only report the applied and latest versions")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.status:
+        return 0 if db_manager.init_database() else 1
+
+    try:
+        with db_manager.connection() as connection:
+            with connection.cursor() as cursor:
+                version = current_version(cursor) or 0
+    except Error as e:
+        logger.error(f"Could not read the schema version: {e}")
+        return 1
+    print(json.dumps({
+        "current_version": version,
+        "latest_version": LATEST_VERSION,
+        "pending": [f"{m.version}: {m.description}" for m in MIGRATIONS if m.version > version],
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# app/cli/pregenerate.py
+"""Pre-generate lesson content, chart tasks and assessments for stored plans.
+
+Walks the latest stored plan for every module, and generates every day's
+lesson and chart tasks plus the module assessment. Results go through the
+regular content cache, so anything already stored is not generated again.
+
+Usage:
+    python -m app.cli.pregenerate [--module NAME] [--concurrency 4] [--rpm 30]
+                                  [--checkpoint .pregenerate_state.json] [--force]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Set
+from app.services.ai_service import ai_service
+from app.services.content_service import content_service
+from app.services.progress_service import progress_service
+from app.utils.cache import make_cache_key
+from app.utils.rate_limit import AsyncRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def build_jobs(plans: Iterable[Dict[str, Any]], module: Optional[str] = None,
+               include_assessments: bool = True) -> List[Dict[str, Any]]:
+    """Unique action payloads for every topic in the given plans"""
+    jobs: Dict[str, Dict[str, Any]] = {}
+
+    def add(payload: Dict[str, Any]) -> None:
+        jobs.setdefault(make_cache_key(payload), payload)
+
+    for plan in plans:
+        if module and plan["module"] != module:
+            continue
+        for week in plan["plan_data"].get("weeks", []):
+            for day in week.get("days", []):
+                topic = day.get("topic")
+                if topic:
+                    add({"action": "generate_lesson", "topic": topic})
+                    add({"action": "chart_tasks", "topic": topic})
+        if include_assessments:
+            add({"action": "assessment", "module": plan["module"]})
+    return list(jobs.values())
+
+
+class Checkpoint:
+    """Set of completed job keys, persisted to a JSON file so runs can resume"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.done: Set[str] = set()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.done = set(json.load(f))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.done
+
+    def add(self, key: str) -> None:
+        self.done.add(key)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(sorted(self.done), f)
+        os.replace(tmp_path, self.path)
+
+
+class Pregenerator:
+    """Run generation jobs with bounded concurrency and a request rate limit.
+
+    A job that only produced mock data (Gemini failing or rate limiting us)
+    is retried with jittered exponential backoff and is not checkpointed.
+    """
+
+    def __init__(self, concurrency: int = 4, rpm: float = 30, max_retries: int = 4,
+                 checkpoint: Optional[Checkpoint] = None, force: bool = False):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = AsyncRateLimiter(rpm, burst=concurrency)
+        self.max_retries = max_retries
+        self.checkpoint = checkpoint or Checkpoint(None)
+        self.force = force
+        self.summary = {
+            "total": 0, "skipped": 0, "memory": 0, "durable": 0, "similar": 0, "model": 0, "failed": 0
+        }
+
+    async def run(self, jobs: List[Dict[str, Any]]) -> Dict[str, int]:
+        self.summary["total"] = len(jobs)
+        try:
+            await asyncio.gather(*(self._run_job(job) for job in jobs))
+        finally:
+            self.checkpoint.save()
+        return self.summary
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        key = make_cache_key(job)
+        if key in self.checkpoint:
+            self.summary["skipped"] += 1
+            return
+
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.limiter.acquire()
+                _, source = await content_service.fetch(job, force=self.force)
+                if source != "mock":
+                    break
+                delay = min(60.0, 2.0 ** attempt) * random.uniform(0.5, 1.0)
+                logger.warning(f"Generation failed for {job}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            else:
+                logger.error(f"Giving up on {job}")
+                self.summary["failed"] += 1
+                return
+
+        self.summary[source] += 1
+        self.checkpoint.add(key)
+        if len(self.checkpoint.done) % 10 == 0:
+            self.checkpoint.save()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-generate content for stored lesson plans")
+    parser.add_argument("--module", help="Only pre-generate this module")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum generations in flight")
+    parser.add_argument("--rpm", type=float, default=30, help="Maximum generation requests per minute")
+    parser.add_argument("--max-retries", type=int, default=4, help="Retries per job on Gemini failure")
+    parser.add_argument("--checkpoint", default=".pregenerate_state.json",
+                        help="File recording completed jobs, used to resume")
+    parser.add_argument("--no-assessments", action="store_true", help="Skip module assessments")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if content is cached")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if not ai_service.model:
+        logger.error("Google Gemini is not configured; nothing to pre-generate")
+        return 1
+
+    plans = progress_service.list_lesson_plans()
+    jobs = build_jobs(plans, module=args.module, include_assessments=not args.no_assessments)
+    logger.info(f"Pre-generating {len(jobs)} items from {len(plans)} plans")
+
+    pregenerator = Pregenerator(
+        concurrency=args.concurrency,
+        rpm=args.rpm,
+        max_retries=args.max_retries,
+        checkpoint=Checkpoint(args.checkpoint),
+        force=args.force
+    )
+    # The write-behind queue is not started here, so every result is written
+    # before its job is checkpointed.
+    summary = asyncio.run(pregenerator.run(jobs))
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+# app/cli/rebuild_analytics.py
+"""Recompute the progress analytics summaries from user_progress.
+
+Progress writes keep the summaries current; run this after backfilling or
+editing user_progress outside the API. The rebuild is one transaction, so
+dashboards see either the old or the new summaries.
+
+Usage:
+    python -m app.cli.rebuild_analytics
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import List, Optional
+from mysql.connector import Error
+from app.services.analytics_service import analytics_service
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the progress analytics summary tables")
+    parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    try:
+        counts = analytics_service.rebuild()
+    except Error as e:
+        logger.error(f"Rebuilding analytics summaries failed: {e}")
+        return 1
+    print(json.dumps({**counts, "seconds": round(time.perf_counter() - start, 3)}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     google_project_name: Optional[str] = os.getenv("GOOGLE_PROJECT_NAME")
     google_project_number: Optional[str] = os.getenv("GOOGLE_PROJECT_NUMBER")
     google_cloud_location: str = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
+    gemini_model: str = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
     
     # Database Configuration
     db_host: str = os.getenv("DB_HOST", "localhost")
@@ -19,6 +20,83 @@ class Settings(BaseSettings):
     db_password: str = os.getenv("DB_PASSWORD", "")
     db_port: int = int(os.getenv("DB_PORT", 3306))
     
+    # Database Connection Pool
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", 5))
+    db_pool_max_overflow: int = int(os.getenv("DB_POOL_MAX_OVERFLOW", 10))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    
+    # Schema Migrations
+    db_migrate_on_startup: bool = os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() == "true"
+    
+    # Response Cache Configuration
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", 1024))
+    response_cache_ttl: int = int(os.getenv("RESPONSE_CACHE_TTL", 86400))
+    
+    # Similar Topic Reuse
+    topic_reuse_enabled: bool = os.getenv("TOPIC_REUSE_ENABLED", "true").lower() == "true"
+    topic_similarity_threshold: float = float(os.getenv("TOPIC_SIMILARITY_THRESHOLD", 0.85))
+    
+    # Cache Backend (memory, sqlite or redis)
+    cache_backend: str = os.getenv("CACHE_BACKEND", "memory")
+    cache_sqlite_path: str = os.getenv("CACHE_SQLITE_PATH", "/tmp/finalearn-cache.sqlite3")
+    cache_redis_url: str = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    cache_redis_timeout: float = float(os.getenv("CACHE_REDIS_TIMEOUT", 0.5))
+    
+    # User Progress Read Cache
+    progress_cache_size: int = int(os.getenv("PROGRESS_CACHE_SIZE", 4096))
+    progress_cache_ttl: int = int(os.getenv("PROGRESS_CACHE_TTL", 60))
+    progress_page_max: int = int(os.getenv("PROGRESS_PAGE_MAX", 500))
+    progress_batch_max: int = int(os.getenv("PROGRESS_BATCH_MAX", 1000))
+    
+    # Write-Behind Persistence Queue
+    write_behind_max_queue: int = int(os.getenv("WRITE_BEHIND_MAX_QUEUE", 10000))
+    write_behind_batch_size: int = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", 100))
+    write_behind_flush_interval: float = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", 1.0))
+    write_behind_put_timeout: float = float(os.getenv("WRITE_BEHIND_PUT_TIMEOUT", 0.5))
+    
+    # Static Content Bundles
+    bundle_dir: str = os.getenv("BUNDLE_DIR", "bundles")
+    bundle_cache_size: int = int(os.getenv("BUNDLE_CACHE_SIZE", 256))
+    
+    # Session Heartbeats
+    session_flush_interval: float = float(os.getenv("SESSION_FLUSH_INTERVAL", 15.0))
+    session_idle_timeout: float = float(os.getenv("SESSION_IDLE_TIMEOUT", 60.0))
+    session_max_tracked: int = int(os.getenv("SESSION_MAX_TRACKED", 100000))
+    session_flush_max_attempts: int = int(os.getenv("SESSION_FLUSH_MAX_ATTEMPTS", 5))
+    
+    # Progress Decision Thresholds
+    progress_min_lessons: int = int(os.getenv("PROGRESS_MIN_LESSONS", 1))
+    progress_demo_lesson_avg: float = float(os.getenv("PROGRESS_DEMO_LESSON_AVG", 70))
+    progress_demo_assessment: float = float(os.getenv("PROGRESS_DEMO_ASSESSMENT", 70))
+    progress_live_lesson_avg: float = float(os.getenv("PROGRESS_LIVE_LESSON_AVG", 80))
+    progress_live_assessment: float = float(os.getenv("PROGRESS_LIVE_ASSESSMENT", 85))
+    progress_live_trade: float = float(os.getenv("PROGRESS_LIVE_TRADE", 75))
+    progress_live_max_std: float = float(os.getenv("PROGRESS_LIVE_MAX_STD", 15))
+    
+    # Quiz Grading
+    quiz_max_sheets: int = int(os.getenv("QUIZ_MAX_SHEETS", 1000))
+    quiz_key_ttl: int = int(os.getenv("QUIZ_KEY_TTL", 60))
+    
+    # Batch Trade Evaluation
+    trade_feedback_batch_size: int = int(os.getenv("TRADE_FEEDBACK_BATCH_SIZE", 20))
+    
+    # Gemini Resilience
+    gemini_max_concurrency: int = int(os.getenv("GEMINI_MAX_CONCURRENCY", 8))
+    gemini_action_concurrency: int = int(os.getenv("GEMINI_ACTION_CONCURRENCY", 4))
+    gemini_max_retries: int = int(os.getenv("GEMINI_MAX_RETRIES", 2))
+    gemini_retry_base_delay: float = float(os.getenv("GEMINI_RETRY_BASE_DELAY", 0.5))
+    gemini_retry_max_delay: float = float(os.getenv("GEMINI_RETRY_MAX_DELAY", 8))
+    gemini_call_timeout: float = float(os.getenv("GEMINI_CALL_TIMEOUT", 30))
+    gemini_queue_timeout: float = float(os.getenv("GEMINI_QUEUE_TIMEOUT", 10))
+    gemini_breaker_failures: int = int(os.getenv("GEMINI_BREAKER_FAILURES", 5))
+    gemini_breaker_reset: float = float(os.getenv("GEMINI_BREAKER_RESET", 30))
+    request_timeout: float = float(os.getenv("REQUEST_TIMEOUT", 0))
+    
+    # Metrics
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
     # Server Configuration
     port: int = int(os.getenv("PORT", 8000))
     
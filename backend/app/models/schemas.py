@@ -1,5 +1,5 @@
 # app/models/schemas.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 
@@ -7,18 +7,22 @@ from typing import List, Optional
 class PlanRequest(BaseModel):
     module: str
     duration: str
+    force_regenerate: bool = False
 
 
 class LessonRequest(BaseModel):
     topic: str
+    force_regenerate: bool = False
 
 
 class ChartTaskRequest(BaseModel):
     topic: str
+    force_regenerate: bool = False
 
 
 class AssessmentRequest(BaseModel):
     module: str
+    force_regenerate: bool = False
 
 
 class TradeEvalRequest(BaseModel):
@@ -27,12 +31,30 @@ class TradeEvalRequest(BaseModel):
     stop_loss: float
     take_profit: float
     reason: str
+    entry_price: Optional[float] = None
+
+
+class TradeBatchRequest(BaseModel):
+    user_id: str
+    trades: List[TradeEvalRequest]
 
 
 class ProgressRequest(BaseModel):
     lesson_scores: List[int]
     assessment_score: int
     trade_score: int
+    explain: bool = False
+
+
+class StudentPerformance(BaseModel):
+    student_id: str
+    lesson_scores: List[int]
+    assessment_score: int
+    trade_score: int
+
+
+class BatchProgressRequest(BaseModel):
+    students: List[StudentPerformance]
 
 
 class UserProgressRequest(BaseModel):
@@ -45,6 +67,37 @@ class UserProgressRequest(BaseModel):
     time_spent: Optional[int] = None
 
 
+class UserProgressBatchRequest(BaseModel):
+    records: List[UserProgressRequest]
+
+
+class QuizSheet(BaseModel):
+    user_id: str
+    answers: List[Optional[str]]
+
+
+class QuizSubmitRequest(BaseModel):
+    module: str
+    assessment_id: Optional[int] = None
+    sheets: List[QuizSheet]
+
+
+class HeartbeatRequest(BaseModel):
+    # user_sessions.user_id is an INT foreign key; reject anything else up front
+    user_id: str = Field(..., pattern=r"^[1-9][0-9]{0,9}$")
+    topic: str = Field(..., min_length=1, max_length=255)
+    step: int = Field(..., ge=1)
+    completed: bool = False
+
+
+class CacheInvalidateRequest(BaseModel):
+    action: Optional[str] = None
+    module: Optional[str] = None
+    duration: Optional[str] = None
+    topic: Optional[str] = None
+    include_durable: bool = True
+
+
 # Response schemas
 class Day(BaseModel):
     day: int
@@ -97,13 +150,112 @@ class TradeEvaluation(BaseModel):
     improvements: List[str]
 
 
+class TradeBatchEvaluation(TradeEvaluation):
+    direction_valid: bool
+    risk_reward: Optional[float] = None
+    stop_distance_pct: Optional[float] = None
+
+
+class TradeBatchResponse(BaseModel):
+    evaluations: List[TradeBatchEvaluation]
+
+
 class ProgressDecision(BaseModel):
     decision: str
     reason: str
 
 
+class StudentDecision(BaseModel):
+    student_id: str
+    decision: str
+    reason: str
+    lesson_average: float
+    lesson_std: float
+    lesson_min: float
+
+
+class BatchProgressResponse(BaseModel):
+    decisions: List[StudentDecision]
+
+
 class UserProgressResponse(BaseModel):
     progress: List[dict]
+    next_cursor: Optional[str] = None
+
+
+class ProgressRecordResult(BaseModel):
+    index: int
+    status: str  # inserted, updated, unchanged or duplicate
+
+
+class UserProgressBatchResponse(BaseModel):
+    inserted: int
+    updated: int
+    unchanged: int
+    duplicate: int
+    results: List[ProgressRecordResult]
+
+
+class QuizSheetResult(BaseModel):
+    user_id: str
+    score: int
+    total: int
+    percent: float
+    correct: List[bool]
+
+
+class QuizSubmitResponse(BaseModel):
+    assessment_id: int
+    module: str
+    questions: int
+    saved: int
+    results: List[QuizSheetResult]
+
+
+class ProgressMetrics(BaseModel):
+    lessons: int
+    completed: int
+    completion_rate: float
+    avg_quiz_score: Optional[float] = None
+    avg_time_spent: Optional[float] = None
+
+
+class ModuleAnalytics(ProgressMetrics):
+    module: str
+    learners: int
+
+
+class ModuleAnalyticsResponse(BaseModel):
+    modules: List[ModuleAnalytics]
+
+
+class DayAnalytics(ProgressMetrics):
+    week: int
+    day: int
+
+
+class DayAnalyticsResponse(BaseModel):
+    module: str
+    days: List[DayAnalytics]
+
+
+class LearnerAnalytics(ProgressMetrics):
+    user_id: str
+
+
+class LearnerAnalyticsResponse(BaseModel):
+    module: str
+    learners: List[LearnerAnalytics]
+    next_after: Optional[int] = None
+
+
+class UserModuleAnalytics(ProgressMetrics):
+    module: str
+
+
+class UserAnalyticsResponse(BaseModel):
+    user_id: str
+    modules: List[UserModuleAnalytics]
 
 
 class StatusResponse(BaseModel):
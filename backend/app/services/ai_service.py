@@ -1,194 +1,81 @@
 # app/services/ai_service.py
-import json
 import logging
-from typing import Any, Dict, Optional
-import google.generativeai as genai
-from fastapi import HTTPException
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from pydantic import ValidationError
 from app.core.config import settings
+from app.models.schemas import (
+    Assessment, ChartTasks, LessonContent, LessonPlan, ProgressDecision, TradeEvaluation
+)
+from app.services.resilience import gemini_guard
+from app.services.prompts import ACTION_PROMPTS, SYSTEM_PROMPT, build_system_prompt, build_user_prompt
+from app.utils.cache import make_cache_key
+from app.utils.json_repair import JSONExtractionError, extract_json, strip_fences
+from app.utils.metrics import AI_MOCK_FALLBACKS, AI_PARSE_OUTCOMES, AI_STAGE_LATENCY
+from app.utils.singleflight import SingleFlight
+from app.utils.startup import startup_report
 
 logger = logging.getLogger(__name__)
 
-
-class AIService:
-    def __init__(self):
-        self.model = None
-        self.system_prompt = """
-You are the AI Engine for the FinaLearn Forex Training Web App.
-Your job is to generate structured learning content, quizzes, chart tasks, and assessments
-for African beginner Forex students.
-
-IMPORTANT GLOBAL RULES:
-- Always respond in valid JSON only.
-- No extra text. No markdown. No explanations.
-- Keep all content beginner-friendly and culturally contextual.
-- All lessons must be exactly 30 minutes divided into 6 blocks of 5 minutes each.
-- All quizzes must have 3–5 questions.
-- All chart tasks must reference TradingView charts.
-- Keep text concise and practical.
-- Avoid hype, profits, or risky language. Promote safe trading only.
-
-##########################################
-# 1. MONTHLY LEARNING PLAN GENERATION
-##########################################
-When you receive:
-{
-  "action": "generate_plan",
-  "module": "{module}",
-  "duration": "{duration_in_days_or_weeks}"
-}
-
-Respond with:
-{
-  "module": "{module}",
-  "duration": "{duration}",
-  "weeks": [
-    {
-      "week": 1,
-      "goal": "clear weekly learning objective",
-      "days": [
-        { "day": 1, "topic": "topic of the day" },
-        { "day": 2, "topic": "topic of the day" }
-      ]
-    }
-  ]
-}
-
-Rules:
-- Break content progressively from beginner → intermediate → advanced.
-- Include African market context (inflation, currency volatility, common local mistakes).
-
-##########################################
-# 2. DAILY 30-MINUTE LESSON GENERATION
-##########################################
-When you receive:
-{
-  "action": "generate_lesson",
-  "topic": "{topic}"
-}
-
-Respond with:
-{
-  "topic": "{topic}",
-  "steps": [
-    { "step": 1, "type": "concept", "content": "5-min explanation" },
-    { "step": 2, "type": "example", "content": "simple example using real market situation" },
-    { "step": 3, "type": "quiz", "questions": ["Q1", "Q2", "Q3"] },
-    { "step": 4, "type": "concept", "content": "second concept or deeper explanation" },
-    { "step": 5, "type": "application", "content": "practical task for learner" },
-    { "step": 6, "type": "quiz", "questions": ["Q1", "Q2", "Q3"] }
-  ]
-}
-
-Rules:
-- Explanations must be short (Max 4 sentences each).
-- Examples must be simplified (no complex jargon).
-
-##########################################
-# 3. CHART TASK GENERATION
-##########################################
-When you receive:
-{
-  "action": "chart_tasks",
-  "topic": "{topic}"
+# Response schema each action's output must satisfy
+RESPONSE_SCHEMAS: Dict[str, type] = {
+    "generate_plan": LessonPlan,
+    "generate_lesson": LessonContent,
+    "chart_tasks": ChartTasks,
+    "assessment": Assessment,
+    "evaluate_trade": TradeEvaluation,
+    "progress_decision": ProgressDecision,
 }
 
-Respond with:
-{
-  "chart_tasks": [
-    "task 1",
-    "task 2",
-    "task 3"
-  ]
-}
+CONTINUE_PROMPT = (
+    "Your previous reply was cut off. Continue it exactly where it stopped: "
+    "output only the remaining JSON text, without repeating anything and "
+    "without markdown fences."
+)
 
-Rules:
-- Tasks must reinforce the lesson topic.
-- Tasks must be performable on TradingView.
-
-##########################################
-# 4. ASSESSMENT GENERATION (END OF MONTH)
-##########################################
-When you receive:
-{
-  "action": "assessment",
-  "module": "{module}"
-}
 
-Respond with:
-{
-  "module": "{module}",
-  "assessment": {
-    "questions": [
-      { "q": "question 1", "choices": ["A","B","C","D"], "answer": "A" },
-      { "q": "question 2", "choices": ["A","B","C","D"], "answer": "C" }
-    ]
-  }
-}
+def _genai():
+    """google.generativeai, imported on first use because the import is slow"""
+    import google.generativeai as genai
+    return genai
 
-##########################################
-# 5. TRADING DECISION EVALUATION (DEMO ACCOUNT)
-##########################################
-When you receive:
-{
-  "action": "evaluate_trade",
-  "trade": {
-    "pair": "{pair}",
-    "direction": "{buy_or_sell}",
-    "stop_loss": "{value}",
-    "take_profit": "{value}",
-    "reason": "{text}"
-  }
-}
 
-Respond with:
-{
-  "score": 0-100,
-  "risk_level": "low | medium | high",
-  "feedback": "short feedback on the trade decision",
-  "improvements": [
-    "point 1",
-    "point 2"
-  ]
-}
-
-##########################################
-# 6. USER PROGRESSION LOGIC
-##########################################
-You must determine whether the student:
-- remains in the current level
-- advances to demo trading
-- advances to live trading
-
-When you receive:
-{
-  "action": "progress_decision",
-  "performance": {
-    "lesson_scores": [numbers],
-    "assessment_score": number,
-    "trade_score": number
-  }
-}
-
-Respond with:
-{
-  "decision": "repeat | advance_to_demo | advance_to_live",
-  "reason": "short explanation"
-}
+class AIService:
+    def __init__(self):
+        self._model = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._config = None
+        self.inflight = SingleFlight()
+        self.guard = gemini_guard
+        self.model_name = settings.gemini_model
+        self.system_prompt = SYSTEM_PROMPT
+        self.action_models: Dict[str, Any] = {}
+        self.usage: Dict[str, Dict[str, int]] = {}
 
-##########################################
-# END
-##########################################
+    @property
+    def model(self):
+        """Gemini model, or None when unavailable; initialized on first access"""
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    with startup_report.phase("gemini_init", lazy=True):
+                        self.initialize_gemini()
+        return self._model
 
-WAIT for the user's input and respond in JSON only.
-"""
-        self.initialize_gemini()
+    @model.setter
+    def model(self, value) -> None:
+        self._model = value
+        self._initialized = True
 
     def initialize_gemini(self):
         """Initialize Google Gemini if API key is available"""
         if settings.google_api_key:
             try:
-                genai.configure(api_key=settings.google_api_key)
-                self.model = genai.GenerativeModel('gemini-pro')
+                _genai().configure(api_key=settings.google_api_key)
+                self._generation_config()
+                self.model = self._create_model()
                 logger.info("Google Gemini initialized successfully")
             except Exception as e:
                 logger.warning(f"Failed to initialize Google Gemini: {e}")
@@ -197,40 +84,224 @@ WAIT for the user's input and respond in JSON only.
             logger.warning("GOOGLE_API_KEY not set. Using mock responses.")
             self.model = None
 
-    def call_gemini_ai(self, action_payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Call Google Gemini with the system prompt and user payload"""
+    def _create_model(self, system_instruction: Optional[str] = None):
+        """Build a Gemini model, optionally bound to a system instruction"""
+        if system_instruction is None:
+            return _genai().GenerativeModel(self.model_name)
+        return _genai().GenerativeModel(self.model_name, system_instruction=system_instruction)
+
+    def _model_for(self, action: Optional[str]):
+        """Model whose system instruction holds only the prompt section for ``action``.
+
+        Keeping the instruction fixed per action lets Gemini reuse it instead
+        of reprocessing all six action specs on every call.
+        """
+        model = self.action_models.get(action)
+        if model is None:
+            model = self._create_model(build_system_prompt(action))
+            self.action_models[action] = model
+        return model
+
+    def _build_prompt(self, action_payload: Dict[str, Any]) -> str:
+        """User turn for the payload; the instructions travel as system_instruction"""
+        return build_user_prompt(action_payload)
+
+    def _record_usage(self, action: Optional[str], response) -> None:
+        """Accumulate per-action token usage reported by Gemini"""
+        stats = self.usage.setdefault(action or "unknown", {
+            "calls": 0, "prompt_tokens": 0, "output_tokens": 0, "cached_tokens": 0
+        })
+        stats["calls"] += 1
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            stats["prompt_tokens"] += getattr(usage, "prompt_token_count", 0) or 0
+            stats["output_tokens"] += getattr(usage, "candidates_token_count", 0) or 0
+            stats["cached_tokens"] += getattr(usage, "cached_content_token_count", 0) or 0
+
+    def prompt_token_report(self, exact: bool = False) -> Dict[str, Any]:
+        """Per-action system prompt size and accumulated token usage.
+
+        Sizes are estimated at ~4 characters per token unless ``exact`` is set
+        and Gemini is available, in which case ``count_tokens`` is used.
+        """
+        report = {}
+        for action in list(ACTION_PROMPTS) + [None]:
+            instruction = build_system_prompt(action)
+            entry = {
+                "system_prompt_chars": len(instruction),
+                "system_prompt_tokens_estimate": len(instruction) // 4,
+            }
+            if exact and self.model:
+                try:
+                    entry["system_prompt_tokens"] = self.model.count_tokens(instruction).total_tokens
+                except Exception as e:
+                    logger.warning(f"count_tokens failed for {action}: {e}")
+            if action is not None:
+                entry["usage"] = self.usage.get(action, {})
+            report[action or "full_prompt"] = entry
+        return report
+
+    def _generation_config(self):
+        """Generation settings shared by every model call"""
+        if self._config is None:
+            self._config = _genai().types.GenerationConfig(
+                max_output_tokens=2048,
+                temperature=0.7,
+                top_p=0.8,
+                top_k=40
+            )
+        return self._config
+
+    def _parse_response(self, text: str, action: Optional[str] = None,
+                        outcome: Optional[str] = None) -> Dict[str, Any]:
+        """Extract the JSON value from model output and validate it against the action's schema.
+
+        Tolerates markdown fences and surrounding prose (see extract_json).
+        Raises JSONExtractionError when the output is unusable or was cut
+        off; its ``truncated`` flag says whether a continuation could
+        complete it. Cut-off output is never returned, even when closing it
+        off yields a valid document, since that document is missing content.
+        """
+        try:
+            extracted = extract_json(text)
+            truncated = extracted.status == "repaired"
+            schema = RESPONSE_SCHEMAS.get(action)
+            if schema is not None:
+                try:
+                    schema.model_validate(extracted.value)
+                except ValidationError as e:
+                    raise JSONExtractionError(
+                        f"Output does not match {schema.__name__}: {e.error_count()} errors",
+                        truncated=truncated
+                    )
+            if truncated:
+                raise JSONExtractionError("Output was cut off", truncated=True, partial=extracted.value)
+        except JSONExtractionError as e:
+            AI_PARSE_OUTCOMES.labels(str(action), "truncated" if e.truncated else "failed").inc()
+            raise
+        AI_PARSE_OUTCOMES.labels(str(action), outcome or extracted.status).inc()
+        return extracted.value
+
+    async def finish_output(self, action_payload: Dict[str, Any], text: str) -> Tuple[Dict[str, Any], bool]:
+        """Parse model output, asking Gemini to continue it if it was cut off.
+
+        The continuation request carries the original prompt and the partial
+        reply, so only the missing tail is generated rather than the whole
+        document again. Returns ``(result, complete)``. If the continuation
+        fails but the cut-off output closes into a valid document, that is
+        returned with ``complete`` False; callers must not cache or store it.
+        """
+        action = action_payload.get("action")
+        try:
+            with AI_STAGE_LATENCY.labels(str(action), "parse").time():
+                return self._parse_response(text, action), True
+        except JSONExtractionError as e:
+            if not e.truncated:
+                raise
+            partial = e.partial
+            logger.warning(f"Gemini output for {action} was cut off ({e}); requesting a continuation")
+
+        try:
+            with AI_STAGE_LATENCY.labels(str(action), "continuation").time():
+                continuation = await self._continue_output(action_payload, text)
+            with AI_STAGE_LATENCY.labels(str(action), "parse").time():
+                return self._parse_response(text + strip_fences(continuation), action, outcome="continued"), True
+        except Exception as e:
+            partial = getattr(e, "partial", None) or partial
+            if partial is None:
+                raise
+            logger.warning(f"Could not complete cut-off {action} output ({e}); returning it closed off")
+            AI_PARSE_OUTCOMES.labels(str(action), "repaired").inc()
+            return partial, False
+
+    async def _continue_output(self, action_payload: Dict[str, Any], partial: str) -> str:
+        """The rest of a reply that stopped at the output token limit"""
+        action = action_payload.get("action")
+        contents = [
+            {"role": "user", "parts": [self._build_prompt(action_payload)]},
+            {"role": "model", "parts": [partial]},
+            {"role": "user", "parts": [CONTINUE_PROMPT]},
+        ]
+        model = self._model_for(action)
+        response = await self.guard.call(action, lambda: model.generate_content_async(
+            contents,
+            generation_config=self._generation_config()
+        ))
+        self._record_usage(action, response)
+        return response.text
+
+    async def call_gemini_ai_async(self, action_payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate content for the payload without blocking the event loop.
+
+        Identical concurrent payloads share one model call.
+        """
+        result, _ = await self.inflight.do(
+            make_cache_key(action_payload), lambda: self.generate_async(action_payload)
+        )
+        return result
+
+    async def generate_async(self, action_payload: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Generate content asynchronously.
+
+        Returns ``(result, from_model)``; ``from_model`` is False when the
+        mock fallback was used or the output was cut off and could not be
+        completed, so callers can avoid caching it.
+        """
         if not self.model:
             logger.warning("Google Gemini not available, returning mock data")
-            return self._get_mock_response(action_payload)
-        
+            return self._mock_fallback(action_payload), False
+
         try:
-            user_content = json.dumps(action_payload)
-            prompt = self.system_prompt + "\nUSER_INPUT:\n" + user_content
-            
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=2048,
-                    temperature=0.7,
-                    top_p=0.8,
-                    top_k=40
-                )
-            )
-            
-            text = response.text
-            
-            try:
-                parsed = json.loads(text)
-                return parsed
-            except Exception as e:
-                raise HTTPException(status_code=500, detail={
-                    "error": "Google Gemini did not return valid JSON",
-                    "raw_response": text,
-                    "exception": str(e)
-                })
+            action = action_payload.get("action")
+            with AI_STAGE_LATENCY.labels(str(action), "prompt_build").time():
+                prompt = self._build_prompt(action_payload)
+            model = self._model_for(action)
+            with AI_STAGE_LATENCY.labels(str(action), "model_call").time():
+                response = await self.guard.call(action, lambda: model.generate_content_async(
+                    prompt,
+                    generation_config=self._generation_config()
+                ))
+            self._record_usage(action, response)
+            return await self.finish_output(action_payload, response.text)
         except Exception as e:
             logger.error(f"Error calling Google Gemini: {e}")
-            return self._get_mock_response(action_payload)
+            return self._mock_fallback(action_payload), False
+
+    async def stream_async(self, action_payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Yield the raw model output in chunks as Gemini produces it.
+
+        Raises RuntimeError when Gemini is not configured, or
+        UpstreamUnavailable when the guard rejects the call; callers fall back
+        to the non-streaming path. The whole stream, not just opening it,
+        must finish within the guard's ``call_timeout`` and the request
+        deadline; each chunk is awaited with whatever is left of both.
+        """
+        if not self.model:
+            raise RuntimeError("Google Gemini not available")
+        action = action_payload.get("action")
+        with AI_STAGE_LATENCY.labels(str(action), "prompt_build").time():
+            prompt = self._build_prompt(action_payload)
+        async with self.guard.attempt(action):
+            finish_by = time.monotonic() + self.guard.call_timeout
+            with AI_STAGE_LATENCY.labels(str(action), "model_call").time():
+                response = await self.guard.bounded(action, self._model_for(action).generate_content_async(
+                    prompt,
+                    generation_config=self._generation_config(),
+                    stream=True
+                ))
+            chunks = aiter(response)
+            while True:
+                left = max(0.0, finish_by - time.monotonic())
+                chunk = await self.guard.bounded(action, anext(chunks, None), timeout=left)
+                if chunk is None:
+                    break
+                yield chunk.text
+        self._record_usage(action, response)
+
+    def _mock_fallback(self, action_payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Mock response served in place of Gemini, counted for monitoring"""
+        AI_MOCK_FALLBACKS.labels(str(action_payload.get("action"))).inc()
+        return self._get_mock_response(action_payload)
 
     def _get_mock_response(self, action_payload: Dict[str, Any]) -> Dict[str, Any]:
         """Return mock responses for development"""
@@ -306,6 +377,17 @@ WAIT for the user's input and respond in JSON only.
                     "Consider economic calendar events before entering trades"
                 ]
             }
+        elif action == "evaluate_trades_feedback":
+            return {
+                "evaluations": [
+                    {
+                        "index": trade.get("index"),
+                        "feedback": "Reasonable setup; check the risk/reward before entering",
+                        "improvements": ["Confirm the trend on a higher timeframe"]
+                    }
+                    for trade in action_payload.get("trades", [])
+                ]
+            }
         elif action == "progress_decision":
             return {
                 "decision": "advance_to_demo",
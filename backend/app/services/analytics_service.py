@@ -0,0 +1,138 @@
+# app/services/analytics_service.py
+import logging
+from typing import Any, Dict, List, Optional
+from mysql.connector import Error
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from app.utils.database import db_manager
+from app.utils.progress_summary import SUMMARY_COLUMNS, rebuild_summaries
+
+logger = logging.getLogger(__name__)
+
+_COUNTERS = ", ".join(SUMMARY_COLUMNS)
+_COUNTER_SUMS = ", ".join(f"SUM({column}) AS {column}" for column in SUMMARY_COLUMNS)
+
+
+def _metrics(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Rates and averages from a row of summary counters"""
+    lessons = int(row.get("lessons") or 0)
+    completed = int(row.get("completed") or 0)
+    quiz_count = int(row.get("quiz_score_count") or 0)
+    time_count = int(row.get("time_spent_count") or 0)
+    return {
+        "lessons": lessons,
+        "completed": completed,
+        "completion_rate": round(completed / lessons, 4) if lessons else 0.0,
+        "avg_quiz_score": round(int(row["quiz_score_total"]) / quiz_count, 2) if quiz_count else None,
+        "avg_time_spent": round(int(row["time_spent_total"]) / time_count, 2) if time_count else None,
+    }
+
+
+class AnalyticsService:
+    """Cohort analytics read from the progress summary tables.
+
+    Every query reads ``progress_day_summary`` or ``progress_user_summary``
+    only, so its cost grows with the number of modules, days and learners,
+    not with the number of progress writes.
+    """
+
+    def __init__(self):
+        self.db_manager = db_manager
+
+    def _query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        try:
+            with self.db_manager.connection() as connection:
+                with connection.cursor(dictionary=True) as cursor:
+                    cursor.execute(query, params)
+                    return cursor.fetchall()
+        except Error as e:
+            logger.error(f"Error reading analytics: {e}")
+            raise HTTPException(status_code=500, detail="Failed to read analytics")
+
+    def get_modules(self) -> Dict[str, Any]:
+        """Totals per module, with the number of distinct learners"""
+        totals = self._query(
+            f"SELECT module, {_COUNTER_SUMS} FROM progress_day_summary GROUP BY module ORDER BY module"
+        )
+        learners = {
+            row["module"]: int(row["learners"])
+            for row in self._query(
+                "SELECT module, COUNT(*) AS learners FROM progress_user_summary "
+                "WHERE lessons > 0 GROUP BY module"
+            )
+        }
+        return {
+            "modules": [
+                {"module": row["module"], "learners": learners.get(row["module"], 0), **_metrics(row)}
+                for row in totals
+            ]
+        }
+
+    def get_module_days(self, module: str, week: Optional[int] = None) -> Dict[str, Any]:
+        """Per week/day figures for one module"""
+        query = f"SELECT week, day, {_COUNTERS} FROM progress_day_summary WHERE module = %s"
+        params: List[Any] = [module]
+        if week is not None:
+            query += " AND week = %s"
+            params.append(week)
+        rows = self._query(query + " ORDER BY week, day", tuple(params))
+        return {
+            "module": module,
+            "days": [{"week": row["week"], "day": row["day"], **_metrics(row)} for row in rows],
+        }
+
+    def get_module_learners(self, module: str, limit: int = 100,
+                            after: Optional[int] = None) -> Dict[str, Any]:
+        """Per learner figures for one module, ordered by user id; ``after`` continues a page"""
+        query = f"SELECT user_id, {_COUNTERS} FROM progress_user_summary WHERE module = %s"
+        params: List[Any] = [module]
+        if after is not None:
+            query += " AND user_id > %s"
+            params.append(after)
+        query += " ORDER BY user_id LIMIT %s"
+        params.append(limit + 1)
+        rows = self._query(query, tuple(params))
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = int(rows[-1]["user_id"])
+        return {
+            "module": module,
+            "learners": [{"user_id": str(row["user_id"]), **_metrics(row)} for row in rows],
+            "next_after": next_after,
+        }
+
+    def get_user(self, user_id: str) -> Dict[str, Any]:
+        """Per module figures for one learner"""
+        rows = self._query(
+            f"SELECT module, {_COUNTERS} FROM progress_user_summary WHERE user_id = %s ORDER BY module",
+            (user_id,)
+        )
+        return {"user_id": user_id, "modules": [{"module": row["module"], **_metrics(row)} for row in rows]}
+
+    def rebuild(self) -> Dict[str, int]:
+        """Recompute the summary tables from user_progress in one transaction"""
+        with self.db_manager.connection() as connection:
+            with connection.cursor() as cursor:
+                days, users = rebuild_summaries(cursor)
+            connection.commit()
+        logger.info(f"Rebuilt progress summaries: {days} day rows, {users} user rows")
+        return {"day_rows": days, "user_rows": users}
+
+    async def get_modules_async(self) -> Dict[str, Any]:
+        return await run_in_threadpool(self.get_modules)
+
+    async def get_module_days_async(self, module: str, week: Optional[int] = None) -> Dict[str, Any]:
+        return await run_in_threadpool(self.get_module_days, module, week)
+
+    async def get_module_learners_async(self, module: str, limit: int = 100,
+                                        after: Optional[int] = None) -> Dict[str, Any]:
+        return await run_in_threadpool(self.get_module_learners, module, limit, after)
+
+    async def get_user_async(self, user_id: str) -> Dict[str, Any]:
+        return await run_in_threadpool(self.get_user, user_id)
+
+
+# Global analytics service instance
+analytics_service = AnalyticsService()
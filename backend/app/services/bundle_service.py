@@ -0,0 +1,212 @@
+# app/services/bundle_service.py
+import gzip
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from app.core.config import settings
+from app.services.ai_service import RESPONSE_SCHEMAS
+from app.services.progress_service import content_key, progress_service
+from app.utils.cache import LRUCache
+from app.utils.serialization import dumps, loads
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = 1
+INDEX_FILE = "index.json"
+MANIFEST_FILE = "manifest.json"
+
+# Precompressed variants, written next to each bundle as <file><suffix>
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Bundle directory and file names accepted by ``read``
+SAFE_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+def bundle_slug(module: str, duration: str) -> str:
+    """URL-safe directory name for a plan; the hash keeps similar names apart"""
+    readable = re.sub(r"[^a-z0-9]+", "-", f"{module} {duration}".casefold()).strip("-")[:60]
+    digest = hashlib.sha1(content_key(module, duration).encode("utf-8")).hexdigest()[:8]
+    return f"{readable}-{digest}" if readable else digest
+
+
+def _compress(data: bytes) -> Dict[str, bytes]:
+    """Precompressed variants of ``data`` (gzip always, brotli when installed)"""
+    variants = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(data, quality=11)
+    return variants
+
+
+class BundleFile(NamedTuple):
+    """One stored representation of a bundle file"""
+    data: bytes
+    etag: str
+    last_modified: float
+    encoding: Optional[str]   # None for the uncompressed file
+
+
+class BundleService:
+    """Export stored plans as static, precompressed per-week bundles.
+
+    ``export`` writes, under ``BUNDLE_DIR/<slug>/``, one JSON bundle per
+    plan week (every day's lesson and chart tasks) plus one for the module
+    assessment. File names carry a hash of their content, so a file never
+    changes once written and can be cached forever; ``manifest.json`` lists
+    the current files of a plan and ``BUNDLE_DIR/index.json`` lists plans.
+    Each bundle has ``.gz`` (and, with the brotli package, ``.br``) copies
+    compressed once at export time.
+    """
+
+    def __init__(self, root: str, cache_size: int = 256):
+        self.progress_service = progress_service
+        self.root = root
+        self._files = LRUCache(cache_size)
+
+    def _write(self, path: str, data: bytes) -> None:
+        """Write atomically, so readers never see a partial file"""
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _write_bundle(self, directory: str, name: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        data = dumps(body)
+        digest = hashlib.sha256(data).hexdigest()
+        filename = f"{name}.{digest[:16]}.json"
+        path = os.path.join(directory, filename)
+        entry = {"file": filename, "sha256": digest, "bytes": len(data), "encodings": {}}
+        for encoding, compressed in _compress(data).items():
+            suffix = ENCODING_SUFFIXES[encoding]
+            if not os.path.exists(path + suffix):
+                self._write(path + suffix, compressed)
+            entry["encodings"][encoding] = {"file": filename + suffix, "bytes": len(compressed)}
+        if not os.path.exists(path):
+            self._write(path, data)
+        return entry
+
+    @staticmethod
+    def _stored(action: str, body: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Stored content shaped like the matching API response"""
+        if body is None:
+            return None
+        return RESPONSE_SCHEMAS[action].model_validate(body).model_dump(mode="json")
+
+    def export_plan(self, plan: Dict[str, Any], prune: bool = False) -> Dict[str, Any]:
+        """Write the bundles and manifest for one stored plan; returns the manifest"""
+        module, duration = plan["module"], plan["duration"]
+        plan_data = self._stored("generate_plan", plan["plan_data"])
+        slug = bundle_slug(module, duration)
+        directory = os.path.join(self.root, slug)
+        os.makedirs(directory, exist_ok=True)
+
+        bundles = []
+        for week in plan_data["weeks"]:
+            days, missing = [], []
+            for day in week["days"]:
+                lesson = self._stored("generate_lesson", self.progress_service.get_lesson_content(day["topic"]))
+                chart = self._stored("chart_tasks", self.progress_service.get_chart_tasks(day["topic"]))
+                if lesson is None or chart is None:
+                    missing.append(day["topic"])
+                days.append({**day, "lesson": lesson, "chart_tasks": chart})
+            body = {
+                "format": BUNDLE_FORMAT, "module": module, "duration": duration,
+                "week": week["week"], "goal": week["goal"], "days": days,
+            }
+            entry = self._write_bundle(directory, f"week-{week['week']}", body)
+            bundles.append({"name": f"week-{week['week']}", "week": week["week"], **entry, "missing": missing})
+
+        assessment = self._stored("assessment", self.progress_service.get_assessment(module))
+        if assessment is not None:
+            body = {"format": BUNDLE_FORMAT, "module": module, "duration": duration, "assessment": assessment}
+            bundles.append({"name": "assessment", **self._write_bundle(directory, "assessment", body)})
+
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "module": module,
+            "duration": duration,
+            "slug": slug,
+            "exported_at": int(time.time()),
+            "bundles": bundles,
+        }
+        self._write(os.path.join(directory, MANIFEST_FILE), dumps(manifest))
+        if prune:
+            self._prune(directory, manifest)
+        missing = sum(len(bundle.get("missing", [])) for bundle in bundles)
+        logger.info(f"Exported {len(bundles)} bundles for {module} ({duration}), {missing} topics missing")
+        return manifest
+
+    def _prune(self, directory: str, manifest: Dict[str, Any]) -> None:
+        """Delete files of earlier exports that the manifest no longer references"""
+        keep = {MANIFEST_FILE}
+        for bundle in manifest["bundles"]:
+            keep.add(bundle["file"])
+            keep.update(variant["file"] for variant in bundle["encodings"].values())
+        for filename in os.listdir(directory):
+            if filename not in keep:
+                os.remove(os.path.join(directory, filename))
+
+    def export(self, module: Optional[str] = None, prune: bool = False) -> List[Dict[str, Any]]:
+        """Export every stored plan (or one module's plans) and rewrite the index"""
+        os.makedirs(self.root, exist_ok=True)
+        plans = self.progress_service.list_lesson_plans()
+        selected = [plan for plan in plans if module is None or plan["module"] == module]
+        manifests = [self.export_plan(plan, prune=prune) for plan in selected]
+        self._write_index()
+        return manifests
+
+    def _write_index(self) -> None:
+        """List every exported plan's manifest in ``index.json``"""
+        plans = []
+        for slug in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, slug, MANIFEST_FILE)
+            if not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                manifest = loads(f.read())
+            plans.append({
+                "module": manifest["module"],
+                "duration": manifest["duration"],
+                "manifest": f"{slug}/{MANIFEST_FILE}",
+                "exported_at": manifest["exported_at"],
+            })
+        self._write(os.path.join(self.root, INDEX_FILE), dumps({"format": BUNDLE_FORMAT, "plans": plans}))
+
+    def read(self, path: str, encoding: Optional[str] = None) -> Optional[BundleFile]:
+        """A bundle file's bytes and validators, or None if it does not exist.
+
+        ``encoding`` selects a precompressed variant. Files are cached in
+        memory and revalidated against their modification time, so the
+        manifest and index pick up new exports.
+        """
+        parts = path.split("/")
+        if not 1 <= len(parts) <= 2 or not all(SAFE_NAME.match(part) for part in parts):
+            return None
+        if encoding is not None:
+            parts[-1] += ENCODING_SUFFIXES[encoding]
+        full_path = os.path.join(self.root, *parts)
+        try:
+            mtime = os.stat(full_path).st_mtime
+        except OSError:
+            return None
+
+        cached = self._files.get(full_path)
+        if cached is not None and cached.last_modified == mtime:
+            return cached
+        with open(full_path, "rb") as f:
+            data = f.read()
+        etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+        found = BundleFile(data, etag, mtime, encoding)
+        self._files.set(full_path, found)
+        return found
+
+
+# Global bundle service instance
+bundle_service = BundleService(settings.bundle_dir, settings.bundle_cache_size)
@@ -0,0 +1,335 @@
+# app/services/content_service.py
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.models.schemas import LessonContent, LessonStep
+from app.services.ai_service import RESPONSE_SCHEMAS, ai_service
+from app.services.progress_service import content_key, progress_service
+from app.services.write_behind import write_behind_queue
+from app.utils.cache import make_cache_key
+from app.utils.cache_backends import create_cache
+from app.utils.json_stream import ArrayItemStreamer
+from app.utils.metrics import CONTENT_CACHE_REQUESTS
+from app.utils.serialization import dumps, loads
+from app.utils.singleflight import SingleFlight, StreamFlight
+from app.utils.topic_index import TopicIndex
+
+logger = logging.getLogger(__name__)
+
+
+class ContentStore(NamedTuple):
+    """Durable-tier handlers for one generation action"""
+    table: str
+    key_args: Callable[[Dict[str, Any]], Tuple]
+    load: Callable
+    delete: Callable
+
+
+class ContentService:
+    """Serve generated content from a tiered cache before calling Gemini.
+
+    Lookups go response cache (in-process LRU, or a SQLite file or Redis
+    shared by all workers; see CACHE_BACKEND) -> latest version in the MySQL
+    content store -> Gemini. The cache holds the serialized response body,
+    so hits are sent without re-validating or re-encoding. Fresh model
+    output goes into the cache immediately and is persisted through the
+    write-behind queue; mock fallbacks and cut-off output that could not be
+    completed are returned but never cached or persisted. Concurrent misses
+    for the same key within a worker share a single generation, and so do
+    concurrent lesson streams.
+
+    Lessons and chart tasks missing from both tiers are served from the
+    stored content of the most similar known topic when it scores at least
+    TOPIC_SIMILARITY_THRESHOLD, so rephrasings of a topic reuse one
+    generation; the reused content is also stored under the requested
+    topic, so the store has an entry for every topic served. Each worker
+    indexes the stored topics at startup and adds the ones it saves.
+    """
+
+    def __init__(self):
+        self.ai_service = ai_service
+        self.progress_service = progress_service
+        self.write_behind = write_behind_queue
+        self.cache = create_cache("content", settings.response_cache_size, settings.response_cache_ttl)
+        self.inflight = SingleFlight()
+        self.streams = StreamFlight()
+        self.durable_hits = 0
+        self.generated = 0
+        self.mock_results = 0
+        self.similar_hits = 0
+        # Topic similarity indexes, by content kind
+        self.topic_indexes: Dict[str, TopicIndex] = {"lesson_content": TopicIndex(), "chart_tasks": TopicIndex()}
+        progress_service.content_listeners.append(self._on_content_written)
+
+        ps = self.progress_service
+        self.stores: Dict[str, ContentStore] = {
+            "generate_plan": ContentStore(
+                "lesson_plans", lambda p: (p["module"].strip(), p["duration"].strip()),
+                ps.get_lesson_plan_async, ps.delete_lesson_plans
+            ),
+            "generate_lesson": ContentStore(
+                "lesson_content", lambda p: (p["topic"].strip(),),
+                ps.get_lesson_content_async, ps.delete_lesson_content
+            ),
+            "chart_tasks": ContentStore(
+                "chart_tasks", lambda p: (p["topic"].strip(),),
+                ps.get_chart_tasks_async, ps.delete_chart_tasks
+            ),
+            "assessment": ContentStore(
+                "assessments", lambda p: (p["module"].strip(),),
+                ps.get_assessment_async, ps.delete_assessments
+            ),
+        }
+
+    async def get_or_generate(self, action_payload: Dict[str, Any], force: bool = False) -> Dict[str, Any]:
+        """Return cached content for the payload, generating it on a miss.
+
+        ``force`` skips both cache tiers and regenerates; the new result
+        replaces the cached one.
+        """
+        result, _ = await self.fetch(action_payload, force=force)
+        return result
+
+    async def fetch(self, action_payload: Dict[str, Any], force: bool = False) -> Tuple[Dict[str, Any], str]:
+        """Like get_or_generate, but also report where the result came from.
+
+        The source is one of ``memory``, ``durable``, ``similar``, ``model``
+        or ``mock``.
+        """
+        body, source = await self.fetch_body(action_payload, force=force)
+        return loads(body), source
+
+    async def fetch_body(self, action_payload: Dict[str, Any], force: bool = False) -> Tuple[bytes, str]:
+        """Like fetch, but return the serialized response body.
+
+        Cache hits return the stored bytes untouched, so routes can send
+        them as they are.
+        """
+        store = self.stores[action_payload["action"]]
+        key = make_cache_key(action_payload)
+        args = store.key_args(action_payload)
+        force = force and self._can_regenerate()
+
+        if not force:
+            cached = await self.cache.get_async(key)
+            if cached is not None:
+                CONTENT_CACHE_REQUESTS.labels(action_payload["action"], "memory").inc()
+                return cached, "memory"
+
+        flight_key = f"{key}:force" if force else key
+        return await self.inflight.do(
+            flight_key, lambda: self._load_or_generate(key, store, args, action_payload, force)
+        )
+
+    @staticmethod
+    def render(action: str, result: Dict[str, Any]) -> bytes:
+        """Response body for generated content, shaped by the action's response schema"""
+        return dumps(RESPONSE_SCHEMAS[action].model_validate(result).model_dump(mode="json"))
+
+    def _can_regenerate(self) -> bool:
+        """False while Gemini's circuit is open, so forced requests serve cached content"""
+        if self.ai_service.guard.breaker.is_open:
+            logger.warning("Gemini circuit open; serving cached content instead of regenerating")
+            return False
+        return True
+
+    async def _load_or_generate(self, key: str, store: ContentStore, args: Tuple,
+                                action_payload: Dict[str, Any], force: bool) -> Tuple[bytes, str]:
+        action = action_payload["action"]
+        if not force:
+            stored = await store.load(*args)
+            if stored is not None:
+                self.durable_hits += 1
+                CONTENT_CACHE_REQUESTS.labels(action, "durable").inc()
+                body = self.render(action, stored)
+                await self.cache.set_async(key, body)
+                return body, "durable"
+
+            similar = await self._load_similar(store, args)
+            if similar is not None:
+                CONTENT_CACHE_REQUESTS.labels(action, "similar").inc()
+                await self.write_behind.enqueue(store.table, (*args, similar))
+                body = self.render(action, similar)
+                await self.cache.set_async(key, body)
+                return body, "similar"
+
+        CONTENT_CACHE_REQUESTS.labels(action, "miss").inc()
+        result, from_model = await self.ai_service.generate_async(action_payload)
+        body = self.render(action, result)
+        if not from_model:
+            self.mock_results += 1
+            return body, "mock"
+
+        self.generated += 1
+        await self.write_behind.enqueue(store.table, (*args, result))
+        await self.cache.set_async(key, body)
+        return body, "model"
+
+    async def stream_lesson(self, topic: str, force: bool = False) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``("step", step)`` events as lesson steps become available, then ``("done", lesson)``.
+
+        Cached lessons are replayed immediately. Otherwise Gemini's output is
+        streamed and each step is emitted as soon as it is complete and
+        validated; the full lesson is cached and persisted at the end (unless
+        it was cut off and could not be completed). If the stream breaks,
+        the partial reply is continued. If that fails too, the lesson comes
+        from a regular generation; when steps were already sent, a
+        ``("reset", ...)`` event precedes its steps. Callers streaming a topic
+        that is already being generated replay that generation's events
+        instead of starting another.
+        """
+        payload = {"action": "generate_lesson", "topic": topic}
+        store = self.stores["generate_lesson"]
+        key = make_cache_key(payload)
+        args = store.key_args(payload)
+        force = force and self._can_regenerate()
+
+        if not force:
+            cached = await self.cache.get_async(key)
+            lesson = None if cached is None else loads(cached)
+            source = "memory"
+            if lesson is None:
+                lesson = await store.load(*args)
+                source = "durable"
+                if lesson is not None:
+                    self.durable_hits += 1
+                else:
+                    lesson = await self._load_similar(store, args)
+                    source = "similar"
+                    if lesson is not None:
+                        await self.write_behind.enqueue(store.table, (*args, lesson))
+                if lesson is not None:
+                    await self.cache.set_async(key, self.render("generate_lesson", lesson))
+            if lesson is not None:
+                CONTENT_CACHE_REQUESTS.labels("generate_lesson", source).inc()
+                for step in lesson.get("steps", []):
+                    yield "step", step
+                yield "done", lesson
+                return
+
+        CONTENT_CACHE_REQUESTS.labels("generate_lesson", "miss").inc()
+        async for event in self.streams.stream(key, lambda: self._stream_generated(payload, key, args)):
+            yield event
+
+    async def _stream_generated(self, payload: Dict[str, Any], key: str,
+                                args: Tuple) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Events of a freshly generated lesson; see ``stream_lesson``"""
+        topic = payload["topic"]
+        store = self.stores["generate_lesson"]
+        parser = ArrayItemStreamer("steps")
+        sent = 0
+        try:
+            try:
+                async for chunk in self.ai_service.stream_async(payload):
+                    for item in parser.feed(chunk):
+                        step = LessonStep.model_validate(item).model_dump(exclude_none=True)
+                        sent += 1
+                        yield "step", step
+            except Exception as e:
+                if not sent:
+                    raise
+                # finish_output asks Gemini to continue the partial reply, so
+                # the steps already sent stay part of the lesson
+                logger.warning(f"Lesson stream for {topic!r} broke after {sent} steps, continuing it: {e}")
+            parsed, complete = await self.ai_service.finish_output(payload, parser.buffer)
+            lesson = LessonContent.model_validate(parsed).model_dump(exclude_none=True)
+            # Steps that arrived through a continuation rather than the stream
+            for step in lesson["steps"][sent:]:
+                yield "step", step
+        except Exception as e:
+            logger.warning(f"Streaming generation for {topic!r} failed, falling back: {e}")
+            lesson = await self.get_or_generate(payload, force=True)
+            if sent:
+                # The steps sent so far belong to another reply; the client
+                # discards them and receives the new lesson in full
+                yield "reset", {"discarded": sent}
+            for step in lesson.get("steps", []):
+                yield "step", step
+            yield "done", lesson
+            return
+
+        if complete:
+            self.generated += 1
+            await self.write_behind.enqueue(store.table, (*args, lesson))
+            await self.cache.set_async(key, self.render("generate_lesson", lesson))
+        else:
+            # Cut off and not completed: sent, but not kept
+            self.mock_results += 1
+        yield "done", lesson
+
+    async def _load_similar(self, store: ContentStore, args: Tuple) -> Optional[Dict[str, Any]]:
+        """Stored content of the most similar indexed topic, if it clears the threshold"""
+        index = self.topic_indexes.get(store.table)
+        if index is None or not settings.topic_reuse_enabled:
+            return None
+        matches = index.search(args[0], settings.topic_similarity_threshold, exclude=content_key(*args), limit=3)
+        for match in matches:
+            stored = await store.load(match.key)
+            if stored is None:
+                # Deleted since it was indexed
+                index.remove(match.key)
+                continue
+            self.similar_hits += 1
+            logger.info(f"Reusing {store.table} of {match.key!r} for {args[0]!r} (similarity {match.score})")
+            return stored
+        return None
+
+    def _on_content_written(self, kind: str, keys: List[str]) -> None:
+        index = self.topic_indexes.get(kind)
+        if index is not None:
+            index.add_many(keys)
+
+    async def load_topic_index(self) -> Dict[str, int]:
+        """(Re)build the topic similarity indexes from the content store"""
+        loaded = {}
+        for kind in list(self.topic_indexes):
+            keys = await run_in_threadpool(self.progress_service.list_content_keys, kind)
+            index = TopicIndex()
+            await run_in_threadpool(index.add_many, keys)
+            self.topic_indexes[kind] = index
+            loaded[kind] = len(index)
+        logger.info(f"Topic similarity index loaded: {loaded}")
+        return loaded
+
+    async def invalidate(self, action_payload: Optional[Dict[str, Any]] = None,
+                         include_durable: bool = True) -> Dict[str, int]:
+        """Drop cached content.
+
+        With no payload the whole response cache is cleared. A payload with
+        only an ``action`` clears that action's cached entries. A full
+        payload removes its entry and, if ``include_durable``, the stored rows.
+        """
+        if not action_payload:
+            return {"memory": await self.cache.clear_async(), "durable": 0}
+
+        action = action_payload["action"]
+        store = self.stores[action]
+        if set(action_payload) == {"action"}:
+            return {"memory": await self.cache.delete_prefix_async(f"{action}:"), "durable": 0}
+
+        memory = int(await self.cache.delete_async(make_cache_key(action_payload)))
+        durable = 0
+        if include_durable:
+            durable = await run_in_threadpool(store.delete, *store.key_args(action_payload))
+            index = self.topic_indexes.get(store.table)
+            if index is not None:
+                index.remove(content_key(*store.key_args(action_payload)))
+        return {"memory": memory, "durable": durable}
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counters for both tiers"""
+        return {
+            "memory": self.cache.stats(),
+            "durable_hits": self.durable_hits,
+            "generated": self.generated,
+            "mock_results": self.mock_results,
+            "similar_hits": self.similar_hits,
+            "topic_index": {kind: index.stats() for kind, index in self.topic_indexes.items()},
+            "coalescing": self.inflight.stats(),
+            "stream_coalescing": self.streams.stats(),
+        }
+
+
+# Global content service instance
+content_service = ContentService()
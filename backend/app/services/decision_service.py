@@ -0,0 +1,134 @@
+# app/services/decision_service.py
+import logging
+from typing import Any, Dict, List, Sequence
+import numpy as np
+from app.core.config import settings
+from app.services.ai_service import ai_service
+
+logger = logging.getLogger(__name__)
+
+DECISIONS = ("repeat", "advance_to_demo", "advance_to_live")
+
+
+class DecisionEngine:
+    """Rule-based progression decisions computed locally with NumPy.
+
+    A student advances to demo trading when their lesson average and
+    assessment score clear the demo thresholds, and to live trading when
+    they also clear the stricter live thresholds, have a qualifying trade
+    score and their lesson scores are consistent (low standard deviation).
+    Everything else is ``repeat``.
+    """
+
+    def __init__(self):
+        self.ai_service = ai_service
+        self.min_lessons = settings.progress_min_lessons
+        self.demo_lesson_avg = settings.progress_demo_lesson_avg
+        self.demo_assessment = settings.progress_demo_assessment
+        self.live_lesson_avg = settings.progress_live_lesson_avg
+        self.live_assessment = settings.progress_live_assessment
+        self.live_trade = settings.progress_live_trade
+        self.live_max_std = settings.progress_live_max_std
+
+    def decide_batch(self, lesson_scores: Sequence[Sequence[float]],
+                     assessment_scores: Sequence[float],
+                     trade_scores: Sequence[float]) -> List[Dict[str, Any]]:
+        """Decide for many students at once; inputs are aligned by index"""
+        n = len(lesson_scores)
+        if n == 0:
+            return []
+        assessment = np.asarray(assessment_scores, dtype=float)
+        trade = np.asarray(trade_scores, dtype=float)
+
+        # Pack the ragged score histories into a NaN-padded matrix
+        counts = np.fromiter((len(s) for s in lesson_scores), dtype=np.int64, count=n)
+        width = max(int(counts.max()), 1)
+        matrix = np.full((n, width), np.nan)
+        if counts.sum():
+            rows = np.repeat(np.arange(n), counts)
+            starts = np.repeat(np.cumsum(counts) - counts, counts)
+            cols = np.arange(counts.sum()) - starts
+            matrix[rows, cols] = np.concatenate([np.asarray(s, dtype=float) for s in lesson_scores if len(s)])
+
+        has_scores = counts > 0
+        safe = np.where(has_scores[:, None], matrix, 0.0)
+        mean = np.where(has_scores, np.nanmean(safe, axis=1), 0.0)
+        std = np.where(has_scores, np.nanstd(safe, axis=1), 0.0)
+        low = np.where(has_scores, np.nanmin(safe, axis=1), 0.0)
+
+        demo = (
+            (counts >= self.min_lessons)
+            & (mean >= self.demo_lesson_avg)
+            & (assessment >= self.demo_assessment)
+        )
+        live = (
+            demo
+            & (mean >= self.live_lesson_avg)
+            & (assessment >= self.live_assessment)
+            & (trade >= self.live_trade)
+            & (std <= self.live_max_std)
+        )
+        level = demo.astype(np.int8) + live.astype(np.int8)
+
+        return [
+            {
+                "decision": DECISIONS[level[i]],
+                "reason": self._reason(level[i], counts[i], mean[i], std[i], assessment[i], trade[i]),
+                "lesson_average": round(float(mean[i]), 2),
+                "lesson_std": round(float(std[i]), 2),
+                "lesson_min": round(float(low[i]), 2),
+            }
+            for i in range(n)
+        ]
+
+    def decide(self, lesson_scores: Sequence[float], assessment_score: float,
+               trade_score: float) -> Dict[str, Any]:
+        """Decide for a single student"""
+        return self.decide_batch([lesson_scores], [assessment_score], [trade_score])[0]
+
+    async def explain(self, decision: Dict[str, Any], performance: Dict[str, Any]) -> str:
+        """Ask Gemini to word the explanation for an already-made decision.
+
+        Falls back to the local reason when Gemini is unavailable.
+        """
+        payload = {
+            "action": "progress_decision",
+            "performance": performance,
+            "decision": decision["decision"],
+        }
+        result, from_model = await self.ai_service.generate_async(payload)
+        if from_model and isinstance(result.get("reason"), str):
+            return result["reason"]
+        return decision["reason"]
+
+    def _reason(self, level: int, count: int, mean: float, std: float,
+                assessment: float, trade: float) -> str:
+        summary = (
+            f"Lesson average {mean:.0f} over {count} lessons (spread {std:.0f}), "
+            f"assessment {assessment:.0f}, trade score {trade:.0f}."
+        )
+        if level == 2:
+            return f"{summary} Meets every threshold for live trading."
+        if level == 1:
+            gaps = []
+            if mean < self.live_lesson_avg:
+                gaps.append(f"lesson average below {self.live_lesson_avg:.0f}")
+            if assessment < self.live_assessment:
+                gaps.append(f"assessment below {self.live_assessment:.0f}")
+            if trade < self.live_trade:
+                gaps.append(f"trade score below {self.live_trade:.0f}")
+            if std > self.live_max_std:
+                gaps.append("lesson scores not yet consistent")
+            return f"{summary} Ready for demo trading; before going live: {', '.join(gaps)}."
+        gaps = []
+        if count < self.min_lessons:
+            gaps.append(f"complete at least {self.min_lessons} lessons")
+        if mean < self.demo_lesson_avg:
+            gaps.append(f"raise lesson average to {self.demo_lesson_avg:.0f}")
+        if assessment < self.demo_assessment:
+            gaps.append(f"score at least {self.demo_assessment:.0f} on the assessment")
+        return f"{summary} Repeat the current level: {', '.join(gaps)}."
+
+
+# Global decision engine instance
+decision_engine = DecisionEngine()
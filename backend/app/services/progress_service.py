@@ -1,170 +1,791 @@
 # app/services/progress_service.py
+import base64
+import hashlib
 import json
 import logging
+import random
+import time
+import unicodedata
+import uuid
 from datetime import datetime
-from typing import List, Dict, Any
-from mysql.connector import Error
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from mysql.connector import Error, IntegrityError, errorcode
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+from app.utils.cache import normalize_payload
+from app.utils.cache_backends import create_cache
 from app.utils.database import db_manager
-from app.models.schemas import UserProgressRequest
+from app.utils.progress_summary import apply_progress_changes
+from app.utils.serialization import dumps_text
+from app.models.schemas import TradeEvalRequest, UserProgressRequest
 
 logger = logging.getLogger(__name__)
 
+# Kinds of generated content kept in the versioned content store. The names
+# match the legacy per-kind tables they replace.
+CONTENT_KINDS = ("lesson_plans", "lesson_content", "chart_tasks", "assessments")
+
+# Key and body columns of the legacy append-only content tables
+LEGACY_CONTENT_COLUMNS = {
+    "lesson_plans": (("module", "duration"), "plan_data"),
+    "lesson_content": (("topic",), "content"),
+    "chart_tasks": (("topic",), "tasks"),
+    "assessments": (("module",), "assessment_data"),
+}
+
+# Longest key the content_key VARCHAR(255) columns hold
+MAX_CONTENT_KEY_LENGTH = 255
+
+# Attempts at taking the next version number when concurrent first saves of
+# a key collide (there is no latest pointer to lock yet)
+CONTENT_VERSION_ATTEMPTS = 3
+
+# Attempts at a whole content batch whose transaction lost a deadlock or a
+# lock wait on the version locks; InnoDB gives up on one of the waiters
+CONTENT_TRANSACTION_ATTEMPTS = 3
+RETRYABLE_LOCK_ERRORS = (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT)
+
+# Lock the key's latest pointer so concurrent saves of one key take turns
+LOCK_CONTENT_LATEST = """
+    SELECT version FROM content_latest WHERE kind = %s AND content_key = %s FOR UPDATE
+"""
+
+SELECT_CONTENT_VERSION = """
+    SELECT id, version FROM content_versions
+    WHERE kind = %s AND content_key = %s AND content_hash = %s FOR UPDATE
+"""
+
+SELECT_NEXT_CONTENT_VERSION = """
+    SELECT COALESCE(MAX(version), 0) + 1 FROM content_versions
+    WHERE kind = %s AND content_key = %s FOR UPDATE
+"""
+
+INSERT_CONTENT_VERSION = """
+    INSERT INTO content_versions (kind, content_key, version, content_hash, body)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+# Point the key's "latest" entry at the version holding this content
+UPSERT_CONTENT_LATEST = """
+    INSERT INTO content_latest (kind, content_key, content_id, version)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE content_id = VALUES(content_id), version = VALUES(version)
+"""
+
+
+def content_key(*parts: str) -> str:
+    """Normalized store key for a topic, module or (module, duration)"""
+    return "|".join(normalize_payload(str(part)) for part in parts)
+
+
+def content_hash(body: Any) -> str:
+    """SHA-256 of the canonical JSON form of a content body"""
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# Rows per multi-row statement in batch upserts and deletes
+MAX_ROWS_PER_STATEMENT = 500
+
+# Columns returned by progress reads
+PROGRESS_COLUMNS = (
+    "id", "module", "week", "day", "topic", "lesson_completed",
+    "quiz_score", "time_spent", "completed_at", "updated_at"
+)
+
+
+def progress_key(user_id: Any, module: str, week: int, day: int) -> Tuple:
+    """A progress record's ``unique_user_lesson`` key, compared the way MySQL does.
+
+    ``user_id`` is an INT column, so "01" and 1 are the same user, and
+    ``module`` uses the server's default accent- and case-insensitive
+    collation, so "Gold" and "gold" are the same module.
+    """
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        user_id = str(user_id)
+    folded = unicodedata.normalize("NFKD", module)
+    folded = "".join(char for char in folded if not unicodedata.combining(char)).casefold()
+    return user_id, folded, int(week), int(day)
+
+
+def encode_progress_cursor(row: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just past ``row``"""
+    raw = f"{row['week']}:{row['day']}:{row['id']}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_progress_cursor(cursor: str) -> Tuple[int, int, int]:
+    """(week, day, id) from a cursor; raises ValueError if it is malformed"""
+    try:
+        week, day, row_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii").split(":")
+        return int(week), int(day), int(row_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def _load_json(value: Any) -> Any:
+    """Decode a JSON column value as returned by the MySQL driver"""
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    return json.loads(value) if isinstance(value, str) else value
+
 
 class ProgressService:
     def __init__(self):
         self.db_manager = db_manager
+        self.progress_cache = create_cache("progress", settings.progress_cache_size, settings.progress_cache_ttl)
+        # Called with (kind, content_keys) after content is saved or deleted
+        self.content_listeners: List[Callable[[str, List[str]], None]] = []
 
     def update_user_progress(self, progress: UserProgressRequest) -> Dict[str, str]:
-        """Update user progress in the database"""
-        connection = self.db_manager.get_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
+        """Update user progress in the database, and the analytics summaries with it"""
+        key = (str(progress.user_id), progress.module, progress.week, progress.day)
+        state = (progress.lesson_completed, progress.quiz_score, progress.time_spent)
         try:
-            cursor = connection.cursor()
-            cursor.execute("""
-                INSERT INTO user_progress 
-                (user_id, module, week, day, topic, lesson_completed, quiz_score, time_spent, completed_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                lesson_completed = VALUES(lesson_completed),
-                quiz_score = VALUES(quiz_score),
-                time_spent = VALUES(time_spent),
-                completed_at = VALUES(completed_at)
-            """, (
-                progress.user_id, progress.module, progress.week, progress.day,
-                "", progress.lesson_completed, progress.quiz_score, progress.time_spent,
-                datetime.now() if progress.lesson_completed else None
-            ))
-            connection.commit()
+            with self.db_manager.connection() as connection:
+                with connection.cursor() as cursor:
+                    previous = self._fetch_progress_state(cursor, [key], lock=True).get(progress_key(*key))
+                    cursor.execute("""
+                        INSERT INTO user_progress 
+                        (user_id, module, week, day, topic, lesson_completed, quiz_score, time_spent, completed_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE
+                        lesson_completed = VALUES(lesson_completed),
+                        quiz_score = VALUES(quiz_score),
+                        time_spent = VALUES(time_spent),
+                        completed_at = VALUES(completed_at)
+                    """, (
+                        progress.user_id, progress.module, progress.week, progress.day,
+                        "", progress.lesson_completed, progress.quiz_score, progress.time_spent,
+                        datetime.now() if progress.lesson_completed else None
+                    ))
+                    apply_progress_changes(cursor, [(key, previous, state)], MAX_ROWS_PER_STATEMENT)
+                connection.commit()
+            self.invalidate_user_progress(progress.user_id)
             return {"status": "success", "message": "Progress updated"}
         except Error as e:
             logger.error(f"Error updating progress: {e}")
             raise HTTPException(status_code=500, detail="Failed to update progress")
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
-
-    def get_user_progress(self, user_id: str) -> Dict[str, List[Dict]]:
-        """Get user progress from the database"""
-        connection = self.db_manager.get_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
+
+    def update_user_progress_batch(self, records: List[UserProgressRequest]) -> Dict[str, Any]:
+        """Upsert many progress records in one transaction.
+
+        Records that repeat an earlier record's (user, module, week, day) in
+        the same batch, as compared by ``progress_key``, are reported as
+        ``duplicate`` (the last one wins), and records matching what is
+        already stored are ``unchanged`` and not written, so replaying a
+        batch is a cheap no-op.
+        """
+        latest: Dict[Tuple, int] = {}
+        for index, record in enumerate(records):
+            latest[progress_key(record.user_id, record.module, record.week, record.day)] = index
+        statuses = ["duplicate"] * len(records)
+
         try:
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT * FROM user_progress 
-                WHERE user_id = %s 
-                ORDER BY week, day
-            """, (user_id,))
-            progress = cursor.fetchall()
-            return {"progress": progress}
+            with self.db_manager.connection() as connection:
+                with connection.cursor() as cursor:
+                    keys = {
+                        normalized: (records[index].user_id, records[index].module, records[index].week, records[index].day)
+                        for normalized, index in latest.items()
+                    }
+                    existing = self._fetch_progress_state(cursor, list(keys.values()), lock=True)
+                    rows, changes = [], []
+                    for normalized, index in latest.items():
+                        record = records[index]
+                        key = keys[normalized]
+                        state = (record.lesson_completed, record.quiz_score, record.time_spent)
+                        if normalized not in existing:
+                            statuses[index] = "inserted"
+                        elif existing[normalized] != state:
+                            statuses[index] = "updated"
+                        else:
+                            statuses[index] = "unchanged"
+                            continue
+                        rows.append((
+                            *key, "", *state,
+                            datetime.now() if record.lesson_completed else None
+                        ))
+                        changes.append((key, existing.get(normalized), state))
+
+                    for start in range(0, len(rows), MAX_ROWS_PER_STATEMENT):
+                        chunk = rows[start:start + MAX_ROWS_PER_STATEMENT]
+                        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(chunk))
+                        cursor.execute(f"""
+                            INSERT INTO user_progress
+                            (user_id, module, week, day, topic, lesson_completed, quiz_score, time_spent, completed_at)
+                            VALUES {placeholders}
+                            ON DUPLICATE KEY UPDATE
+                            lesson_completed = VALUES(lesson_completed),
+                            quiz_score = VALUES(quiz_score),
+                            time_spent = VALUES(time_spent),
+                            completed_at = VALUES(completed_at)
+                        """, [value for row in chunk for value in row])
+                    apply_progress_changes(cursor, changes, MAX_ROWS_PER_STATEMENT)
+                if rows:
+                    connection.commit()
+        except Error as e:
+            logger.error(f"Error updating progress batch: {e}")
+            raise HTTPException(status_code=500, detail="Failed to update progress")
+
+        for user_id in {row[0] for row in rows}:
+            self.invalidate_user_progress(user_id)
+        logger.info(f"Progress batch: {len(records)} records, {len(rows)} written")
+        return {
+            **{status: statuses.count(status) for status in ("inserted", "updated", "unchanged", "duplicate")},
+            "results": [{"index": i, "status": status} for i, status in enumerate(statuses)],
+        }
+
+    def _fetch_progress_state(self, cursor, keys: List[Tuple], lock: bool = False) -> Dict[Tuple, Tuple]:
+        """Stored (lesson_completed, quiz_score, time_spent) for the given progress keys.
+
+        The result is keyed by ``progress_key`` of the stored row, so a key
+        finds the row its upsert would update even when it differs in case
+        or number formatting. ``lock`` reads with ``FOR UPDATE`` so the rows
+        cannot change before the caller's transaction commits; the week and
+        day filters keep the lock off the rest of each module's history.
+        """
+        if not keys:
+            return {}
+        user_ids = sorted({str(key[0]) for key in keys})
+        modules = sorted({key[1] for key in keys})
+        weeks = sorted({key[2] for key in keys})
+        days = sorted({key[3] for key in keys})
+        cursor.execute(f"""
+            SELECT user_id, module, week, day, lesson_completed, quiz_score, time_spent
+            FROM user_progress
+            WHERE user_id IN ({", ".join(["%s"] * len(user_ids))})
+            AND module IN ({", ".join(["%s"] * len(modules))})
+            AND week IN ({", ".join(["%s"] * len(weeks))})
+            AND day IN ({", ".join(["%s"] * len(days))})
+            {"FOR UPDATE" if lock else ""}
+        """, (*user_ids, *modules, *weeks, *days))
+        wanted = {progress_key(*key) for key in keys}
+        state = {}
+        for user_id, module, week, day, completed, quiz_score, time_spent in cursor.fetchall():
+            key = progress_key(user_id, module, week, day)
+            if key in wanted:
+                state[key] = (bool(completed), quiz_score, time_spent)
+        return state
+
+    def get_user_progress(self, user_id: str, module: Optional[str] = None, week: Optional[int] = None,
+                          limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get user progress from the database, ordered by week and day.
+
+        With ``limit`` the result is one keyset page; ``next_cursor`` fetches
+        the next one. Raises ValueError for a malformed cursor.
+        """
+        conditions = ["user_id = %s"]
+        params: List[Any] = [user_id]
+        if module is not None:
+            conditions.append("module = %s")
+            params.append(module)
+        if week is not None:
+            conditions.append("week = %s")
+            params.append(week)
+        if cursor:
+            conditions.append("(week, day, id) > (%s, %s, %s)")
+            params.extend(decode_progress_cursor(cursor))
+        query = (
+            f"SELECT {', '.join(PROGRESS_COLUMNS)} FROM user_progress "
+            f"WHERE {' AND '.join(conditions)} ORDER BY week, day, id"
+        )
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit + 1)
+
+        try:
+            with self.db_manager.connection() as connection:
+                with connection.cursor(dictionary=True) as db_cursor:
+                    db_cursor.execute(query, tuple(params))
+                    progress = db_cursor.fetchall()
         except Error as e:
             logger.error(f"Error getting progress: {e}")
             raise HTTPException(status_code=500, detail="Failed to get progress")
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+
+        next_cursor = None
+        if limit is not None and len(progress) > limit:
+            progress = progress[:limit]
+            next_cursor = encode_progress_cursor(progress[-1])
+        return {"progress": progress, "next_cursor": next_cursor}
+
+    def invalidate_user_progress(self, user_id: str) -> None:
+        """Make cached progress reads for a user stale"""
+        self._new_progress_generation(str(user_id))
+
+    def _new_progress_generation(self, user_id: str) -> str:
+        generation = uuid.uuid4().hex
+        self.progress_cache.set(f"generation:{user_id}", generation, ttl=0)
+        return generation
+
+    async def _progress_generation_async(self, user_id: str) -> str:
+        """Token changed on every write for the user; part of the page cache keys.
+
+        It lives in the cache backend so a write through one worker
+        invalidates pages cached by all of them. A token that was evicted is
+        replaced by a fresh one rather than reset, so old pages are never reused.
+        """
+        generation = await self.progress_cache.get_async(f"generation:{user_id}")
+        if generation is None:
+            generation = uuid.uuid4().hex
+            await self.progress_cache.set_async(f"generation:{user_id}", generation, ttl=0)
+        return generation
 
     def save_lesson_plan(self, module: str, duration: str, plan_data: Dict[str, Any]) -> bool:
         """Save lesson plan to database"""
-        connection = self.db_manager.get_connection()
-        if not connection:
-            logger.error("Database connection failed")
-            return False
-        
-        try:
-            cursor = connection.cursor()
-            cursor.execute(
-                "INSERT INTO lesson_plans (module, duration, plan_data) VALUES (%s, %s, %s)",
-                (module, duration, json.dumps(plan_data))
-            )
-            connection.commit()
-            logger.info(f"Saved lesson plan for module: {module}")
-            return True
-        except Error as e:
-            logger.error(f"Error saving lesson plan: {e}")
-            return False
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+        return self.save_content_rows("lesson_plans", [(module, duration, plan_data)]) > 0
 
     def save_lesson_content(self, topic: str, content: Dict[str, Any]) -> bool:
         """Save lesson content to database"""
-        connection = self.db_manager.get_connection()
-        if not connection:
-            logger.error("Database connection failed")
-            return False
-        
-        try:
-            cursor = connection.cursor()
-            cursor.execute(
-                "INSERT INTO lesson_content (topic, content) VALUES (%s, %s)",
-                (topic, json.dumps(content))
-            )
-            connection.commit()
-            logger.info(f"Saved lesson content for topic: {topic}")
-            return True
-        except Error as e:
-            logger.error(f"Error saving lesson content: {e}")
-            return False
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+        return self.save_content_rows("lesson_content", [(topic, content)]) > 0
 
     def save_chart_tasks(self, topic: str, tasks: Dict[str, Any]) -> bool:
         """Save chart tasks to database"""
-        connection = self.db_manager.get_connection()
-        if not connection:
-            logger.error("Database connection failed")
-            return False
-        
-        try:
-            cursor = connection.cursor()
-            cursor.execute(
-                "INSERT INTO chart_tasks (topic, tasks) VALUES (%s, %s)",
-                (topic, json.dumps(tasks))
-            )
-            connection.commit()
-            logger.info(f"Saved chart tasks for topic: {topic}")
-            return True
-        except Error as e:
-            logger.error(f"Error saving chart tasks: {e}")
-            return False
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+        return self.save_content_rows("chart_tasks", [(topic, tasks)]) > 0
 
     def save_assessment(self, module: str, assessment_data: Dict[str, Any]) -> bool:
         """Save assessment to database"""
-        connection = self.db_manager.get_connection()
-        if not connection:
-            logger.error("Database connection failed")
-            return False
-        
-        try:
-            cursor = connection.cursor()
-            cursor.execute(
-                "INSERT INTO assessments (module, assessment_data) VALUES (%s, %s)",
-                (module, json.dumps(assessment_data))
+        return self.save_content_rows("assessments", [(module, assessment_data)]) > 0
+
+    def save_content_rows(self, table: str, rows: List[Tuple]) -> int:
+        """Store many content rows of one kind in a single transaction.
+
+        Each row is ``(*key_parts, body)``, the body a dict or its JSON
+        text; dicts are serialized here, once. Content already stored under
+        the same key (by hash) is not duplicated; either way the key's latest
+        pointer moves to it. Rows whose key is longer than
+        ``MAX_CONTENT_KEY_LENGTH`` are rejected. A batch that deadlocks or
+        times out waiting for a lock is retried from the start, up to
+        ``CONTENT_TRANSACTION_ATTEMPTS`` times. Returns the number of rows
+        stored.
+        """
+        if table not in CONTENT_KINDS:
+            raise ValueError(f"Unknown content kind: {table}")
+        entries = []
+        for *parts, body in rows:
+            key = content_key(*parts)
+            if len(key) > MAX_CONTENT_KEY_LENGTH:
+                logger.error(f"Not saving {table} row: key is longer than {MAX_CONTENT_KEY_LENGTH} characters")
+                continue
+            if isinstance(body, (str, bytes)):
+                value, text = json.loads(body), body
+            else:
+                value, text = body, dumps_text(body)
+            entries.append((key, content_hash(value), text))
+        if not entries:
+            return 0
+        # A fixed lock order keeps concurrent batches from deadlocking
+        entries.sort(key=lambda entry: entry[0])
+        for attempt in range(1, CONTENT_TRANSACTION_ATTEMPTS + 1):
+            try:
+                with self.db_manager.connection() as connection:
+                    with connection.cursor() as cursor:
+                        for key, digest, text in entries:
+                            self._store_content_version(cursor, table, key, digest, text)
+                    connection.commit()
+                logger.info(f"Saved {len(entries)} rows to {table}")
+                break
+            except Error as e:
+                if e.errno in RETRYABLE_LOCK_ERRORS and attempt < CONTENT_TRANSACTION_ATTEMPTS:
+                    logger.warning(f"Retrying {table} batch after lock error (attempt {attempt}): {e}")
+                    time.sleep(random.uniform(0, 0.05 * attempt))
+                    continue
+                logger.error(f"Error saving rows to {table}: {e}")
+                return 0
+        self._notify_content_listeners(table, [key for key, _, _ in entries])
+        return len(entries)
+
+    def _store_content_version(self, cursor, kind: str, key: str, digest: str, text: str) -> None:
+        """Add a version for new content under a key and point the key's latest entry at it"""
+        for _ in range(CONTENT_VERSION_ATTEMPTS):
+            cursor.execute(LOCK_CONTENT_LATEST, (kind, key))
+            cursor.fetchall()
+            cursor.execute(SELECT_CONTENT_VERSION, (kind, key, digest))
+            existing = cursor.fetchall()
+            if existing:
+                content_id, version = existing[0]
+            else:
+                cursor.execute(SELECT_NEXT_CONTENT_VERSION, (kind, key))
+                version = cursor.fetchall()[0][0]
+                try:
+                    cursor.execute(INSERT_CONTENT_VERSION, (kind, key, version, digest, text))
+                except IntegrityError:
+                    # A concurrent first save of the key took this version
+                    # (or stored the same content); look again
+                    continue
+                content_id = cursor.lastrowid
+            cursor.execute(UPSERT_CONTENT_LATEST, (kind, key, content_id, version))
+            return
+        raise Error(msg=f"Could not take a new version for {kind} {key!r}")
+
+    def _notify_content_listeners(self, kind: str, keys: List[str]) -> None:
+        for listener in self.content_listeners:
+            try:
+                listener(kind, keys)
+            except Exception as e:
+                logger.error(f"Content listener failed for {kind}: {e}")
+
+    def save_trade_evaluations(self, user_id: str, trades: List[TradeEvalRequest],
+                               evaluations: List[Dict[str, Any]]) -> int:
+        """Save a batch of trade evaluations with one multi-row insert"""
+        rows = [
+            (
+                user_id, trade.pair, trade.direction.strip().lower(), trade.stop_loss, trade.take_profit,
+                trade.reason, evaluation["score"], evaluation["risk_level"], evaluation["feedback"],
+                json.dumps(evaluation["improvements"])
             )
+            for trade, evaluation in zip(trades, evaluations)
+            if trade.direction.strip().lower() in ("buy", "sell")
+        ]
+        if not rows:
+            return 0
+        try:
+            with self.db_manager.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.executemany("""
+                        INSERT INTO trade_evaluations
+                        (user_id, pair, direction, stop_loss, take_profit, reason,
+                         score, risk_level, feedback, improvements)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """, rows)
+                connection.commit()
+            logger.info(f"Saved {len(rows)} trade evaluations for user: {user_id}")
+            return len(rows)
+        except Error as e:
+            logger.error(f"Error saving trade evaluations: {e}")
+            return 0
+
+    def get_lesson_plan(self, module: str, duration: str) -> Optional[Dict[str, Any]]:
+        """Most recently stored lesson plan for a module and duration"""
+        return self._fetch_latest_content("lesson_plans", module, duration)
+
+    def get_lesson_content(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Most recently stored lesson content for a topic"""
+        return self._fetch_latest_content("lesson_content", topic)
+
+    def get_chart_tasks(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Most recently stored chart tasks for a topic"""
+        return self._fetch_latest_content("chart_tasks", topic)
+
+    def get_assessment(self, module: str) -> Optional[Dict[str, Any]]:
+        """Most recently stored assessment for a module"""
+        return self._fetch_latest_content("assessments", module)
+
+    def list_content_keys(self, kind: str) -> List[str]:
+        """Every key with stored content of ``kind``"""
+        try:
+            with self.db_manager.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT content_key FROM content_latest WHERE kind = %s", (kind,))
+                    return [row[0] for row in cursor.fetchall()]
+        except Error as e:
+            logger.error(f"Error listing {kind} keys: {e}")
+            return []
+
+    def list_lesson_plans(self) -> List[Dict[str, Any]]:
+        """Latest stored plan for every (module, duration) pair"""
+        try:
+            with self.db_manager.connection() as connection:
+                with connection.cursor(dictionary=True) as cursor:
+                    cursor.execute("""
+                        SELECT l.content_key, v.body
+                        FROM content_latest l
+                        JOIN content_versions v ON v.id = l.content_id
+                        WHERE l.kind = 'lesson_plans'
+                        ORDER BY l.content_key
+                    """)
+                    rows = cursor.fetchall()
+        except Error as e:
+            logger.error(f"Error listing lesson plans: {e}")
+            return []
+        plans = []
+        for row in rows:
+            module, duration = row["content_key"].split("|", 1)
+            plan_data = _load_json(row["body"])
+            plans.append({
+                "module": plan_data.get("module", module),
+                "duration": plan_data.get("duration", duration),
+                "plan_data": plan_data,
+            })
+        return plans
+
+    def delete_lesson_plans(self, module: str, duration: str) -> int:
+        return self._delete_content("lesson_plans", module, duration)
+
+    def delete_lesson_content(self, topic: str) -> int:
+        return self._delete_content("lesson_content", topic)
+
+    def delete_chart_tasks(self, topic: str) -> int:
+        return self._delete_content("chart_tasks", topic)
+
+    def delete_assessments(self, module: str) -> int:
+        return self._delete_content("assessments", module)
+
+    def _fetch_latest_content(self, kind: str, *parts: str) -> Optional[Dict[str, Any]]:
+        """Latest version for a key via its pointer; None when missing or on DB errors"""
+        try:
+            with self.db_manager.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute("""
+                        SELECT v.body
+                        FROM content_latest l
+                        JOIN content_versions v ON v.id = l.content_id
+                        WHERE l.kind = %s AND l.content_key = %s
+                    """, (kind, content_key(*parts)))
+                    row = cursor.fetchone()
+        except Error as e:
+            logger.error(f"Error reading stored content: {e}")
+            return None
+        return _load_json(row[0]) if row else None
+
+    def get_assessment_version(self, module: Optional[str] = None,
+                               assessment_id: Optional[int] = None) -> Optional[Tuple[int, str, Dict[str, Any]]]:
+        """``(assessment_id, content_key, body)`` of a stored assessment.
+
+        Looks up the given version id, or else the module's latest version.
+        None when missing or on DB errors.
+        """
+        try:
+            with self.db_manager.connection() as connection:
+                with connection.cursor() as cursor:
+                    if assessment_id is not None:
+                        cursor.execute("""
+                            SELECT id, content_key, body FROM content_versions
+                            WHERE id = %s AND kind = 'assessments'
+                        """, (assessment_id,))
+                    else:
+                        cursor.execute("""
+                            SELECT v.id, v.content_key, v.body
+                            FROM content_latest l
+                            JOIN content_versions v ON v.id = l.content_id
+                            WHERE l.kind = 'assessments' AND l.content_key = %s
+                        """, (content_key(module),))
+                    row = cursor.fetchone()
+        except Error as e:
+            logger.error(f"Error reading stored assessment: {e}")
+            return None
+        return (row[0], row[1], _load_json(row[2])) if row else None
+
+    def save_quiz_responses(self, rows: List[Tuple]) -> int:
+        """Insert graded answers in one transaction, ``MAX_ROWS_PER_STATEMENT`` rows per statement.
+
+        Each row is ``(user_id, topic, assessment_id, question_index,
+        user_answer, correct_answer, is_correct)``.
+        """
+        if not rows:
+            return 0
+        try:
+            with self.db_manager.connection() as connection:
+                with connection.cursor() as cursor:
+                    for start in range(0, len(rows), MAX_ROWS_PER_STATEMENT):
+                        chunk = rows[start:start + MAX_ROWS_PER_STATEMENT]
+                        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(chunk))
+                        cursor.execute(f"""
+                            INSERT INTO quiz_responses
+                            (user_id, topic, assessment_id, question_index, user_answer, correct_answer, is_correct)
+                            VALUES {placeholders}
+                        """, [value for row in chunk for value in row])
+                connection.commit()
+            logger.info(f"Saved {len(rows)} quiz responses")
+            return len(rows)
+        except Error as e:
+            logger.error(f"Error saving quiz responses: {e}")
+            raise HTTPException(status_code=500, detail="Failed to save quiz responses")
+
+    def save_session_states(self, rows: List[Tuple]) -> int:
+        """Upsert aggregated heartbeat state into user_sessions in one transaction.
+
+        Each row is ``(user_id, topic, current_step, start_time,
+        last_activity, active_seconds, is_completed)``; ``active_seconds``
+        is the time accumulated since the previous flush and is added to
+        the stored total. Once a session is completed it stays completed.
+        """
+        if not rows:
+            return 0
+        with self.db_manager.connection() as connection:
+            with connection.cursor() as cursor:
+                for start in range(0, len(rows), MAX_ROWS_PER_STATEMENT):
+                    chunk = rows[start:start + MAX_ROWS_PER_STATEMENT]
+                    placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(chunk))
+                    cursor.execute(f"""
+                        INSERT INTO user_sessions
+                        (user_id, topic, current_step, start_time, last_activity, active_seconds, is_completed)
+                        VALUES {placeholders}
+                        ON DUPLICATE KEY UPDATE
+                        current_step = VALUES(current_step),
+                        last_activity = VALUES(last_activity),
+                        active_seconds = active_seconds + VALUES(active_seconds),
+                        is_completed = is_completed OR VALUES(is_completed)
+                    """, [value for row in chunk for value in row])
             connection.commit()
-            logger.info(f"Saved assessment for module: {module}")
-            return True
+        return len(rows)
+
+    def _delete_content(self, kind: str, *parts: str) -> int:
+        """Remove every stored version for a key; returns the number of versions removed"""
+        key = content_key(*parts)
+        try:
+            with self.db_manager.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "DELETE FROM content_latest WHERE kind = %s AND content_key = %s", (kind, key)
+                    )
+                    cursor.execute(
+                        "DELETE FROM content_versions WHERE kind = %s AND content_key = %s", (kind, key)
+                    )
+                    deleted = cursor.rowcount
+                connection.commit()
         except Error as e:
-            logger.error(f"Error saving assessment: {e}")
-            return False
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            logger.error(f"Error deleting stored content: {e}")
+            return 0
+        self._notify_content_listeners(kind, [key])
+        return deleted
+
+    def compact_content(self, keep: int = 1, kind: Optional[str] = None) -> Dict[str, int]:
+        """Delete superseded versions, keeping the latest and the ``keep - 1`` most recently stored others.
+
+        Assessment versions that quiz answers were graded against are always
+        kept, so submissions can be traced back to their answer key. Returns
+        the number of versions removed per kind.
+        """
+        keep = max(1, keep)
+        query = """
+            SELECT v.id, v.kind, v.content_key
+            FROM content_versions v
+            JOIN content_latest l ON l.kind = v.kind AND l.content_key = v.content_key
+            WHERE v.id <> l.content_id
+            AND (v.kind <> 'assessments' OR NOT EXISTS (
+                SELECT 1 FROM quiz_responses q WHERE q.assessment_id = v.id
+            ))
+        """
+        params: Tuple = ()
+        if kind is not None:
+            query += " AND v.kind = %s"
+            params = (kind,)
+        query += " ORDER BY v.kind, v.content_key, v.id DESC"
+
+        removed: Dict[str, int] = {}
+        try:
+            with self.db_manager.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, params)
+                    kept: Dict[Tuple[str, str], int] = {}
+                    doomed: List[int] = []
+                    for row_id, row_kind, key in cursor.fetchall():
+                        seen = kept.get((row_kind, key), 1)
+                        if seen < keep:
+                            kept[(row_kind, key)] = seen + 1
+                        else:
+                            doomed.append(row_id)
+                            removed[row_kind] = removed.get(row_kind, 0) + 1
+                    for start in range(0, len(doomed), MAX_ROWS_PER_STATEMENT):
+                        chunk = doomed[start:start + MAX_ROWS_PER_STATEMENT]
+                        cursor.execute(
+                            f"DELETE FROM content_versions WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                            tuple(chunk)
+                        )
+                connection.commit()
+        except Error as e:
+            logger.error(f"Error compacting content: {e}")
+            raise
+        return removed
+
+    def import_legacy_content(self, kind: str, batch_size: int = MAX_ROWS_PER_STATEMENT,
+                              purge: bool = False) -> int:
+        """Copy rows from a legacy content table into the versioned store, oldest first.
+
+        Identical blobs collapse into one version. With ``purge`` the copied
+        legacy rows are deleted afterwards. Returns the number of rows read.
+        """
+        key_columns, body_column = LEGACY_CONTENT_COLUMNS[kind]
+        columns = ", ".join(("id",) + key_columns + (body_column,))
+        last_id = 0
+        total = 0
+        while True:
+            try:
+                with self.db_manager.connection() as connection:
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            f"SELECT {columns} FROM {kind} WHERE id > %s ORDER BY id LIMIT %s",
+                            (last_id, batch_size)
+                        )
+                        batch = cursor.fetchall()
+            except Error as e:
+                logger.error(f"Error reading legacy {kind}: {e}")
+                raise
+            if not batch:
+                break
+            rows = [(*row[1:-1], _load_json(row[-1])) for row in batch]
+            if self.save_content_rows(kind, rows) != len(rows):
+                raise RuntimeError(f"Failed to import legacy {kind} rows after id {last_id}")
+            last_id = batch[-1][0]
+            total += len(batch)
+
+        if purge and total:
+            with self.db_manager.connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DELETE FROM {kind} WHERE id <= %s", (last_id,))
+                connection.commit()
+        return total
+
+    # Async wrappers: the MySQL driver is blocking, so these run the calls
+    # above in the threadpool and keep the event loop free.
+    async def update_user_progress_async(self, progress: UserProgressRequest) -> Dict[str, str]:
+        return await run_in_threadpool(self.update_user_progress, progress)
+
+    async def update_user_progress_batch_async(self, records: List[UserProgressRequest]) -> Dict[str, Any]:
+        return await run_in_threadpool(self.update_user_progress_batch, records)
+
+    async def get_user_progress_async(self, user_id: str, module: Optional[str] = None,
+                                      week: Optional[int] = None, limit: Optional[int] = None,
+                                      cursor: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+        """Progress page and its ETag, served from the read cache when possible"""
+        generation = await self._progress_generation_async(str(user_id))
+        key = f"page:{user_id}:{generation}:{module}:{week}:{limit}:{cursor}"
+        cached = await self.progress_cache.get_async(key)
+        if cached is not None:
+            body, etag = cached
+            return body, etag
+
+        # JSON-safe, so the page is identical whichever cache backend holds it
+        body = jsonable_encoder(
+            await run_in_threadpool(self.get_user_progress, user_id, module, week, limit, cursor)
+        )
+        etag = '"' + hashlib.sha1(
+            json.dumps(body, sort_keys=True).encode("utf-8")
+        ).hexdigest() + '"'
+        await self.progress_cache.set_async(key, (body, etag))
+        return body, etag
+
+    async def save_lesson_plan_async(self, module: str, duration: str, plan_data: Dict[str, Any]) -> bool:
+        return await run_in_threadpool(self.save_lesson_plan, module, duration, plan_data)
+
+    async def save_lesson_content_async(self, topic: str, content: Dict[str, Any]) -> bool:
+        return await run_in_threadpool(self.save_lesson_content, topic, content)
+
+    async def save_chart_tasks_async(self, topic: str, tasks: Dict[str, Any]) -> bool:
+        return await run_in_threadpool(self.save_chart_tasks, topic, tasks)
+
+    async def save_assessment_async(self, module: str, assessment_data: Dict[str, Any]) -> bool:
+        return await run_in_threadpool(self.save_assessment, module, assessment_data)
+
+    async def save_trade_evaluations_async(self, user_id: str, trades: List[TradeEvalRequest],
+                                           evaluations: List[Dict[str, Any]]) -> int:
+        return await run_in_threadpool(self.save_trade_evaluations, user_id, trades, evaluations)
+
+    async def get_lesson_plan_async(self, module: str, duration: str) -> Optional[Dict[str, Any]]:
+        return await run_in_threadpool(self.get_lesson_plan, module, duration)
+
+    async def get_lesson_content_async(self, topic: str) -> Optional[Dict[str, Any]]:
+        return await run_in_threadpool(self.get_lesson_content, topic)
+
+    async def get_chart_tasks_async(self, topic: str) -> Optional[Dict[str, Any]]:
+        return await run_in_threadpool(self.get_chart_tasks, topic)
+
+    async def get_assessment_async(self, module: str) -> Optional[Dict[str, Any]]:
+        return await run_in_threadpool(self.get_assessment, module)
 
 
 # Global progress service instance
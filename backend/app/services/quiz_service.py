@@ -0,0 +1,169 @@
+# app/services/quiz_service.py
+import logging
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.models.schemas import QuizSheet
+from app.services.progress_service import content_key, progress_service
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# quiz_responses.user_answer / correct_answer column width
+ANSWER_MAX_LENGTH = 500
+
+
+def _normalize(values: Sequence[Optional[str]]) -> np.ndarray:
+    """Answers as a stripped, lower-cased string array; None becomes ''"""
+    array = np.array(["" if v is None else str(v) for v in values], dtype=str)
+    return np.char.lower(np.char.strip(array)) if array.size else array
+
+
+class AnswerKey(NamedTuple):
+    """Precompiled answers for one stored assessment version"""
+    assessment_id: int
+    module: str
+    answers: np.ndarray   # normalized correct answer text, one per question
+    letters: np.ndarray   # normalized choice letter of the answer ("a", "b", ...), or ""
+    display: List[str]    # answers as stored, for quiz_responses.correct_answer
+
+    @classmethod
+    def from_assessment(cls, assessment_id: int, module: str, body: Dict[str, Any]) -> "AnswerKey":
+        """Compile ``assessment.questions[].answer``.
+
+        An answer may be given as the choice text or as its letter; both
+        forms are accepted when grading.
+        """
+        questions = (body.get("assessment") or {}).get("questions") or []
+        answers, letters, display = [], [], []
+        for question in questions:
+            answer = str(question.get("answer", "")).strip()
+            choices = [str(c).strip() for c in question.get("choices", [])]
+            folded = [c.lower() for c in choices]
+            text, letter = answer.lower(), ""
+            if len(answer) == 1 and answer.isascii() and answer.isalpha() \
+                    and ord(answer.lower()) - ord("a") < len(choices):
+                letter = answer.lower()
+                text = folded[ord(letter) - ord("a")]
+            elif text in folded:
+                letter = chr(ord("a") + folded.index(text))
+            answers.append(text)
+            letters.append(letter)
+            display.append(answer)
+        return cls(assessment_id, module, np.array(answers, dtype=str), np.array(letters, dtype=str), display)
+
+    def grade(self, sheets: Sequence[Sequence[Optional[str]]]) -> np.ndarray:
+        """Boolean (sheets x questions) matrix of correct answers, in one pass"""
+        count = len(self.answers)
+        padded = [(list(answers) + [None] * count)[:count] for answers in sheets]
+        submitted = _normalize([a for row in padded for a in row]).reshape(len(sheets), count)
+        correct = (submitted == self.answers) | ((submitted == self.letters) & (self.letters != ""))
+        return correct & (submitted != "")
+
+
+class AnswerKeyIndex:
+    """In-process answer keys for stored assessments.
+
+    Keys are compiled once per assessment version (versions are immutable)
+    and the module -> latest version mapping is cached for ``ttl`` seconds.
+    Saving or deleting an assessment in this process drops the mapping
+    immediately; other workers pick the new version up within ``ttl``.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = 60):
+        self.progress_service = progress_service
+        self._keys = LRUCache(maxsize)
+        self._latest = LRUCache(maxsize, ttl)
+        self._lock = threading.Lock()
+        self.compiled = 0
+        progress_service.content_listeners.append(self.on_content_written)
+
+    def on_content_written(self, kind: str, keys: List[str]) -> None:
+        if kind == "assessments":
+            for key in keys:
+                self._latest.delete(key)
+
+    def get(self, module: str, assessment_id: Optional[int] = None) -> Optional[AnswerKey]:
+        """Answer key for a specific assessment version, or the module's latest one"""
+        if assessment_id is None:
+            assessment_id = self._latest.get(content_key(module))
+        if assessment_id is not None:
+            key = self._keys.get(assessment_id)
+            if key is not None:
+                return key
+
+        found = self.progress_service.get_assessment_version(module, assessment_id)
+        if found is None:
+            return None
+        found_id, stored_key, body = found
+        key = AnswerKey.from_assessment(found_id, body.get("module", module), body)
+        with self._lock:
+            self.compiled += 1
+        self._keys.set(found_id, key)
+        if assessment_id is None:
+            self._latest.set(stored_key, found_id)
+        return key
+
+    def stats(self) -> Dict[str, Any]:
+        return {"versions": self._keys.stats(), "latest": self._latest.stats(), "compiled": self.compiled}
+
+
+class QuizService:
+    """Grade whole answer sheets and record every answer in quiz_responses"""
+
+    def __init__(self):
+        self.progress_service = progress_service
+        self.index = AnswerKeyIndex(ttl=settings.quiz_key_ttl)
+
+    def submit(self, module: str, sheets: List[QuizSheet],
+               assessment_id: Optional[int] = None) -> Dict[str, Any]:
+        """Grade ``sheets`` against the assessment and persist the responses in one transaction"""
+        key = self.index.get(module, assessment_id)
+        if key is None:
+            raise HTTPException(status_code=404, detail=f"No stored assessment for module: {module}")
+        count = len(key.answers)
+        if count == 0:
+            raise HTTPException(status_code=422, detail="Assessment has no questions")
+
+        correct = key.grade([sheet.answers for sheet in sheets])
+        scores = correct.sum(axis=1)
+
+        rows = [
+            (
+                sheet.user_id, key.module, key.assessment_id, index,
+                (sheet.answers[index] or "")[:ANSWER_MAX_LENGTH] if index < len(sheet.answers) else "",
+                key.display[index][:ANSWER_MAX_LENGTH], bool(is_correct)
+            )
+            for sheet, marks in zip(sheets, correct.tolist())
+            for index, is_correct in enumerate(marks)
+        ]
+        saved = self.progress_service.save_quiz_responses(rows)
+        logger.info(f"Graded {len(sheets)} sheets for assessment {key.assessment_id} ({key.module})")
+
+        return {
+            "assessment_id": key.assessment_id,
+            "module": key.module,
+            "questions": count,
+            "saved": saved,
+            "results": [
+                {
+                    "user_id": sheet.user_id,
+                    "score": int(score),
+                    "total": count,
+                    "percent": round(float(score) * 100 / count, 2),
+                    "correct": marks,
+                }
+                for sheet, score, marks in zip(sheets, scores, correct.tolist())
+            ],
+        }
+
+    async def submit_async(self, module: str, sheets: List[QuizSheet],
+                           assessment_id: Optional[int] = None) -> Dict[str, Any]:
+        return await run_in_threadpool(self.submit, module, sheets, assessment_id)
+
+
+# Global quiz service instance
+quiz_service = QuizService()
@@ -0,0 +1,253 @@
+# app/services/resilience.py
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.core.config import settings
+from app.utils import deadline
+from app.utils.metrics import AI_REJECTIONS, AI_RETRIES
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> Tuple[type, ...]:
+    """Errors worth retrying; google.api_core is imported lazily with the Gemini client"""
+    from google.api_core import exceptions as google_exceptions
+    return (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.InternalServerError,
+        google_exceptions.BadGateway,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.GatewayTimeout,
+        google_exceptions.DeadlineExceeded,
+        asyncio.TimeoutError,
+        ConnectionError,
+    )
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling Gemini when the call cannot be made in time"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Gemini call rejected: {reason}")
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """Stop calling an upstream that keeps failing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected for ``reset_timeout`` seconds. Then a single trial
+    call is let through (half-open); its outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            tripped = self._opened_at is None and self._failures >= self.failure_threshold
+            if tripped or self._trial_running:
+                self.times_opened += 1
+                self._opened_at = time.monotonic()
+                logger.warning(f"Gemini circuit opened after {self._failures} consecutive failures")
+            self._trial_running = False
+
+    def release_trial(self) -> None:
+        """Give up a half-open trial slot without an outcome (e.g. non-upstream error)"""
+        with self._lock:
+            self._trial_running = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self.times_opened,
+        }
+
+
+class GeminiGuard:
+    """Concurrency limits, retries, deadlines and a circuit breaker for Gemini calls.
+
+    A call takes a slot from the global semaphore and from its action's
+    semaphore, waiting no longer than ``queue_timeout`` or the request
+    deadline. Retryable errors are retried with jittered exponential
+    backoff while time remains. Every attempt is bounded by ``call_timeout``
+    and the request deadline, so latency stays bounded when Gemini degrades.
+    """
+
+    def __init__(self, max_concurrency: int = 8, action_concurrency: int = 4,
+                 max_retries: int = 2, base_delay: float = 0.5, max_delay: float = 8.0,
+                 call_timeout: float = 30.0, queue_timeout: float = 10.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.max_concurrency = max_concurrency
+        self.action_concurrency = action_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.call_timeout = call_timeout
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._actions: Dict[str, asyncio.Semaphore] = {}
+        self.in_flight = 0
+        self.waiting = 0
+
+    def _reject(self, action: str, reason: str) -> UpstreamUnavailable:
+        AI_REJECTIONS.labels(action, reason).inc()
+        return UpstreamUnavailable(reason)
+
+    async def _acquire(self, semaphore: asyncio.Semaphore, action: str) -> None:
+        timeout = deadline.bounded(self.queue_timeout)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise self._reject(action, "queue_timeout")
+
+    @asynccontextmanager
+    async def slot(self, action: Optional[str]):
+        """Hold a global and a per-action concurrency slot"""
+        action = str(action)
+        if deadline.remaining() == 0:
+            raise self._reject(action, "deadline")
+        if not self.breaker.allow():
+            raise self._reject(action, "circuit_open")
+
+        per_action = self._actions.setdefault(action, asyncio.Semaphore(self.action_concurrency))
+        self.waiting += 1
+        try:
+            await self._acquire(self._global, action)
+            try:
+                await self._acquire(per_action, action)
+            except BaseException:
+                self._global.release()
+                raise
+        except BaseException:
+            self.breaker.release_trial()
+            raise
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            per_action.release()
+            self._global.release()
+
+    @asynccontextmanager
+    async def attempt(self, action: Optional[str]):
+        """Hold a slot for one upstream attempt and feed its outcome to the breaker"""
+        async with self.slot(action):
+            try:
+                yield
+            except retryable_errors():
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                self.breaker.release_trial()
+                raise
+            self.breaker.record_success()
+
+    async def bounded(self, action: Optional[str], awaitable: Awaitable[Any],
+                      timeout: Optional[float] = None) -> Any:
+        """Await within ``timeout`` (default ``call_timeout``) and the request deadline.
+
+        Running out of the caller's deadline is not the upstream's fault, so
+        it raises UpstreamUnavailable rather than a retryable timeout.
+        """
+        timeout = self.call_timeout if timeout is None else timeout
+        budget = deadline.bounded(timeout)
+        try:
+            return await asyncio.wait_for(awaitable, budget)
+        except asyncio.TimeoutError:
+            if budget < timeout:
+                raise self._reject(str(action), "deadline")
+            raise
+
+    def _backoff(self, retry: int) -> float:
+        return min(self.max_delay, self.base_delay * 2 ** retry) * random.uniform(0.5, 1.0)
+
+    async def call(self, action: Optional[str], fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` under the concurrency limits, retrying retryable errors"""
+        for retry in range(self.max_retries + 1):
+            try:
+                async with self.attempt(action):
+                    return await self.bounded(action, fn())
+            except retryable_errors() as e:
+                error = e
+
+            delay = self._backoff(retry)
+            left = deadline.remaining()
+            if retry == self.max_retries or (left is not None and left <= delay):
+                raise error
+            AI_RETRIES.labels(str(action)).inc()
+            logger.warning(f"Gemini call for {action} failed ({error!r}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "action_concurrency": self.action_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "circuit": self.breaker.stats(),
+        }
+
+
+# Global Gemini guard instance
+gemini_guard = GeminiGuard(
+    max_concurrency=settings.gemini_max_concurrency,
+    action_concurrency=settings.gemini_action_concurrency,
+    max_retries=settings.gemini_max_retries,
+    base_delay=settings.gemini_retry_base_delay,
+    max_delay=settings.gemini_retry_max_delay,
+    call_timeout=settings.gemini_call_timeout,
+    queue_timeout=settings.gemini_queue_timeout,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.gemini_breaker_failures,
+        reset_timeout=settings.gemini_breaker_reset
+    )
+)
@@ -0,0 +1,229 @@
+# app/services/session_tracker.py
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.services.progress_service import progress_service
+
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[str, str]
+
+
+class SessionState:
+    """Aggregated heartbeats for one (user, topic) session"""
+    __slots__ = ("step", "started_at", "last_seen", "pending", "completed", "heartbeats", "failures")
+
+    def __init__(self, step: int, now: float):
+        self.step = step
+        self.started_at = now
+        self.last_seen = now
+        self.pending = 0.0      # active seconds not yet flushed
+        self.completed = False
+        self.heartbeats = 0
+        self.failures = 0       # consecutive flushes that failed to write this session
+
+
+class SessionTracker:
+    """Aggregate lesson heartbeats in memory and flush them to user_sessions.
+
+    Heartbeats only update a ``SessionState`` and mark its key dirty; every
+    ``flush_interval`` seconds the dirty sessions are upserted in one
+    transaction, so the database sees one row per active session per
+    interval however often clients send heartbeats. Active time is the sum
+    of gaps between consecutive heartbeats, ignoring gaps longer than
+    ``idle_timeout``. Sessions idle that long are dropped from memory once
+    flushed. Each worker tracks the heartbeats it receives; with several
+    workers, sticky routing per user keeps active time exact.
+
+    When the batch upsert fails, each row is retried on its own so one bad
+    row cannot hold back the others. Rows that still fail stay dirty, and a
+    session that fails ``max_attempts`` flushes in a row is dropped.
+    """
+
+    def __init__(self, flush_fn: Callable[[List[Tuple]], int], flush_interval: float = 15.0,
+                 idle_timeout: float = 60.0, max_sessions: int = 100000, max_attempts: int = 5):
+        self.flush_fn = flush_fn
+        self.flush_interval = flush_interval
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_attempts = max(1, max_attempts)
+        self._sessions: Dict[SessionKey, SessionState] = {}
+        self._dirty: Set[SessionKey] = set()
+        self._task: Optional[asyncio.Task] = None
+
+        self.heartbeats = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.failed_rows = 0
+        self.dropped = 0
+        self.evicted = 0
+        self.flush_time_max = 0.0
+        self.last_flush_time = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def record(self, user_id: str, topic: str, step: int, completed: bool = False,
+               now: Optional[float] = None) -> bool:
+        """Apply one heartbeat; False if the tracker is full and the session is new"""
+        now = time.time() if now is None else now
+        key = (user_id, topic)
+        state = self._sessions.get(key)
+        if state is None:
+            if len(self._sessions) >= self.max_sessions:
+                self._evict_idle(now)
+                if len(self._sessions) >= self.max_sessions:
+                    self.rejected += 1
+                    return False
+            state = self._sessions[key] = SessionState(step, now)
+        else:
+            gap = now - state.last_seen
+            if 0 < gap <= self.idle_timeout:
+                state.pending += gap
+            state.last_seen = max(state.last_seen, now)
+        state.step = step
+        state.completed = state.completed or completed
+        state.heartbeats += 1
+        self._dirty.add(key)
+        self.heartbeats += 1
+        return True
+
+    async def start(self) -> None:
+        """Start the periodic flusher on the running event loop"""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Session tracker started")
+
+    async def drain(self) -> None:
+        """Stop the flusher and write out everything still dirty"""
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        logger.info("Session tracker drained")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Upsert every session changed since the last flush; returns the rows written"""
+        now = time.time()
+        if not self._dirty:
+            self._evict_idle(now)
+            return 0
+
+        keys, self._dirty = self._dirty, set()
+        rows, taken = [], []
+        for key in keys:
+            state = self._sessions[key]
+            seconds = int(state.pending)
+            state.pending -= seconds
+            taken.append((key, state, seconds))
+            rows.append((
+                *key, state.step, datetime.fromtimestamp(state.started_at),
+                datetime.fromtimestamp(state.last_seen), seconds, state.completed
+            ))
+
+        start = time.perf_counter()
+        written, failed = await run_in_threadpool(self._write, rows)
+        elapsed = time.perf_counter() - start
+
+        for index, (key, state, seconds) in enumerate(taken):
+            if index not in failed:
+                state.failures = 0
+                continue
+            state.failures += 1
+            if state.failures >= self.max_attempts:
+                logger.error(
+                    f"Dropping session {key} after {state.failures} failed flushes: {failed[index]}"
+                )
+                self.dropped += 1
+                self._sessions.pop(key, None)
+                self._dirty.discard(key)
+                continue
+            # Keep the state dirty so the next flush retries it
+            state.pending += seconds
+            self._sessions.setdefault(key, state)
+            self._dirty.add(key)
+        if failed:
+            self.failed_flushes += 1
+            self.failed_rows += len(failed)
+
+        self.flushes += 1
+        self.flushed_rows += written
+        self.flush_time_max = max(self.flush_time_max, elapsed)
+        self.last_flush_time = elapsed
+        self._evict_idle(now)
+        return written
+
+    def _write(self, rows: List[Tuple]) -> Tuple[int, Dict[int, Exception]]:
+        """Write ``rows`` in one batch, falling back to one row at a time.
+
+        Returns the rows written and the error for each row index that failed.
+        """
+        try:
+            return self.flush_fn(rows), {}
+        except Exception as e:
+            if len(rows) == 1:
+                return 0, {0: e}
+            logger.warning(f"Session flush of {len(rows)} rows failed, retrying per row: {e}")
+        written, failed = 0, {}
+        for index, row in enumerate(rows):
+            try:
+                written += self.flush_fn([row])
+            except Exception as e:
+                failed[index] = e
+        return written, failed
+
+    def _evict_idle(self, now: float) -> None:
+        """Forget flushed sessions that have been idle longer than ``idle_timeout``"""
+        cutoff = now - self.idle_timeout
+        idle = [
+            key for key, state in self._sessions.items()
+            if state.last_seen < cutoff and key not in self._dirty
+        ]
+        for key in idle:
+            del self._sessions[key]
+        self.evicted += len(idle)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "tracked": len(self._sessions),
+            "dirty": len(self._dirty),
+            "max_sessions": self.max_sessions,
+            "heartbeats": self.heartbeats,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+            "failed_rows": self.failed_rows,
+            "dropped": self.dropped,
+            "evicted": self.evicted,
+            "flush_latency_max": round(self.flush_time_max, 6),
+            "flush_latency_last": round(self.last_flush_time, 6),
+        }
+
+
+# Global session tracker instance
+session_tracker = SessionTracker(
+    progress_service.save_session_states,
+    flush_interval=settings.session_flush_interval,
+    idle_timeout=settings.session_idle_timeout,
+    max_sessions=settings.session_max_tracked,
+    max_attempts=settings.session_flush_max_attempts
+)
@@ -0,0 +1,162 @@
+# app/services/trade_service.py
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.core.config import settings
+from app.models.schemas import TradeEvalRequest
+from app.services.ai_service import ai_service
+from app.services.progress_service import progress_service
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = np.array(["low", "medium", "high"])
+
+
+class TradeEvaluator:
+    """Evaluate many demo trades at once.
+
+    The numeric parts (risk/reward, stop distance, direction sanity, score
+    and risk level) are computed locally for the whole batch with NumPy.
+    Only the free-text feedback goes to Gemini, grouped into a few prompts.
+    """
+
+    def __init__(self):
+        self.ai_service = ai_service
+        self.progress_service = progress_service
+        self.batch_size = settings.trade_feedback_batch_size
+
+    def prescore(self, trades: List[TradeEvalRequest]) -> List[Dict[str, Any]]:
+        """Compute the numeric evaluation for every trade"""
+        if not trades:
+            return []
+        direction = np.array([t.direction.strip().lower() for t in trades])
+        stop_loss = np.array([t.stop_loss for t in trades], dtype=float)
+        take_profit = np.array([t.take_profit for t in trades], dtype=float)
+        entry = np.array([np.nan if t.entry_price is None else t.entry_price for t in trades], dtype=float)
+
+        is_buy = direction == "buy"
+        is_sell = direction == "sell"
+        has_entry = ~np.isnan(entry)
+
+        # Targets must sit on the right side of the stop (and of the entry, if given)
+        valid = (is_buy & (take_profit > stop_loss)) | (is_sell & (take_profit < stop_loss))
+        entry_ok = (is_buy & (stop_loss < entry) & (entry < take_profit)) | \
+                   (is_sell & (take_profit < entry) & (entry < stop_loss))
+        valid &= ~has_entry | entry_ok
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            risk = np.abs(entry - stop_loss)
+            reward = np.abs(take_profit - entry)
+            risk_reward = np.where(has_entry & (risk > 0), reward / risk, np.nan)
+            stop_pct = np.where(has_entry & (entry != 0), risk / np.abs(entry) * 100, np.nan)
+
+        known_rr = ~np.isnan(risk_reward)
+        known_stop = ~np.isnan(stop_pct)
+        rr_points = np.select(
+            [~known_rr, risk_reward >= 2, risk_reward >= 1.5, risk_reward >= 1],
+            [20, 40, 30, 20],
+            default=5
+        )
+        stop_points = np.select(
+            [~known_stop, stop_pct <= 2, stop_pct <= 5],
+            [10, 20, 10],
+            default=0
+        )
+        score = np.where(valid, 40 + rr_points + stop_points, 0)
+
+        high = ~valid | (known_rr & (risk_reward < 1)) | (known_stop & (stop_pct > 5))
+        low = valid & known_rr & (risk_reward >= 2) & known_stop & (stop_pct <= 2)
+        risk_level = RISK_LEVELS[np.select([high, low], [2, 0], default=1)]
+
+        return [
+            {
+                "score": int(score[i]),
+                "risk_level": str(risk_level[i]),
+                "direction_valid": bool(valid[i]),
+                "risk_reward": None if np.isnan(risk_reward[i]) else round(float(risk_reward[i]), 2),
+                "stop_distance_pct": None if np.isnan(stop_pct[i]) else round(float(stop_pct[i]), 3),
+            }
+            for i in range(len(trades))
+        ]
+
+    async def evaluate_batch(self, user_id: str, trades: List[TradeEvalRequest]) -> List[Dict[str, Any]]:
+        """Score, add feedback to and persist a batch of trades"""
+        results = self.prescore(trades)
+        chunks = [list(range(i, min(i + self.batch_size, len(trades))))
+                  for i in range(0, len(trades), self.batch_size)]
+        feedback_chunks = await asyncio.gather(
+            *(self._feedback(trades, results, indexes) for indexes in chunks)
+        )
+        for feedback in feedback_chunks:
+            for index, entry in feedback.items():
+                results[index].update(entry)
+
+        await self.progress_service.save_trade_evaluations_async(user_id, trades, results)
+        return results
+
+    async def _feedback(self, trades: List[TradeEvalRequest], results: List[Dict[str, Any]],
+                        indexes: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Feedback for one chunk of trades in a single Gemini call"""
+        payload = {
+            "action": "evaluate_trades_feedback",
+            "trades": [
+                {
+                    "index": i,
+                    "pair": trades[i].pair,
+                    "direction": trades[i].direction,
+                    "stop_loss": trades[i].stop_loss,
+                    "take_profit": trades[i].take_profit,
+                    "entry_price": trades[i].entry_price,
+                    "reason": trades[i].reason,
+                    "risk_reward": results[i]["risk_reward"],
+                    "risk_level": results[i]["risk_level"],
+                }
+                for i in indexes
+            ]
+        }
+        response, from_model = await self.ai_service.generate_async(payload)
+
+        feedback = {i: self._local_feedback(results[i]) for i in indexes}
+        # The model's reply is not schema-checked for this action, so anything
+        # that is not the expected shape keeps the local feedback
+        evaluations = response.get("evaluations") if from_model and isinstance(response, dict) else None
+        if isinstance(evaluations, list):
+            for entry in evaluations:
+                if not isinstance(entry, dict):
+                    continue
+                index = entry.get("index")
+                improvements = entry.get("improvements", [])
+                if index in feedback and isinstance(entry.get("feedback"), str) and isinstance(improvements, list):
+                    feedback[index] = {
+                        "feedback": entry["feedback"],
+                        "improvements": [str(p) for p in improvements],
+                    }
+        return feedback
+
+    def _local_feedback(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Template feedback used when Gemini is unavailable"""
+        improvements = []
+        if not result["direction_valid"]:
+            return {
+                "feedback": "Stop loss and take profit are on the wrong side for this trade direction.",
+                "improvements": ["Place the stop loss beyond your entry, against the trade direction",
+                                 "Place the take profit in the direction of the trade"],
+            }
+        rr: Optional[float] = result["risk_reward"]
+        if rr is None:
+            improvements.append("Record your entry price so risk/reward can be measured")
+        elif rr < 1.5:
+            improvements.append("Aim for a reward at least 1.5-2 times the risk")
+        if result["stop_distance_pct"] is not None and result["stop_distance_pct"] > 2:
+            improvements.append("Use a tighter stop or a smaller position size")
+        if not improvements:
+            improvements.append("Keep journaling the reason for each trade")
+        return {
+            "feedback": f"Trade structure is valid with {result['risk_level']} risk.",
+            "improvements": improvements,
+        }
+
+
+# Global trade evaluator instance
+trade_evaluator = TradeEvaluator()
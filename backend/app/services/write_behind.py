@@ -0,0 +1,149 @@
+# app/services/write_behind.py
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.services.progress_service import progress_service
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Batch content inserts off the request path.
+
+    Rows are queued per table and flushed with one ``executemany`` per table
+    when ``batch_size`` rows are waiting or ``flush_interval`` seconds have
+    passed. The queue is bounded: producers wait up to ``put_timeout``
+    seconds for room, then write their row directly (backpressure rather
+    than unbounded memory or dropped data).
+    """
+
+    def __init__(self, flush_fn: Callable[[str, List[Tuple]], int], max_size: int = 10000,
+                 batch_size: int = 100, flush_interval: float = 1.0, put_timeout: float = 0.5):
+        self.flush_fn = flush_fn
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.enqueued = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.direct_writes = 0
+        self.flushes = 0
+        self.flush_time_total = 0.0
+        self.flush_time_max = 0.0
+        self.last_flush_time = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the background flusher on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info("Write-behind queue started")
+
+    async def enqueue(self, table: str, row: Tuple) -> None:
+        """Queue a row for insertion, or write it directly if the queue is unavailable or full"""
+        if self.running:
+            try:
+                await asyncio.wait_for(self._queue.put((table, row)), timeout=self.put_timeout)
+                self.enqueued += 1
+                return
+            except asyncio.TimeoutError:
+                logger.warning(f"Write-behind queue full, writing {table} row directly")
+        self.direct_writes += 1
+        await self._write(table, [row])
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """Flush everything still queued and stop the flusher"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Write-behind drain timed out with {self._queue.qsize()} rows pending")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Write-behind queue drained")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Tuple[str, Tuple]]) -> None:
+        by_table: Dict[str, List[Tuple]] = defaultdict(list)
+        for table, row in batch:
+            by_table[table].append(row)
+
+        start = time.perf_counter()
+        for table, rows in by_table.items():
+            await self._write(table, rows)
+        elapsed = time.perf_counter() - start
+
+        self.flushes += 1
+        self.flush_time_total += elapsed
+        self.flush_time_max = max(self.flush_time_max, elapsed)
+        self.last_flush_time = elapsed
+
+    async def _write(self, table: str, rows: List[Tuple]) -> None:
+        try:
+            written = await run_in_threadpool(self.flush_fn, table, rows)
+        except Exception as e:
+            logger.error(f"Write-behind flush to {table} failed: {e}")
+            written = 0
+        self.flushed_rows += written
+        self.failed_rows += len(rows) - written
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "direct_writes": self.direct_writes,
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+            "flushes": self.flushes,
+            "flush_latency_avg": round(self.flush_time_total / self.flushes, 6) if self.flushes else 0.0,
+            "flush_latency_max": round(self.flush_time_max, 6),
+            "flush_latency_last": round(self.last_flush_time, 6),
+        }
+
+
+# Global write-behind queue instance
+write_behind_queue = WriteBehindQueue(
+    progress_service.save_content_rows,
+    max_size=settings.write_behind_max_queue,
+    batch_size=settings.write_behind_batch_size,
+    flush_interval=settings.write_behind_flush_interval,
+    put_timeout=settings.write_behind_put_timeout
+)
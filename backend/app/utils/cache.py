@@ -0,0 +1,116 @@
+# app/utils/cache.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def normalize_payload(value: Any) -> Any:
+    """Normalize an action payload so equivalent requests compare equal.
+
+    Strings are stripped, whitespace-collapsed and case-folded; dict keys are
+    kept as-is and sorted when serialized.
+    """
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {k: normalize_payload(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_payload(v) for v in value]
+    return value
+
+
+def make_cache_key(action_payload: Dict[str, Any]) -> str:
+    """Content-addressed key for an action payload: ``<action>:<sha256>``"""
+    normalized = normalize_payload(action_payload)
+    digest = hashlib.sha256(
+        json.dumps(normalized, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+    return f"{action_payload.get('action', 'unknown')}:{digest}"
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every key starting with ``prefix``; returns the number removed"""
+        with self._lock:
+            keys = [k for k in self._data if k.startswith(prefix)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = len(self._data)
+            self._data.clear()
+            return removed
+
+    # Awaitable variants matching the shared cache backends. The LRU never
+    # blocks, so these run inline on the event loop.
+    async def get_async(self, key: str) -> Optional[Any]:
+        return self.get(key)
+
+    async def set_async(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set(key, value, ttl)
+
+    async def delete_async(self, key: str) -> bool:
+        return self.delete(key)
+
+    async def delete_prefix_async(self, prefix: str) -> int:
+        return self.delete_prefix(prefix)
+
+    async def clear_async(self) -> int:
+        return self.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,398 @@
+# app/utils/cache_backends.py
+"""Cache backends shared by the content and progress caches.
+
+Every backend offers the ``LRUCache`` interface: ``get``, ``set``,
+``delete``, ``delete_prefix``, ``clear`` and ``stats``, plus ``_async``
+variants of the first five for use on the event loop; the shared backends
+do blocking I/O, so theirs run in the threadpool. The in-process LRU
+is private to one worker; the SQLite-file and Redis backends are shared by
+every worker that points at the same file or server, so adding workers does
+not split the cache. Shared backends store values as JSON (bytes values,
+such as pre-serialized responses, are stored as-is) and namespace their
+keys, so several caches can live in one file or database.
+"""
+import json
+import logging
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote, urlparse
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKENDS = ("memory", "sqlite", "redis")
+
+# Characters that are special in Redis MATCH patterns
+_GLOB_SPECIAL = re.compile(r"[\\*?\[\]]")
+
+
+# Marks raw bytes values in Redis; JSON text never starts with a NUL byte
+_RAW = b"\x00"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+class ThreadpoolCacheMixin:
+    """``_async`` cache operations for backends whose calls block on I/O"""
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        return await run_in_threadpool(self.get, key)
+
+    async def set_async(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await run_in_threadpool(self.set, key, value, ttl)
+
+    async def delete_async(self, key: str) -> bool:
+        return await run_in_threadpool(self.delete, key)
+
+    async def delete_prefix_async(self, prefix: str) -> int:
+        return await run_in_threadpool(self.delete_prefix, prefix)
+
+    async def clear_async(self) -> int:
+        return await run_in_threadpool(self.clear)
+
+
+class SQLiteCacheBackend(ThreadpoolCacheMixin):
+    """Cache kept in a SQLite file shared by all workers on a host.
+
+    The file runs in WAL mode so readers never block the writer. Each thread
+    keeps its own connection. Entries carry an absolute expiry; expired
+    entries and the oldest entries beyond ``maxsize`` are pruned every
+    ``prune_every`` writes.
+    """
+
+    def __init__(self, path: str, namespace: str, maxsize: int = 1024,
+                 ttl: Optional[float] = None, prune_every: int = 256):
+        self.path = path
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self._prefix = f"{namespace}:"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL, stored_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _range(self, prefix: str) -> tuple:
+        # Keys starting with ``prefix`` as an index-friendly range
+        start = self._prefix + prefix
+        return start, start + "\uffff"
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._conn().execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (self._prefix + key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"SQLite cache read failed: {e}")
+            return None
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        # bytes values are kept as BLOBs, everything else as JSON text
+        return row[0] if isinstance(row[0], bytes) else json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                (self._prefix + key, value if isinstance(value, bytes) else _dumps(value),
+                 now + ttl if ttl else None, now)
+            )
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"SQLite cache write failed: {e}")
+            return
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.prune_every == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Drop expired entries and the oldest ones beyond ``maxsize``"""
+        start, end = self._range("")
+        try:
+            conn = self._conn()
+            removed = conn.execute(
+                "DELETE FROM cache_entries WHERE key >= ? AND key < ? AND expires_at < ?",
+                (start, end, time.time())
+            ).rowcount
+            excess = conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE key >= ? AND key < ?", (start, end)
+            ).fetchone()[0] - self.maxsize
+            if excess > 0:
+                evicted = conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN ("
+                    "SELECT key FROM cache_entries WHERE key >= ? AND key < ? "
+                    "ORDER BY stored_at LIMIT ?)",
+                    (start, end, excess)
+                ).rowcount
+                self.evictions += evicted
+                removed += evicted
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"SQLite cache prune failed: {e}")
+            return 0
+        return removed
+
+    def delete(self, key: str) -> bool:
+        try:
+            return self._conn().execute(
+                "DELETE FROM cache_entries WHERE key = ?", (self._prefix + key,)
+            ).rowcount > 0
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"SQLite cache delete failed: {e}")
+            return False
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every key starting with ``prefix``; returns the number removed"""
+        try:
+            return self._conn().execute(
+                "DELETE FROM cache_entries WHERE key >= ? AND key < ?", self._range(prefix)
+            ).rowcount
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"SQLite cache delete failed: {e}")
+            return 0
+
+    def clear(self) -> int:
+        return self.delete_prefix("")
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            size = self._conn().execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE key >= ? AND key < ?", self._range("")
+            ).fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+
+class RedisError(Exception):
+    """Error reply from a Redis server"""
+
+
+class RedisClient:
+    """Minimal blocking client for the Redis protocol (RESP).
+
+    Enough for a cache: one connection per thread, reconnect once on a
+    broken socket, and short timeouts so a slow server shows up as a cache
+    miss rather than a slow request.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", timeout: float = 0.5):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme!r}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        self._local.conn = conn
+        if self.password:
+            self._roundtrip(conn, ("AUTH", self.password))
+        if self.db:
+            self._roundtrip(conn, ("SELECT", self.db))
+        return conn
+
+    def _close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read(self, reader) -> Any:
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by cache server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            raise RedisError(rest.decode("utf-8"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Connection closed by cache server")
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read(reader) for _ in range(length)]
+        raise RedisError(f"Unexpected reply type {kind!r}")
+
+    def _roundtrip(self, conn, args) -> Any:
+        sock, reader = conn
+        sock.sendall(self._encode(args))
+        return self._read(reader)
+
+    def execute(self, *args) -> Any:
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            try:
+                return self._roundtrip(conn or self._connect(), args)
+            except (OSError, ConnectionError):
+                self._close()
+                if attempt or conn is None:
+                    raise
+
+
+class RedisCacheBackend(ThreadpoolCacheMixin):
+    """Cache kept in a Redis (or Redis-protocol) server shared by all workers.
+
+    Keys are prefixed with ``finalearn:<namespace>:`` and expire through
+    Redis TTLs. Server errors are logged and treated as misses.
+    """
+
+    def __init__(self, url: str, namespace: str, ttl: Optional[float] = None,
+                 timeout: float = 0.5, client: Optional[RedisClient] = None):
+        self.client = client or RedisClient(url, timeout)
+        self.url = url
+        self.namespace = namespace
+        self.ttl = ttl
+        self._prefix = f"finalearn:{namespace}:"
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _failed(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        logger.warning(f"Redis cache {operation} failed: {error}")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.execute("GET", self._prefix + key)
+        except (OSError, RedisError) as e:
+            self._failed("read", e)
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return raw[1:] if raw.startswith(_RAW) else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        data = _RAW + value if isinstance(value, bytes) else _dumps(value)
+        args: List[Any] = ["SET", self._prefix + key, data]
+        if ttl:
+            args += ["PX", int(ttl * 1000)]
+        try:
+            self.client.execute(*args)
+        except (OSError, RedisError) as e:
+            self._failed("write", e)
+
+    def delete(self, key: str) -> bool:
+        try:
+            return self.client.execute("DEL", self._prefix + key) > 0
+        except (OSError, RedisError) as e:
+            self._failed("delete", e)
+            return False
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove every key starting with ``prefix``; returns the number removed"""
+        pattern = self._prefix + _GLOB_SPECIAL.sub(r"\\\g<0>", prefix) + "*"
+        removed = 0
+        cursor = b"0"
+        try:
+            while True:
+                cursor, keys = self.client.execute("SCAN", cursor, "MATCH", pattern, "COUNT", 500)
+                if keys:
+                    removed += self.client.execute("DEL", *keys)
+                if cursor in (b"0", "0"):
+                    return removed
+        except (OSError, RedisError) as e:
+            self._failed("delete", e)
+            return removed
+
+    def clear(self) -> int:
+        return self.delete_prefix("")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "url": f"redis://{self.client.host}:{self.client.port}/{self.client.db}",
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+def create_cache(namespace: str, maxsize: int, ttl: Optional[float] = None,
+                 backend: Optional[str] = None):
+    """Cache for ``namespace`` on the configured backend (``CACHE_BACKEND``)"""
+    backend = backend or settings.cache_backend
+    if backend == "memory":
+        return LRUCache(maxsize, ttl)
+    if backend == "sqlite":
+        return SQLiteCacheBackend(settings.cache_sqlite_path, namespace, maxsize, ttl)
+    if backend == "redis":
+        return RedisCacheBackend(settings.cache_redis_url, namespace, ttl, settings.cache_redis_timeout)
+    raise ValueError(f"Unknown cache backend {backend!r}; expected one of {', '.join(CACHE_BACKENDS)}")
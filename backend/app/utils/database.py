@@ -2,12 +2,223 @@
 import mysql.connector
 from mysql.connector import Error
 import logging
-from typing import Optional
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
 from app.core.config import settings
+from app.utils.metrics import DB_ERRORS, DB_STAGE_LATENCY
+from app.utils.migrations import run_migrations
 
 logger = logging.getLogger(__name__)
 
 
+class PoolTimeoutError(Error):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class ConnectionPool:
+    """Thread-safe MySQL connection pool with overflow, pre-ping and recycling.
+
+    Up to ``size`` connections are kept idle for reuse; another
+    ``max_overflow`` may be opened under load and are closed on release.
+    Callers wait up to ``timeout`` seconds for a free connection.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 5, max_overflow: int = 10,
+                 timeout: float = 10.0, recycle: int = 1800, pre_ping: bool = True):
+        self._factory = factory
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._created: Dict[int, float] = {}
+        self._opened = 0
+        self._in_use = 0
+
+        self._checkouts = 0
+        self._connects = 0
+        self._recycled = 0
+        self._invalidated = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self):
+        """Check out a connection, opening a new one if the pool has room"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        connection = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._opened < self.size + self.max_overflow:
+                    self._opened += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(msg="Timed out waiting for a pooled connection")
+                self._cond.wait(remaining)
+            self._in_use += 1
+            waited = time.monotonic() - start
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        try:
+            if connection is not None:
+                connection = self._validate(connection)
+            if connection is None:
+                connection = self._open()
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return connection
+
+    def release(self, connection) -> None:
+        """Return a connection to the pool, closing it if it is broken or overflow"""
+        try:
+            healthy = connection.is_connected()
+            if healthy and connection.in_transaction:
+                connection.rollback()
+        except Error:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy and len(self._idle) < self.size:
+                self._idle.append(connection)
+            else:
+                self._opened -= 1
+                self._discard(connection)
+            self._cond.notify()
+
+    def dispose(self) -> None:
+        """Close all idle connections"""
+        with self._cond:
+            while self._idle:
+                self._opened -= 1
+                self._discard(self._idle.pop())
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage counters"""
+        with self._cond:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "opened": self._opened,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "connects": self._connects,
+                "recycled": self._recycled,
+                "invalidated": self._invalidated,
+                "timeouts": self._timeouts,
+                "wait_time_total": round(self._wait_total, 6),
+                "wait_time_avg": round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+                "wait_time_max": round(self._wait_max, 6),
+            }
+
+    def _open(self):
+        connection = self._factory()
+        with self._cond:
+            self._connects += 1
+            self._created[id(connection)] = time.monotonic()
+        return connection
+
+    def _validate(self, connection):
+        """Return the connection if still usable, otherwise close it and return None"""
+        created = self._created.get(id(connection), 0.0)
+        if self.recycle and time.monotonic() - created > self.recycle:
+            with self._cond:
+                self._recycled += 1
+                self._discard(connection)
+            return None
+        if self.pre_ping:
+            try:
+                connection.ping(reconnect=False)
+            except Error:
+                with self._cond:
+                    self._invalidated += 1
+                    self._discard(connection)
+                return None
+        return connection
+
+    def _discard(self, connection) -> None:
+        self._created.pop(id(connection), None)
+        try:
+            connection.close()
+        except Error:
+            pass
+
+
+class InstrumentedCursor:
+    """Cursor proxy timing execute/executemany and counting database errors"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, *args, **kwargs):
+        return self._timed(self._cursor.execute, args, kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._timed(self._cursor.executemany, args, kwargs)
+
+    def _timed(self, method, args, kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Error:
+            DB_ERRORS.labels("execute").inc()
+            raise
+        finally:
+            DB_STAGE_LATENCY.labels("execute").observe(time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+
+class InstrumentedConnection:
+    """Connection proxy handing out instrumented cursors and timing commits"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            self._connection.commit()
+        except Error:
+            DB_ERRORS.labels("commit").inc()
+            raise
+        finally:
+            DB_STAGE_LATENCY.labels("commit").observe(time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
 class DatabaseManager:
     def __init__(self):
         self.db_config = {
@@ -17,179 +228,60 @@ class DatabaseManager:
             'password': settings.db_password,
             'port': settings.db_port
         }
+        self.pool = ConnectionPool(
+            self._connect,
+            size=settings.db_pool_size,
+            max_overflow=settings.db_pool_max_overflow,
+            timeout=settings.db_pool_timeout,
+            recycle=settings.db_pool_recycle,
+            pre_ping=settings.db_pool_pre_ping
+        )
+
+    def _connect(self):
+        return mysql.connector.connect(**self.db_config)
 
     def get_connection(self):
-        """Create database connection"""
+        """Create a standalone (unpooled) database connection"""
         try:
-            connection = mysql.connector.connect(**self.db_config)
+            connection = self._connect()
             return connection
         except Error as e:
             logger.error(f"Error connecting to MySQL: {e}")
             return None
 
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection; uncommitted work is rolled back on release"""
+        start = time.perf_counter()
+        try:
+            connection = self.pool.acquire()
+        except Error:
+            DB_ERRORS.labels("connect").inc()
+            raise
+        finally:
+            DB_STAGE_LATENCY.labels("connect").observe(time.perf_counter() - start)
+        try:
+            yield InstrumentedConnection(connection)
+        finally:
+            self.pool.release(connection)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Current connection pool statistics"""
+        return self.pool.stats()
+
     def init_database(self):
-        """Initialize database tables"""
-        connection = self.get_connection()
-        if not connection:
-            logger.error("Failed to connect to database")
-            return False
-        
+        """Bring the database schema up to date"""
         try:
-            cursor = connection.cursor()
-            
-            # Create users table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(255) UNIQUE NOT NULL,
-                email VARCHAR(255) UNIQUE NOT NULL,
-                password_hash VARCHAR(255) NOT NULL,
-                first_name VARCHAR(100),
-                last_name VARCHAR(100),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-            )
-            """)
-            
-            # Create lesson_plans table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS lesson_plans (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id INT,
-                module VARCHAR(255) NOT NULL,
-                duration VARCHAR(50) NOT NULL,
-                plan_data JSON NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL,
-                INDEX idx_module (module),
-                INDEX idx_user_module (user_id, module)
-            )
-            """)
-            
-            # Create user_progress table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_progress (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id INT NOT NULL,
-                module VARCHAR(255) NOT NULL,
-                week INT NOT NULL,
-                day INT NOT NULL,
-                topic VARCHAR(255) NOT NULL,
-                lesson_completed BOOLEAN DEFAULT FALSE,
-                quiz_score INT DEFAULT NULL,
-                time_spent INT DEFAULT NULL,
-                completed_at TIMESTAMP NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                UNIQUE KEY unique_user_lesson (user_id, module, week, day),
-                INDEX idx_user_progress (user_id, module),
-                INDEX idx_completion (lesson_completed, completed_at)
-            )
-            """)
-            
-            # Create lesson_content table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS lesson_content (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                topic VARCHAR(255) NOT NULL,
-                content JSON NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                INDEX idx_topic (topic)
-            )
-            """)
-            
-            # Create chart_tasks table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS chart_tasks (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                topic VARCHAR(255) NOT NULL,
-                tasks JSON NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                INDEX idx_topic (topic)
-            )
-            """)
-            
-            # Create assessments table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS assessments (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                module VARCHAR(255) NOT NULL,
-                assessment_data JSON NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                INDEX idx_module (module)
-            )
-            """)
-            
-            # Create quiz_responses table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS quiz_responses (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id INT NOT NULL,
-                topic VARCHAR(255) NOT NULL,
-                question_index INT NOT NULL,
-                user_answer VARCHAR(500) NOT NULL,
-                correct_answer VARCHAR(500) NOT NULL,
-                is_correct BOOLEAN NOT NULL,
-                responded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                INDEX idx_user_quiz (user_id, topic)
-            )
-            """)
-            
-            # Create trade_evaluations table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS trade_evaluations (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id INT NOT NULL,
-                pair VARCHAR(10) NOT NULL,
-                direction ENUM('buy', 'sell') NOT NULL,
-                stop_loss DECIMAL(10, 5) NOT NULL,
-                take_profit DECIMAL(10, 5) NOT NULL,
-                reason TEXT NOT NULL,
-                score INT NOT NULL,
-                risk_level ENUM('low', 'medium', 'high') NOT NULL,
-                feedback TEXT NOT NULL,
-                improvements JSON NOT NULL,
-                evaluated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                INDEX idx_user_trades (user_id, evaluated_at)
-            )
-            """)
-            
-            # Create user_sessions table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_sessions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id INT NOT NULL,
-                topic VARCHAR(255) NOT NULL,
-                current_step INT DEFAULT 1,
-                start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                is_completed BOOLEAN DEFAULT FALSE,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                INDEX idx_user_sessions (user_id, is_completed)
-            )
-            """)
-            
-            # Insert sample user for testing
-            cursor.execute("""
-            INSERT IGNORE INTO users (username, email, password_hash, first_name, last_name) 
-            VALUES ('testuser', 'test@finalearn.com', 'dummy_hash', 'Test', 'User')
-            """)
-            
-            connection.commit()
-            logger.info("Database tables initialized successfully")
+            with self.connection() as connection:
+                applied = run_migrations(connection)
+            if applied:
+                logger.info(f"Applied schema migrations {applied}")
+            else:
+                logger.info("Database schema is up to date")
             return True
-            
         except Error as e:
             logger.error(f"Error initializing database: {e}")
             return False
-        finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
 
 
 # Global database manager instance
@@ -0,0 +1,75 @@
+# app/utils/deadline.py
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Absolute time.monotonic() deadline for the current request, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None if there is none"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def bounded(timeout: Optional[float]) -> Optional[float]:
+    """The smaller of ``timeout`` and the time left on the current deadline"""
+    left = remaining()
+    if left is None:
+        return timeout
+    if timeout is None:
+        return left
+    return min(timeout, left)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Set a deadline ``seconds`` from now; an earlier enclosing deadline wins"""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class DeadlineMiddleware:
+    """ASGI middleware setting a per-request deadline.
+
+    Clients may shorten it with a ``header`` carrying a timeout in seconds;
+    ``default`` applies otherwise (None or 0 for no deadline).
+    """
+
+    def __init__(self, app, default: Optional[float] = None, header: str = "x-request-timeout"):
+        self.app = app
+        self.default = default or None
+        self.header = header.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seconds = self.default
+        for name, value in scope.get("headers", []):
+            if name == self.header:
+                try:
+                    requested = float(value)
+                except ValueError:
+                    break
+                if requested > 0:
+                    seconds = min(seconds, requested) if seconds else requested
+                break
+
+        with deadline_scope(seconds):
+            await self.app(scope, receive, send)
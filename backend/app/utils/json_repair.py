@@ -0,0 +1,171 @@
+# app/utils/json_repair.py
+"""Tolerant extraction of a JSON value from LLM output.
+
+Models sometimes wrap their JSON in markdown fences, add a sentence before
+or after it, or stop mid-document when they hit the output token limit.
+``extract_json`` handles all three: it strips fences, takes the outermost
+JSON value and ignores surrounding text, and closes off a truncated value
+at the last complete element.
+"""
+import json
+import re
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+_LEADING_FENCE = re.compile(r"^\s*```[\w-]*[ \t]*\r?\n?")
+_TRAILING_FENCE = re.compile(r"\r?\n?[ \t]*```\s*$")
+_CLOSERS = {"{": "}", "[": "]"}
+_DELIMITERS = ",}] \t\r\n"
+# Opening brackets tried as the start of the value before giving up
+_MAX_STARTS = 16
+
+
+class JSONExtractionError(ValueError):
+    """No usable JSON value in the text.
+
+    ``truncated`` is set when the text ended inside the value, i.e. more
+    output would likely have completed it. ``partial`` holds the value
+    closed off at its last complete element, when that was usable.
+    """
+
+    def __init__(self, message: str, truncated: bool = False, partial: Any = None):
+        super().__init__(message)
+        self.truncated = truncated
+        self.partial = partial
+
+
+class Extracted(NamedTuple):
+    value: Any
+    # "clean": the text was plain JSON; "extracted": fences or surrounding
+    # text were dropped; "repaired": a truncated value was closed off
+    status: str
+
+
+def strip_fences(text: str) -> str:
+    """Remove a leading and/or trailing markdown code fence"""
+    return _TRAILING_FENCE.sub("", _LEADING_FENCE.sub("", text, count=1), count=1)
+
+
+class _Scan(NamedTuple):
+    end: Optional[int]           # index after the value, if it is complete
+    safe: Tuple[int, str]        # last cut point and the closers it needs
+    malformed: bool
+
+
+def _scan(text: str, start: int) -> _Scan:
+    """Walk the JSON value opening at ``text[start]``.
+
+    Tracks, for each open container, what may come next, and remembers the
+    last position where the value could be cut and closed into valid JSON:
+    right after an opening bracket or after a complete element.
+    """
+    # Each entry is [bracket, expecting]; expecting is one of
+    # "key", "colon", "value" or "comma"
+    stack: List[list] = [[text[start], "key" if text[start] == "{" else "value"]]
+
+    def closers() -> str:
+        return "".join(_CLOSERS[bracket] for bracket, _ in reversed(stack))
+
+    safe = (start + 1, closers())
+    in_string = False
+    escape = False
+    i = start + 1
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        top = stack[-1]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if top[1] == "key":
+                    top[1] = "colon"
+                else:
+                    top[1] = "comma"
+                    safe = (i + 1, closers())
+        elif ch in " \t\r\n":
+            pass
+        elif ch == '"':
+            if top[1] not in ("key", "value"):
+                return _Scan(None, safe, True)
+            in_string = True
+        elif ch in "{[":
+            if top[1] != "value":
+                return _Scan(None, safe, True)
+            top[1] = "comma"
+            stack.append([ch, "key" if ch == "{" else "value"])
+            safe = (i + 1, closers())
+        elif ch in "}]":
+            # An object cannot close between a key and its value
+            if _CLOSERS[top[0]] != ch or (top[0] == "{" and top[1] in ("colon", "value")):
+                return _Scan(None, safe, True)
+            stack.pop()
+            if not stack:
+                return _Scan(i + 1, safe, False)
+            safe = (i + 1, closers())
+        elif ch == ":":
+            if top[1] != "colon":
+                return _Scan(None, safe, True)
+            top[1] = "value"
+        elif ch == ",":
+            if top[1] != "comma":
+                return _Scan(None, safe, True)
+            top[1] = "key" if top[0] == "{" else "value"
+        else:
+            # Scalar: number, true, false or null
+            if top[1] != "value":
+                return _Scan(None, safe, True)
+            j = i
+            while j < n and text[j] not in _DELIMITERS:
+                j += 1
+            if j == n:
+                break  # may have been cut short
+            try:
+                json.loads(text[i:j])
+            except ValueError:
+                return _Scan(None, safe, True)
+            top[1] = "comma"
+            safe = (j, closers())
+            i = j
+            continue
+        i += 1
+    return _Scan(None, safe, False)
+
+
+def extract_json(text: str) -> Extracted:
+    """The outermost JSON object or array in ``text``.
+
+    Each ``{`` or ``[`` is tried in turn as the start of the value (up to
+    ``_MAX_STARTS`` of them), so brackets in a sentence before the JSON are
+    skipped. Raises JSONExtractionError when there is no value, or when a
+    truncated value cannot be closed off.
+    """
+    body = strip_fences(text)
+    try:
+        return Extracted(json.loads(body), "clean" if body == text else "extracted")
+    except ValueError:
+        pass
+
+    starts = [i for i, ch in enumerate(body) if ch in _CLOSERS][:_MAX_STARTS]
+    if not starts:
+        raise JSONExtractionError("No JSON object or array found")
+
+    for start in starts:
+        scan = _scan(body, start)
+        if scan.end is not None:
+            try:
+                return Extracted(json.loads(body[start:scan.end]), "extracted")
+            except ValueError:
+                continue
+        if scan.malformed:
+            continue
+
+        # Ran off the end of the text: the value was cut short
+        cut, closers = scan.safe
+        try:
+            return Extracted(json.loads(body[start:cut] + closers), "repaired")
+        except ValueError as e:
+            raise JSONExtractionError(f"Truncated JSON could not be repaired: {e}", truncated=True)
+    raise JSONExtractionError("Malformed JSON")
@@ -0,0 +1,67 @@
+# app/utils/json_stream.py
+import json
+from typing import Any, List
+
+
+class ArrayItemStreamer:
+    """Incrementally pull complete items out of a JSON array as text arrives.
+
+    Feed chunks of a JSON object such as ``{"topic": ..., "steps": [{...}, ...]}``
+    and get back each object in the ``array_key`` array as soon as its closing
+    brace has been seen, without waiting for the rest of the document. Text
+    outside the top-level object (e.g. markdown fences) is ignored.
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_key = None
+        self._array_depth = None
+        self._item_start = -1
+
+    def feed(self, text: str) -> List[Any]:
+        """Consume a chunk and return the array items completed by it"""
+        self.buffer += text
+        items = []
+        buf = self.buffer
+        for i in range(self._pos, len(buf)):
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = buf[self._string_start + 1:i]
+                continue
+
+            if ch == '"':
+                if self._depth > 0:
+                    self._in_string = True
+                    self._string_start = i
+            elif ch in "{[":
+                if ch == "[" and self._depth == 1 and self._last_key == self.array_key:
+                    self._array_depth = self._depth + 1
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth:
+                    self._item_start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0:
+                    continue
+                self._depth -= 1
+                if ch == "}" and self._item_start >= 0 and self._depth == self._array_depth:
+                    items.append(json.loads(buf[self._item_start:i + 1]))
+                    self._item_start = -1
+                elif ch == "]" and self._array_depth is not None and self._depth == self._array_depth - 1:
+                    self._array_depth = None
+            elif ch == "," and self._depth == 1:
+                self._last_key = None
+        self._pos = len(buf)
+        return items
@@ -0,0 +1,335 @@
+# app/utils/migrations.py
+"""Versioned schema migrations.
+
+Applied versions are recorded in ``schema_migrations``. When the schema is
+current, startup costs one ``SELECT``; otherwise pending migrations run in
+order under a MySQL named lock, so concurrently booting workers apply each
+migration once. MySQL commits DDL implicitly, so every migration must be
+safe to re-run if a worker dies halfway through one.
+"""
+import logging
+from typing import Any, Callable, List, NamedTuple, Optional
+from mysql.connector import Error, errorcode
+from app.utils.progress_summary import rebuild_summaries
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_LOCK = "finalearn_schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 60
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Any], None]
+
+
+def _initial_schema(cursor) -> None:
+    """Tables, indexes and seed data as created by earlier releases"""
+    # Create users table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(255) UNIQUE NOT NULL,
+        email VARCHAR(255) UNIQUE NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        first_name VARCHAR(100),
+        last_name VARCHAR(100),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """)
+
+    # Create lesson_plans table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS lesson_plans (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT,
+        module VARCHAR(255) NOT NULL,
+        duration VARCHAR(50) NOT NULL,
+        plan_data JSON NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL,
+        INDEX idx_module (module),
+        INDEX idx_user_module (user_id, module)
+    )
+    """)
+
+    # Create user_progress table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS user_progress (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        module VARCHAR(255) NOT NULL,
+        week INT NOT NULL,
+        day INT NOT NULL,
+        topic VARCHAR(255) NOT NULL,
+        lesson_completed BOOLEAN DEFAULT FALSE,
+        quiz_score INT DEFAULT NULL,
+        time_spent INT DEFAULT NULL,
+        completed_at TIMESTAMP NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        UNIQUE KEY unique_user_lesson (user_id, module, week, day),
+        INDEX idx_user_progress (user_id, module),
+        INDEX idx_user_week_day (user_id, week, day),
+        INDEX idx_completion (lesson_completed, completed_at)
+    )
+    """)
+
+    # Create lesson_content table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS lesson_content (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        topic VARCHAR(255) NOT NULL,
+        content JSON NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_topic (topic)
+    )
+    """)
+
+    # Create chart_tasks table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS chart_tasks (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        topic VARCHAR(255) NOT NULL,
+        tasks JSON NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_topic (topic)
+    )
+    """)
+
+    # Create assessments table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS assessments (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        module VARCHAR(255) NOT NULL,
+        assessment_data JSON NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_module (module)
+    )
+    """)
+
+    # Create versioned content store: one row per distinct content body
+    # per key, plus a pointer to each key's latest version
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS content_versions (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        kind VARCHAR(32) NOT NULL,
+        content_key VARCHAR(255) NOT NULL,
+        version INT NOT NULL,
+        content_hash CHAR(64) NOT NULL,
+        body JSON NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY unique_content_hash (kind, content_key, content_hash),
+        UNIQUE KEY unique_content_version (kind, content_key, version)
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS content_latest (
+        kind VARCHAR(32) NOT NULL,
+        content_key VARCHAR(255) NOT NULL,
+        content_id INT NOT NULL,
+        version INT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (kind, content_key)
+    )
+    """)
+
+    # Create quiz_responses table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS quiz_responses (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        topic VARCHAR(255) NOT NULL,
+        question_index INT NOT NULL,
+        user_answer VARCHAR(500) NOT NULL,
+        correct_answer VARCHAR(500) NOT NULL,
+        is_correct BOOLEAN NOT NULL,
+        responded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        INDEX idx_user_quiz (user_id, topic)
+    )
+    """)
+
+    # Create trade_evaluations table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS trade_evaluations (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        pair VARCHAR(10) NOT NULL,
+        direction ENUM('buy', 'sell') NOT NULL,
+        stop_loss DECIMAL(10, 5) NOT NULL,
+        take_profit DECIMAL(10, 5) NOT NULL,
+        reason TEXT NOT NULL,
+        score INT NOT NULL,
+        risk_level ENUM('low', 'medium', 'high') NOT NULL,
+        feedback TEXT NOT NULL,
+        improvements JSON NOT NULL,
+        evaluated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        INDEX idx_user_trades (user_id, evaluated_at)
+    )
+    """)
+
+    # Create user_sessions table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS user_sessions (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        topic VARCHAR(255) NOT NULL,
+        current_step INT DEFAULT 1,
+        start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        is_completed BOOLEAN DEFAULT FALSE,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        INDEX idx_user_sessions (user_id, is_completed)
+    )
+    """)
+
+    # Insert sample user for testing
+    cursor.execute("""
+    INSERT IGNORE INTO users (username, email, password_hash, first_name, last_name) 
+    VALUES ('testuser', 'test@finalearn.com', 'dummy_hash', 'Test', 'User')
+    """)
+
+
+def _index_exists(cursor, table: str, index: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+
+def _add_progress_week_day_index(cursor) -> None:
+    """Index for ordered, paginated progress reads on databases created before it existed"""
+    if not _index_exists(cursor, "user_progress", "idx_user_week_day"):
+        cursor.execute("CREATE INDEX idx_user_week_day ON user_progress (user_id, week, day)")
+
+
+def _column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+
+def _add_session_upsert_key(cursor) -> None:
+    """One user_sessions row per (user_id, topic), so heartbeat flushes can upsert"""
+    if not _column_exists(cursor, "user_sessions", "active_seconds"):
+        cursor.execute(
+            "ALTER TABLE user_sessions ADD COLUMN active_seconds INT NOT NULL DEFAULT 0 AFTER last_activity"
+        )
+    if not _index_exists(cursor, "user_sessions", "unique_user_topic"):
+        # Keep the most recent row of any duplicates
+        cursor.execute("""
+            DELETE older FROM user_sessions older
+            JOIN user_sessions newer
+              ON newer.user_id = older.user_id AND newer.topic = older.topic AND newer.id > older.id
+        """)
+        cursor.execute("ALTER TABLE user_sessions ADD UNIQUE KEY unique_user_topic (user_id, topic)")
+
+
+def _add_progress_summaries(cursor) -> None:
+    """Incrementally maintained analytics tables, backfilled from user_progress"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS progress_day_summary (
+        module VARCHAR(255) NOT NULL,
+        week INT NOT NULL,
+        day INT NOT NULL,
+        lessons INT NOT NULL DEFAULT 0,
+        completed INT NOT NULL DEFAULT 0,
+        quiz_score_total BIGINT NOT NULL DEFAULT 0,
+        quiz_score_count INT NOT NULL DEFAULT 0,
+        time_spent_total BIGINT NOT NULL DEFAULT 0,
+        time_spent_count INT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (module, week, day)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS progress_user_summary (
+        user_id INT NOT NULL,
+        module VARCHAR(255) NOT NULL,
+        lessons INT NOT NULL DEFAULT 0,
+        completed INT NOT NULL DEFAULT 0,
+        quiz_score_total BIGINT NOT NULL DEFAULT 0,
+        quiz_score_count INT NOT NULL DEFAULT 0,
+        time_spent_total BIGINT NOT NULL DEFAULT 0,
+        time_spent_count INT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (user_id, module),
+        INDEX idx_module_user (module, user_id)
+    )
+    """)
+    rebuild_summaries(cursor)
+
+
+def _add_quiz_assessment_id(cursor) -> None:
+    """Record which assessment version each quiz answer was graded against"""
+    if not _column_exists(cursor, "quiz_responses", "assessment_id"):
+        cursor.execute("ALTER TABLE quiz_responses ADD COLUMN assessment_id INT NULL AFTER topic")
+    if not _index_exists(cursor, "quiz_responses", "idx_quiz_assessment"):
+        cursor.execute("CREATE INDEX idx_quiz_assessment ON quiz_responses (assessment_id)")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Initial schema", _initial_schema),
+    Migration(2, "Add user_progress (user_id, week, day) index", _add_progress_week_day_index),
+    Migration(3, "Add user_sessions active time and (user_id, topic) key", _add_session_upsert_key),
+    Migration(4, "Add progress analytics summary tables", _add_progress_summaries),
+    Migration(5, "Add quiz_responses assessment version", _add_quiz_assessment_id),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(cursor) -> Optional[int]:
+    """Highest applied version, 0 if none, or None if the table does not exist yet"""
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_migrations")
+    except Error as e:
+        if e.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+    return cursor.fetchone()[0] or 0
+
+
+def run_migrations(connection) -> List[int]:
+    """Apply pending migrations; returns the versions applied (empty when current)"""
+    with connection.cursor() as cursor:
+        if current_version(cursor) == LATEST_VERSION:
+            return []
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK, MIGRATION_LOCK_TIMEOUT))
+        if cursor.fetchone()[0] != 1:
+            raise Error(msg="Timed out waiting for the schema migration lock")
+        try:
+            applied = []
+            version = current_version(cursor) or 0
+            for migration in MIGRATIONS:
+                if migration.version <= version:
+                    continue
+                logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+                migration.apply(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (migration.version, migration.description)
+                )
+                connection.commit()
+                applied.append(migration.version)
+            return applied
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+            cursor.fetchone()
@@ -0,0 +1,104 @@
+# app/utils/progress_summary.py
+"""Summary tables derived from ``user_progress``.
+
+``progress_day_summary`` (per module/week/day) and ``progress_user_summary``
+(per user/module) hold counts and sums, so dashboard reads touch summary
+rows only. Progress writes pass each record's previous and new state to
+``apply_progress_changes`` inside their own transaction, which adds the
+difference to the summaries; ``rebuild_summaries`` recomputes both tables
+from ``user_progress`` for backfills.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# (lesson_completed, quiz_score, time_spent), as compared by ProgressService
+ProgressState = Tuple[bool, Optional[int], Optional[int]]
+
+# A progress record's key (user_id, module, week, day), its stored state
+# before the write (None if it is new) and its state after the write
+ProgressChange = Tuple[Tuple, Optional[ProgressState], ProgressState]
+
+# Counter columns shared by both summary tables
+SUMMARY_COLUMNS = (
+    "lessons", "completed", "quiz_score_total", "quiz_score_count",
+    "time_spent_total", "time_spent_count"
+)
+
+_AGGREGATES = """
+    COUNT(*), COALESCE(SUM(lesson_completed), 0),
+    COALESCE(SUM(quiz_score), 0), COUNT(quiz_score),
+    COALESCE(SUM(time_spent), 0), COUNT(time_spent)
+"""
+
+
+def _counters(state: Optional[ProgressState]) -> Tuple[int, ...]:
+    """One record's contribution to the summary counters"""
+    if state is None:
+        return (0,) * len(SUMMARY_COLUMNS)
+    completed, quiz_score, time_spent = state
+    return (
+        1, int(bool(completed)),
+        quiz_score or 0, int(quiz_score is not None),
+        time_spent or 0, int(time_spent is not None),
+    )
+
+
+def summary_deltas(changes: Sequence[ProgressChange]) -> Tuple[Dict[Tuple, List[int]], Dict[Tuple, List[int]]]:
+    """Counter deltas per (module, week, day) and per (user_id, module); all-zero deltas are dropped"""
+    days: Dict[Tuple, List[int]] = defaultdict(lambda: [0] * len(SUMMARY_COLUMNS))
+    users: Dict[Tuple, List[int]] = defaultdict(lambda: [0] * len(SUMMARY_COLUMNS))
+    for (user_id, module, week, day), previous, current in changes:
+        delta = [new - old for new, old in zip(_counters(current), _counters(previous))]
+        if not any(delta):
+            continue
+        for totals in (days[(module, week, day)], users[(str(user_id), module)]):
+            for index, value in enumerate(delta):
+                totals[index] += value
+    return (
+        {key: totals for key, totals in days.items() if any(totals)},
+        {key: totals for key, totals in users.items() if any(totals)},
+    )
+
+
+def _upsert(cursor, table: str, key_columns: Tuple[str, ...], deltas: Dict[Tuple, List[int]],
+            max_rows: int) -> None:
+    columns = key_columns + SUMMARY_COLUMNS
+    row_placeholder = f"({', '.join(['%s'] * len(columns))})"
+    updates = ", ".join(f"{column} = {column} + VALUES({column})" for column in SUMMARY_COLUMNS)
+    # Sorted so concurrent writers lock summary rows in the same order
+    rows = [(*key, *totals) for key, totals in sorted(deltas.items())]
+    for start in range(0, len(rows), max_rows):
+        chunk = rows[start:start + max_rows]
+        cursor.execute(f"""
+            INSERT INTO {table} ({', '.join(columns)})
+            VALUES {', '.join([row_placeholder] * len(chunk))}
+            ON DUPLICATE KEY UPDATE {updates}
+        """, [value for row in chunk for value in row])
+
+
+def apply_progress_changes(cursor, changes: Sequence[ProgressChange], max_rows: int = 500) -> None:
+    """Add the effect of ``changes`` to both summary tables; run in the writer's transaction"""
+    days, users = summary_deltas(changes)
+    if days:
+        _upsert(cursor, "progress_day_summary", ("module", "week", "day"), days, max_rows)
+    if users:
+        _upsert(cursor, "progress_user_summary", ("user_id", "module"), users, max_rows)
+
+
+def rebuild_summaries(cursor) -> Tuple[int, int]:
+    """Recompute both summary tables from ``user_progress``; returns their row counts"""
+    columns = ", ".join(SUMMARY_COLUMNS)
+    cursor.execute("DELETE FROM progress_day_summary")
+    cursor.execute(f"""
+        INSERT INTO progress_day_summary (module, week, day, {columns})
+        SELECT module, week, day, {_AGGREGATES}
+        FROM user_progress GROUP BY module, week, day
+    """)
+    days = cursor.rowcount
+    cursor.execute("DELETE FROM progress_user_summary")
+    cursor.execute(f"""
+        INSERT INTO progress_user_summary (user_id, module, {columns})
+        SELECT user_id, module, {_AGGREGATES}
+        FROM user_progress GROUP BY user_id, module
+    """)
+    return days, cursor.rowcount
@@ -0,0 +1,29 @@
+# app/utils/rate_limit.py
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """Token bucket limiting how often an operation may start.
+
+    ``rate_per_minute`` tokens are refilled continuously, up to ``burst``.
+    ``acquire`` waits until a token is available.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
@@ -0,0 +1,43 @@
+# app/utils/serialization.py
+"""JSON encoding for responses and stored content.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise; both produce compact UTF-8 JSON.
+"""
+import json
+from typing import Any, Union
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON for ``value``"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_text(value: Any) -> str:
+    return dumps(value).decode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Response for a body that is already serialized JSON; sent as-is"""
+    media_type = "application/json"
@@ -0,0 +1,118 @@
+# app/utils/singleflight.py
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key onto one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task. The work runs as its own task, so a
+    cancelled caller (e.g. a disconnected client) does not cancel it for the
+    others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+
+class _Broadcast:
+    """Items produced so far by one coalesced stream"""
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        # Wake everyone waiting on the current event; later waits use a new one
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class StreamFlight:
+    """Coalesce concurrent streams that share a key onto one producer.
+
+    The first caller for a key iterates ``fn()`` in its own task and records
+    every item; callers arriving while it runs replay the recorded items,
+    then follow the new ones as they come. As with ``SingleFlight``, a
+    cancelled caller does not stop the stream for the others, and an error
+    raised by the producer is raised in every caller after the items that
+    preceded it.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, _Broadcast] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        broadcast = self._inflight.get(key)
+        if broadcast is None:
+            broadcast = self._inflight[key] = _Broadcast()
+            broadcast.task = asyncio.ensure_future(self._produce(key, broadcast, fn))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        index = 0
+        while True:
+            while index < len(broadcast.items):
+                yield broadcast.items[index]
+                index += 1
+            if broadcast.done:
+                if broadcast.error is not None:
+                    raise broadcast.error
+                return
+            await broadcast.changed.wait()
+
+    async def _produce(self, key: str, broadcast: _Broadcast, fn: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async for item in fn():
+                broadcast.items.append(item)
+                broadcast.notify()
+        except asyncio.CancelledError:
+            broadcast.error = RuntimeError(f"Stream {key!r} was cancelled")
+            raise
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            broadcast.done = True
+            broadcast.notify()
+            if self._inflight.get(key) is broadcast:
+                del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
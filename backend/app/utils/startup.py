@@ -0,0 +1,49 @@
+# app/utils/startup.py
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Boot time broken down by phase.
+
+    ``phases`` covers the work done before the app serves requests; ``lazy``
+    holds one-off initializations deferred to first use (e.g. Gemini).
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.lazy: Dict[str, float] = {}
+        self.completed_at: Optional[float] = None
+
+    def record(self, name: str, seconds: float, lazy: bool = False) -> None:
+        (self.lazy if lazy else self.phases)[name] = seconds
+
+    @contextmanager
+    def phase(self, name: str, lazy: bool = False):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, lazy)
+
+    def finish(self) -> None:
+        """Mark startup complete and log the breakdown"""
+        self.completed_at = time.time()
+        breakdown = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items())
+        logger.info(f"Startup completed in {sum(self.phases.values()) * 1000:.0f}ms ({breakdown})")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total_ms": round(sum(self.phases.values()) * 1000, 2),
+            "phases_ms": {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()},
+            "lazy_ms": {name: round(seconds * 1000, 2) for name, seconds in self.lazy.items()},
+            "completed_at": self.completed_at,
+        }
+
+
+# Global startup report instance
+startup_report = StartupReport()
@@ -0,0 +1,194 @@
+# app/utils/topic_index.py
+"""Near-duplicate matching for free-text topics.
+
+Topics are normalized (case-folded, punctuation, plural "s" and common
+stopwords dropped, words sorted, so word order does not matter), split into
+character n-grams and compared by TF-IDF cosine similarity. An inverted
+index from n-gram to topics limits scoring to topics sharing n-grams with
+the query, and rare n-grams are visited first so topics that could not
+reach the threshold are never scored. Topics whose numbers differ ("week 1
+review" and "week 2 review") never match, however similar the rest is.
+"""
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+
+_WORD = re.compile(r"[^\W_]+")
+
+STOPWORDS = frozenset((
+    "a", "about", "an", "and", "are", "as", "at", "by", "for", "from", "how", "in",
+    "into", "is", "of", "on", "or", "the", "to", "what", "with",
+))
+
+# Norms are recomputed once the topic count drifts this far from the count
+# their IDF weights were computed with
+NORM_REFRESH_RATIO = 0.1
+
+
+def _singular(word: str) -> str:
+    """Drop a plural "s" ("markets" -> "market"), leaving "ss" endings and short words alone"""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize_topic(text: str) -> str:
+    """Case-folded, singular words of ``text`` without stopwords, sorted"""
+    words = _WORD.findall(text.casefold())
+    kept = [word for word in words if word not in STOPWORDS]
+    return " ".join(sorted(_singular(word) for word in kept or words))
+
+
+def topic_ngrams(text: str, n: int = 3) -> Counter:
+    """Character n-gram counts of a normalized topic, per word with boundary padding"""
+    grams: Counter = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        if len(padded) <= n:
+            grams[padded] += 1
+            continue
+        for i in range(len(padded) - n + 1):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+
+def topic_numbers(text: str) -> FrozenSet[str]:
+    """Words of a normalized topic that contain a digit"""
+    return frozenset(word for word in text.split() if any(ch.isdigit() for ch in word))
+
+
+class TopicMatch(NamedTuple):
+    key: str
+    score: float
+
+
+class TopicIndex:
+    """Incremental TF-IDF index of topics, keyed by their content store key.
+
+    ``add`` and ``remove`` may be called from any thread.
+    """
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self._grams: Dict[str, Counter] = {}
+        self._numbers: Dict[str, FrozenSet[str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._norms: Dict[str, float] = {}
+        self._norm_docs = 0
+        self._lock = threading.Lock()
+        self.searches = 0
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._grams
+
+    def add(self, key: str, text: Optional[str] = None) -> None:
+        """Index ``text`` (the key itself by default) under ``key``"""
+        normalized = normalize_topic(key if text is None else text)
+        grams = topic_ngrams(normalized, self.n)
+        if not grams:
+            return
+        with self._lock:
+            if key in self._grams:
+                self._remove(key)
+            self._grams[key] = grams
+            self._numbers[key] = topic_numbers(normalized)
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(key)
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            if key in self._grams:
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        del self._numbers[key]
+        for gram in self._grams.pop(key):
+            postings = self._postings[gram]
+            postings.discard(key)
+            if not postings:
+                del self._postings[gram]
+        self._norms.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._grams.clear()
+            self._numbers.clear()
+            self._postings.clear()
+            self._norms.clear()
+
+    def _idf(self, gram: str) -> float:
+        return math.log((1 + len(self._grams)) / (1 + len(self._postings.get(gram, ())))) + 1
+
+    def _norm(self, key: str) -> float:
+        norm = self._norms.get(key)
+        if norm is None:
+            norm = math.sqrt(sum((tf * self._idf(gram)) ** 2 for gram, tf in self._grams[key].items()))
+            self._norms[key] = norm
+        return norm
+
+    def search(self, text: str, threshold: float = 0.0, exclude: Optional[str] = None,
+               limit: int = 1) -> List[TopicMatch]:
+        """Indexed topics most similar to ``text`` with a score of at least ``threshold``, best first"""
+        normalized = normalize_topic(text)
+        query = topic_ngrams(normalized, self.n)
+        numbers = topic_numbers(normalized)
+        if not query:
+            return []
+        with self._lock:
+            self.searches += 1
+            docs = len(self._grams)
+            if abs(docs - self._norm_docs) > NORM_REFRESH_RATIO * self._norm_docs:
+                self._norms.clear()
+                self._norm_docs = docs
+
+            weights = sorted(
+                ((gram, tf * self._idf(gram)) for gram, tf in query.items()), key=lambda item: -item[1]
+            )
+            query_norm = math.sqrt(sum(w * w for _, w in weights))
+            # A topic sharing only the n-grams from here on scores at most
+            # |remaining query weights| / |query|; once that is below the
+            # threshold, later n-grams only add to existing candidates
+            remaining = query_norm * query_norm
+            dots: Dict[str, float] = {}
+            for gram, weight in weights:
+                admit = math.sqrt(max(remaining, 0.0)) >= threshold * query_norm
+                remaining -= weight * weight
+                postings = self._postings.get(gram)
+                if not postings:
+                    continue
+                weight *= self._idf(gram)
+                if admit:
+                    for key in postings:
+                        dots[key] = dots.get(key, 0.0) + weight * self._grams[key][gram]
+                elif len(postings) < len(dots):
+                    for key in postings:
+                        if key in dots:
+                            dots[key] += weight * self._grams[key][gram]
+                else:
+                    for key in dots:
+                        tf = self._grams[key].get(gram)
+                        if tf:
+                            dots[key] += weight * tf
+            dots.pop(exclude, None)
+
+            matches = []
+            for key, dot in dots.items():
+                if self._numbers[key] != numbers:
+                    continue
+                score = min(1.0, dot / (query_norm * self._norm(key)))
+                if score >= threshold:
+                    matches.append(TopicMatch(key, round(score, 4)))
+        matches.sort(key=lambda match: (-match.score, match.key))
+        return matches[:limit]
+
+    def stats(self) -> Dict[str, int]:
+        return {"topics": len(self._grams), "ngrams": len(self._postings), "searches": self.searches}
@@ -0,0 +1,87 @@
+# benchmarks/fake_gemini.py
+"""Latency-configurable stand-in for the Gemini model.
+
+Responses are the service's own mock payloads, returned after a simulated
+model delay, so every code path after the model call runs for real.
+"""
+import asyncio
+import json
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+
+class FakeResponse:
+    def __init__(self, text: str, prompt: str):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=len(prompt) // 4,
+            candidates_token_count=len(text) // 4,
+            cached_content_token_count=0,
+        )
+
+
+class FakeStream:
+    """Async-iterable response yielding the text in small chunks"""
+
+    def __init__(self, text: str, prompt: str, chunk_size: int, chunk_delay: float):
+        self._text = text
+        self._chunk_size = chunk_size
+        self._chunk_delay = chunk_delay
+        self.usage_metadata = FakeResponse(text, prompt).usage_metadata
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for i in range(0, len(self._text), self._chunk_size):
+            await asyncio.sleep(self._chunk_delay)
+            yield SimpleNamespace(text=self._text[i:i + self._chunk_size])
+
+
+class FakeGeminiModel:
+    """Mimics the parts of ``genai.GenerativeModel`` that AIService uses"""
+
+    def __init__(self, ai_service, latency: float = 0.5, jitter: float = 0.1,
+                 system_instruction: Optional[str] = None, chunk_size: int = 64):
+        self.ai_service = ai_service
+        self.latency = latency
+        self.jitter = jitter
+        self.system_instruction = system_instruction
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    def _delay(self) -> float:
+        return max(0.0, random.gauss(self.latency, self.jitter))
+
+    def _respond(self, prompt: str) -> str:
+        self.calls += 1
+        payload: Dict[str, Any] = json.loads(prompt.split("USER_INPUT:\n", 1)[1])
+        return json.dumps(self.ai_service._get_mock_response(payload))
+
+    def generate_content(self, prompt: str, generation_config=None, stream: bool = False):
+        time.sleep(self._delay())
+        return FakeResponse(self._respond(prompt), prompt)
+
+    async def generate_content_async(self, prompt: str, generation_config=None, stream: bool = False):
+        text = self._respond(prompt)
+        if stream:
+            chunks = max(1, len(text) // self.chunk_size)
+            return FakeStream(text, prompt, self.chunk_size, self._delay() / chunks)
+        await asyncio.sleep(self._delay())
+        return FakeResponse(text, prompt)
+
+    def count_tokens(self, contents: Any):
+        return SimpleNamespace(total_tokens=len(str(contents)) // 4)
+
+
+def install_fake_gemini(ai_service, latency: float = 0.5, jitter: float = 0.1) -> None:
+    """Point ``ai_service`` at fake models with the given latency (seconds)"""
+    ai_service._create_model = lambda system_instruction=None: FakeGeminiModel(
+        ai_service, latency, jitter, system_instruction
+    )
+    ai_service.action_models.clear()
+    ai_service.model = ai_service._create_model()
+    # Import the Gemini client now rather than inside the first timed request
+    ai_service._generation_config()
@@ -0,0 +1,235 @@
+# benchmarks/loadgen.py
+"""Scripted load generator for the FinaLearn backend.
+
+By default the app runs in-process with a fake Gemini model and a SQLite
+stand-in database, so numbers reflect the backend itself. Pass
+``--base-url`` to drive a running server instead.
+
+Usage:
+    python -m benchmarks.loadgen --concurrency 1,8,32 --requests 200 \\
+        --gemini-latency 0.5 --unique 20 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import httpx
+import numpy as np
+
+
+# Module whose stored assessment the quiz_submit scenario grades against
+QUIZ_MODULE = "Benchmark quiz module"
+
+
+class Scenario(NamedTuple):
+    method: str
+    path: Callable[[int], str]
+    body: Callable[[int], Optional[Dict[str, Any]]]
+
+
+def _trades(i: int) -> List[Dict[str, Any]]:
+    return [
+        {"pair": "XAUUSD", "direction": "buy", "stop_loss": 1900 + k, "take_profit": 2000 + k,
+         "entry_price": 1950 + k, "reason": f"trend continuation {i}"}
+        for k in range(10)
+    ]
+
+
+def _answer_sheets(i: int, students: int = 500) -> List[Dict[str, Any]]:
+    choices = ["Store of value", "Fall", "Copper demand", "B", "a", None]
+    return [
+        {"user_id": str(1 + k % 50), "answers": [choices[(i + k + q) % len(choices)] for q in range(3)]}
+        for k in range(students)
+    ]
+
+
+def build_scenarios(unique: int) -> Dict[str, Scenario]:
+    """One scenario per route; ``unique`` bounds distinct topics/modules/users"""
+    def topic(i: int) -> str:
+        return f"Benchmark topic {i % unique}"
+
+    def module(i: int) -> str:
+        return f"Benchmark module {i % unique}"
+
+    return {
+        "lesson_plan": Scenario("POST", lambda i: "/api/generate/lesson-plan",
+                                lambda i: {"module": module(i), "duration": "30d"}),
+        "lesson_content": Scenario("POST", lambda i: "/api/generate/lesson-content",
+                                   lambda i: {"topic": topic(i)}),
+        "lesson_content_stream": Scenario("POST", lambda i: "/api/generate/lesson-content/stream",
+                                          lambda i: {"topic": topic(i)}),
+        "chart_instructions": Scenario("POST", lambda i: "/api/generate/chart-instructions",
+                                       lambda i: {"topic": topic(i)}),
+        "assessment": Scenario("POST", lambda i: "/api/assessment",
+                               lambda i: {"module": module(i)}),
+        "evaluate_trade": Scenario("POST", lambda i: "/api/evaluate_trade",
+                                   lambda i: _trades(i)[0]),
+        "evaluate_trades": Scenario("POST", lambda i: "/api/evaluate_trades",
+                                    lambda i: {"user_id": "1", "trades": _trades(i)}),
+        "progress_decision": Scenario("POST", lambda i: "/api/progress_decision",
+                                      lambda i: {"lesson_scores": [70 + i % 30, 80, 90],
+                                                 "assessment_score": 85, "trade_score": 75}),
+        "progress_decisions": Scenario("POST", lambda i: "/api/progress_decisions",
+                                       lambda i: {"students": [
+                                           {"student_id": str(k), "lesson_scores": [60 + k % 40, 75],
+                                            "assessment_score": 70 + k % 30, "trade_score": 50 + k % 50}
+                                           for k in range(100)
+                                       ]}),
+        "update_user_progress": Scenario("POST", lambda i: "/api/user_progress",
+                                         lambda i: {"user_id": "1", "module": module(i), "week": 1 + i % 4,
+                                                    "day": 1 + i % 5, "lesson_completed": True,
+                                                    "quiz_score": 80, "time_spent": 1800}),
+        "update_user_progress_batch": Scenario("POST", lambda i: "/api/user_progress/batch",
+                                               lambda i: {"records": [
+                                                   {"user_id": str(1 + i % unique), "module": module(k),
+                                                    "week": 1 + k % 4, "day": 1 + k % 5, "lesson_completed": True,
+                                                    "quiz_score": 60 + (i + k) % 40, "time_spent": 1800}
+                                                   for k in range(100)
+                                               ]}),
+        "get_user_progress": Scenario("GET", lambda i: "/api/user_progress/1", lambda i: None),
+        "analytics_days": Scenario("GET", lambda i: f"/api/analytics/days?module=Benchmark+module+{i % unique}",
+                                   lambda i: None),
+        "quiz_submit": Scenario("POST", lambda i: "/api/quiz/submit",
+                                lambda i: {"module": QUIZ_MODULE, "sheets": _answer_sheets(i)}),
+        "session_heartbeat": Scenario("POST", lambda i: "/api/sessions/heartbeat",
+                                      lambda i: {"user_id": str(1 + i % 1000), "topic": topic(i),
+                                                 "step": 1 + i // 1000 % 10}),
+    }
+
+
+async def run_level(client: httpx.AsyncClient, name: str, scenario: Scenario,
+                    concurrency: int, total: int) -> Dict[str, Any]:
+    """Send ``total`` requests with ``concurrency`` workers; return latency stats"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, scenario.path(i), json=scenario.body(i))
+                await response.aread()
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    return {
+        "scenario": name,
+        "path": scenario.path(0),
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "mean_ms": round(float(ms.mean()), 2),
+        "req_per_s": round(total / elapsed, 2),
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    scenarios = build_scenarios(args.unique)
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    app = None
+    stand_in = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+    else:
+        # Must be set before the app (and its caches) is imported
+        os.environ["CACHE_BACKEND"] = args.cache_backend
+        if args.cache_backend == "sqlite":
+            os.environ["CACHE_SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "cache.sqlite3")
+        elif args.cache_backend == "redis":
+            from benchmarks.redis_stub import RedisStub
+            os.environ["CACHE_REDIS_URL"] = RedisStub(port=0).start().url
+
+        from benchmarks.fake_gemini import install_fake_gemini
+        from benchmarks.sqlite_db import SQLiteDatabaseManager
+        from app.main import app
+        from app.services.ai_service import ai_service
+        from app.utils.database import db_manager
+
+        install_fake_gemini(ai_service, args.gemini_latency, args.gemini_jitter)
+        stand_in = SQLiteDatabaseManager(args.db or os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+        stand_in.install(db_manager)
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                   base_url="http://bench", timeout=args.timeout)
+
+    results = []
+    try:
+        for name in selected:
+            for concurrency in levels:
+                if stand_in is not None and not args.warm:
+                    from app.services.content_service import content_service
+                    content_service.cache.clear()
+                    stand_in.reset_content()
+                if stand_in is not None and name == "quiz_submit":
+                    from app.services.ai_service import ai_service
+                    from app.services.progress_service import progress_service
+                    progress_service.save_assessment(QUIZ_MODULE, ai_service._get_mock_response(
+                        {"action": "assessment", "module": QUIZ_MODULE}
+                    ))
+                result = await run_level(client, name, scenarios[name], concurrency, args.requests)
+                print(json.dumps(result))
+                results.append(result)
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+
+    return {
+        "config": {
+            "target": args.base_url or "in-process",
+            "gemini_latency": None if args.base_url else args.gemini_latency,
+            "gemini_jitter": None if args.base_url else args.gemini_jitter,
+            "requests_per_level": args.requests,
+            "unique": args.unique,
+            "warm": args.warm,
+            "cache_backend": None if args.base_url else args.cache_backend,
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the FinaLearn backend")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per scenario and level")
+    parser.add_argument("--scenarios", help="Comma-separated scenario names (default: all)")
+    parser.add_argument("--unique", type=int, default=20, help="Distinct topics/modules per scenario")
+    parser.add_argument("--gemini-latency", type=float, default=0.5, help="Fake Gemini mean latency (s)")
+    parser.add_argument("--gemini-jitter", type=float, default=0.1, help="Fake Gemini latency stddev (s)")
+    parser.add_argument("--db", help="SQLite file for the stand-in database (default: temp file)")
+    parser.add_argument("--warm", action="store_true", help="Keep caches between levels")
+    parser.add_argument("--cache-backend", choices=("memory", "sqlite", "redis"), default="memory",
+                        help="Cache backend for the in-process app (redis runs against a local stub)")
+    parser.add_argument("--base-url", help="Drive a running server instead of the in-process app")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (s)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
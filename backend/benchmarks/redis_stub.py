@@ -0,0 +1,175 @@
+# benchmarks/redis_stub.py
+"""In-memory stand-in for a Redis server.
+
+Speaks enough of the Redis protocol (RESP) for the cache backend: PING,
+AUTH, SELECT, GET, SET (EX/PX), DEL, SCAN (MATCH without character
+classes), DBSIZE and FLUSHDB. Lets
+``CACHE_BACKEND=redis`` run against several local workers without a real
+server.
+
+Usage:
+    python -m benchmarks.redis_stub [--host 127.0.0.1] [--port 6379]
+
+or in-process::
+
+    stub = RedisStub(port=0)
+    stub.start()            # serves on a background thread
+    url = stub.url          # redis://127.0.0.1:<port>/0
+"""
+import argparse
+import asyncio
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(v) for v in value)
+    if isinstance(value, Exception):
+        return f"-ERR {value}\r\n".encode("utf-8")
+    return f"+{value}\r\n".encode("utf-8")
+
+
+def _glob(pattern: bytes) -> "re.Pattern[bytes]":
+    """Regex for a Redis MATCH pattern (``*``, ``?`` and backslash escapes)"""
+    parts = []
+    escaped = False
+    for char in pattern.decode("utf-8"):
+        if escaped:
+            parts.append(re.escape(char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "*":
+            parts.append(".*")
+        elif char == "?":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts).encode("utf-8") + rb"\Z", re.DOTALL)
+
+
+class RedisStub:
+    """Single-database key/value store served over RESP"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379):
+        self.host = host
+        self.port = port
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._ready = threading.Event()
+        self.commands = 0
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def execute(self, args: List[bytes]) -> Any:
+        self.commands += 1
+        command = args[0].upper().decode()
+        if command == "PING":
+            return "PONG"
+        if command in ("AUTH", "SELECT"):
+            return "OK"
+        if command == "GET":
+            return self._live(args[1])
+        if command == "SET":
+            expires_at = None
+            options = [a.upper() for a in args[3::2]]
+            for option, amount in zip(options, args[4::2]):
+                if option == b"EX":
+                    expires_at = time.monotonic() + int(amount)
+                elif option == b"PX":
+                    expires_at = time.monotonic() + int(amount) / 1000
+            self._data[args[1]] = (args[2], expires_at)
+            return "OK"
+        if command == "DEL":
+            return sum(self._live(k) is not None and self._data.pop(k) is not None for k in args[1:])
+        if command == "SCAN":
+            # Single pass over the whole keyspace; the cursor is always 0
+            pattern = b"*"
+            options = [a.upper() for a in args[2::2]]
+            for option, value in zip(options, args[3::2]):
+                if option == b"MATCH":
+                    pattern = value
+            matcher = _glob(pattern)
+            keys = [k for k in list(self._data) if self._live(k) is not None and matcher.match(k)]
+            return [b"0", keys]
+        if command == "DBSIZE":
+            return sum(self._live(k) is not None for k in list(self._data))
+        if command == "FLUSHDB":
+            self._data.clear()
+            return "OK"
+        return ValueError(f"unknown command '{command}'")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                args = []
+                for _ in range(int(header[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(_encode(self.execute(args)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    def start(self) -> "RedisStub":
+        """Serve on a daemon thread; ``port=0`` picks a free port"""
+        threading.Thread(target=lambda: asyncio.run(self.serve()), daemon=True).start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self) -> None:
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-memory Redis-protocol stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    stub = RedisStub(args.host, args.port)
+    print(f"Redis stub listening on {args.host}:{args.port}")
+    asyncio.run(stub.serve())
+
+
+if __name__ == "__main__":
+    main()
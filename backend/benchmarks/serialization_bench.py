@@ -0,0 +1,114 @@
+# benchmarks/serialization_bench.py
+"""Per-request CPU spent turning a cached lesson into a response.
+
+Compares, for a cache hit on ``/api/generate/lesson-content``:
+
+- ``validated_stdlib``: the previous path - the cached dict is validated
+  against the route's response_model, run through jsonable_encoder and
+  encoded with the standard library (FastAPI's default JSONResponse)
+- ``validated_fast``: the same, encoded with FastJSONResponse
+- ``preserialized``: the cached bytes sent as a RawJSONResponse (the
+  current path)
+
+and then times whole in-process requests against the route with a warm
+cache. Times are process CPU time, in microseconds per request.
+
+Usage:
+    python -m benchmarks.serialization_bench [--steps 12] [--iterations 2000]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+
+def make_lesson(steps: int) -> Dict[str, Any]:
+    """A lesson roughly the size of a real generated one"""
+    paragraph = ("Gold is often treated as a safe-haven asset: when equity markets fall or "
+                 "inflation expectations rise, demand for bullion tends to increase. ") * 6
+    return {
+        "topic": "Gold market basics",
+        "steps": [
+            {"step": i + 1, "type": "quiz", "questions": [f"Question {i}.{q}: {paragraph[:120]}" for q in range(4)]}
+            if i % 4 == 3 else
+            {"step": i + 1, "type": "text", "content": paragraph}
+            for i in range(steps)
+        ],
+    }
+
+
+def cpu_per_call(fn: Callable[[], Any], iterations: int) -> float:
+    """Microseconds of CPU time per call"""
+    for _ in range(min(100, iterations)):
+        fn()
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+async def end_to_end(lesson: Dict[str, Any], requests: int) -> float:
+    """CPU microseconds per cached request through the whole app"""
+    import httpx
+    from app.main import app
+    from app.services.content_service import content_service
+    from app.utils.cache import make_cache_key
+
+    payload = {"action": "generate_lesson", "topic": lesson["topic"]}
+    content_service.cache.set(make_cache_key(payload), content_service.render("generate_lesson", lesson))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(50):
+            await client.post("/api/generate/lesson-content", json={"topic": lesson["topic"]})
+        start = time.process_time()
+        for _ in range(requests):
+            response = await client.post("/api/generate/lesson-content", json={"topic": lesson["topic"]})
+            response.raise_for_status()
+        return (time.process_time() - start) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure response serialization CPU per request")
+    parser.add_argument("--steps", type=int, default=12, help="Lesson steps (12 is about 8 KB)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Requests for the end-to-end run")
+    args = parser.parse_args()
+
+    from app.api.lesson_routes import router
+    from app.services.content_service import ContentService
+    from app.utils.serialization import FastJSONResponse, RawJSONResponse, orjson
+
+    lesson = make_lesson(args.steps)
+    field = next(r for r in router.routes if r.path.endswith("/lesson-content")).response_field
+    body = ContentService.render("generate_lesson", lesson)
+
+    def validated(response_class):
+        def run():
+            content = asyncio.run(serialize_response(field=field, response_content=lesson))
+            return response_class(content).body
+        return run
+
+    # asyncio.run() overhead is not part of either path; measure and subtract it
+    async def noop():
+        return None
+    loop_overhead = cpu_per_call(lambda: asyncio.run(noop()), args.iterations)
+
+    results = {
+        "validated_stdlib": cpu_per_call(validated(JSONResponse), args.iterations) - loop_overhead,
+        "validated_fast": cpu_per_call(validated(FastJSONResponse), args.iterations) - loop_overhead,
+        "preserialized": cpu_per_call(lambda: RawJSONResponse(body).body, args.iterations),
+    }
+    report = {
+        "body_bytes": len(body),
+        "orjson": orjson is not None,
+        "serialize_us": {name: round(us, 2) for name, us in results.items()},
+        "saved_us_per_request": round(results["validated_stdlib"] - results["preserialized"], 2),
+        "end_to_end_us": round(asyncio.run(end_to_end(lesson, args.requests)), 2),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
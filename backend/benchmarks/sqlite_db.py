@@ -0,0 +1,327 @@
+# benchmarks/sqlite_db.py
+"""SQLite stand-in for the MySQL-backed DatabaseManager.
+
+Translates the MySQL dialect used by the services (``%s`` placeholders,
+``INSERT IGNORE``, ``ON DUPLICATE KEY UPDATE ... VALUES(col)``) to SQLite
+and exposes the same pool interface, so ProgressService runs unchanged
+against a local file.
+"""
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+from mysql.connector import IntegrityError
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=" "))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    first_name TEXT,
+    last_name TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS lesson_plans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    module TEXT NOT NULL,
+    duration TEXT NOT NULL,
+    plan_data TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_plans_module ON lesson_plans (module);
+CREATE TABLE IF NOT EXISTS user_progress (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    module TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    topic TEXT NOT NULL,
+    lesson_completed BOOLEAN DEFAULT 0,
+    quiz_score INTEGER DEFAULT NULL,
+    time_spent INTEGER DEFAULT NULL,
+    completed_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, module, week, day)
+);
+CREATE INDEX IF NOT EXISTS idx_user_week_day ON user_progress (user_id, week, day);
+CREATE TABLE IF NOT EXISTS lesson_content (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_content_topic ON lesson_content (topic);
+CREATE TABLE IF NOT EXISTS chart_tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    tasks TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_chart_topic ON chart_tasks (topic);
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    module TEXT NOT NULL,
+    assessment_data TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_module ON assessments (module);
+CREATE TABLE IF NOT EXISTS content_versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    content_key TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (kind, content_key, content_hash),
+    UNIQUE (kind, content_key, version)
+);
+CREATE TABLE IF NOT EXISTS content_latest (
+    kind TEXT NOT NULL,
+    content_key TEXT NOT NULL,
+    content_id INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (kind, content_key)
+);
+CREATE TABLE IF NOT EXISTS quiz_responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    topic TEXT NOT NULL,
+    assessment_id INTEGER,
+    question_index INTEGER NOT NULL,
+    user_answer TEXT NOT NULL,
+    correct_answer TEXT NOT NULL,
+    is_correct BOOLEAN NOT NULL,
+    responded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_quiz_assessment ON quiz_responses (assessment_id);
+CREATE TABLE IF NOT EXISTS trade_evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    pair TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    stop_loss REAL NOT NULL,
+    take_profit REAL NOT NULL,
+    reason TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    risk_level TEXT NOT NULL,
+    feedback TEXT NOT NULL,
+    improvements TEXT NOT NULL,
+    evaluated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS user_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    topic TEXT NOT NULL,
+    current_step INTEGER DEFAULT 1,
+    start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    active_seconds INTEGER NOT NULL DEFAULT 0,
+    is_completed BOOLEAN DEFAULT 0,
+    UNIQUE (user_id, topic)
+);
+CREATE TABLE IF NOT EXISTS progress_day_summary (
+    module TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    lessons INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    quiz_score_total INTEGER NOT NULL DEFAULT 0,
+    quiz_score_count INTEGER NOT NULL DEFAULT 0,
+    time_spent_total INTEGER NOT NULL DEFAULT 0,
+    time_spent_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (module, week, day)
+);
+CREATE TABLE IF NOT EXISTS progress_user_summary (
+    user_id INTEGER NOT NULL,
+    module TEXT NOT NULL,
+    lessons INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    quiz_score_total INTEGER NOT NULL DEFAULT 0,
+    quiz_score_count INTEGER NOT NULL DEFAULT 0,
+    time_spent_total INTEGER NOT NULL DEFAULT 0,
+    time_spent_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, module)
+);
+CREATE INDEX IF NOT EXISTS idx_module_user ON progress_user_summary (module, user_id);
+INSERT OR IGNORE INTO users (username, email, password_hash, first_name, last_name)
+VALUES ('testuser', 'test@finalearn.com', 'dummy_hash', 'Test', 'User');
+"""
+
+CONTENT_TABLES = ("content_latest", "content_versions", "lesson_plans", "lesson_content", "chart_tasks", "assessments")
+
+_REWRITES = [
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE), "INSERT OR IGNORE"),
+    (re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE), "ON CONFLICT DO UPDATE SET"),
+    (re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE), r"excluded.\1"),
+    (re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE), ""),
+]
+
+
+def translate(query: str) -> str:
+    """Rewrite a MySQL-dialect statement for SQLite"""
+    for pattern, replacement in _REWRITES:
+        query = pattern.sub(replacement, query)
+    return query
+
+
+class SQLiteCursor:
+    """mysql.connector-style cursor over sqlite3 (``dictionary=True`` supported)"""
+
+    def __init__(self, connection: sqlite3.Connection, dictionary: bool = False):
+        self._cursor = connection.cursor()
+        self._dictionary = dictionary
+
+    def execute(self, query: str, params: Sequence = ()) -> None:
+        try:
+            self._cursor.execute(translate(query), tuple(params or ()))
+        except sqlite3.IntegrityError as e:
+            raise IntegrityError(msg=str(e))
+
+    def executemany(self, query: str, rows: Sequence[Sequence]) -> None:
+        try:
+            self._cursor.executemany(translate(query), [tuple(r) for r in rows])
+        except sqlite3.IntegrityError as e:
+            raise IntegrityError(msg=str(e))
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self) -> int:
+        return self._cursor.lastrowid
+
+    def _convert(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip([d[0] for d in self._cursor.description], row))
+
+    def fetchone(self):
+        return self._convert(self._cursor.fetchone())
+
+    def fetchall(self) -> List:
+        return [self._convert(row) for row in self._cursor.fetchall()]
+
+    def close(self) -> None:
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SQLiteConnection:
+    """Connection wrapper exposing the mysql.connector methods the services use"""
+
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+
+    def cursor(self, dictionary: bool = False) -> SQLiteCursor:
+        return SQLiteCursor(self._connection, dictionary)
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._connection.in_transaction
+
+    def is_connected(self) -> bool:
+        return True
+
+    def ping(self, reconnect: bool = False) -> None:
+        pass
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class SQLitePool:
+    """Minimal connection reuse with the same stats/dispose surface as ConnectionPool"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._idle: List[SQLiteConnection] = []
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._checkouts = 0
+
+    def acquire(self) -> SQLiteConnection:
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            if self._idle:
+                return self._idle.pop()
+        return SQLiteConnection(self.path)
+
+    def release(self, connection: SQLiteConnection) -> None:
+        if connection.in_transaction:
+            connection.rollback()
+        with self._lock:
+            self._in_use -= 1
+            self._idle.append(connection)
+
+    def dispose(self) -> None:
+        with self._lock:
+            while self._idle:
+                self._idle.pop().close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_use": self._in_use, "idle": len(self._idle), "checkouts": self._checkouts}
+
+
+class SQLiteDatabaseManager:
+    """Drop-in replacement for DatabaseManager backed by a SQLite file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pool = SQLitePool(path)
+        with sqlite3.connect(path) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+
+    def get_connection(self) -> SQLiteConnection:
+        return SQLiteConnection(self.path)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.pool.stats()
+
+    def init_database(self) -> bool:
+        with sqlite3.connect(self.path) as connection:
+            connection.executescript(SCHEMA)
+        return True
+
+    def reset_content(self) -> None:
+        """Empty the generated-content tables"""
+        with sqlite3.connect(self.path) as connection:
+            for table in CONTENT_TABLES:
+                connection.execute(f"DELETE FROM {table}")
+
+    def install(self, db_manager) -> None:
+        """Redirect an existing DatabaseManager instance to this stand-in.
+
+        ``db_manager.connection()`` keeps working (and recording metrics)
+        because it only goes through ``pool.acquire``/``pool.release``.
+        """
+        db_manager.pool = self.pool
+        db_manager.get_connection = self.get_connection
+        db_manager.pool_stats = self.pool_stats
+        db_manager.init_database = self.init_database
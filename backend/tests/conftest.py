@@ -0,0 +1,15 @@
+# tests/conftest.py
+import pytest
+from benchmarks.sqlite_db import SQLiteDatabaseManager
+from app.utils.database import db_manager
+
+
+@pytest.fixture
+def stand_in_db(tmp_path, monkeypatch):
+    """Point the global db_manager at a fresh SQLite file for one test"""
+    stand_in = SQLiteDatabaseManager(str(tmp_path / "db.sqlite3"))
+    stand_in.init_database()
+    # Same attributes SQLiteDatabaseManager.install replaces, restored afterwards
+    for name in ("pool", "get_connection", "pool_stats", "init_database"):
+        monkeypatch.setattr(db_manager, name, getattr(stand_in, name))
+    return stand_in
@@ -0,0 +1,59 @@
+# tests/test_content_versions.py
+import sqlite3
+from mysql.connector import Error, errorcode
+from app.services.progress_service import progress_service
+
+
+def versions(stand_in_db, key):
+    connection = sqlite3.connect(stand_in_db.path)
+    stored = connection.execute(
+        "SELECT version FROM content_versions WHERE kind = 'lesson_content' AND content_key = ? ORDER BY version",
+        (key,)
+    ).fetchall()
+    latest = connection.execute(
+        "SELECT version FROM content_latest WHERE kind = 'lesson_content' AND content_key = ?", (key,)
+    ).fetchone()
+    return [version for version, in stored], latest[0] if latest else None
+
+
+def test_new_content_takes_the_next_version(stand_in_db):
+    assert progress_service.save_lesson_content("Gold Basics", {"steps": [1]})
+    assert progress_service.save_lesson_content("gold basics ", {"steps": [2]})
+    assert versions(stand_in_db, "gold basics") == ([1, 2], 2)
+    assert progress_service.get_lesson_content("Gold Basics") == {"steps": [2]}
+
+
+def test_identical_content_only_moves_the_pointer(stand_in_db):
+    progress_service.save_lesson_content("Gold", {"steps": [1]})
+    progress_service.save_lesson_content("Gold", {"steps": [2]})
+    # The same body given as JSON text hashes the same
+    progress_service.save_content_rows("lesson_content", [("Gold", '{"steps": [1]}')])
+    assert versions(stand_in_db, "gold") == ([1, 2], 1)
+    assert progress_service.get_lesson_content("Gold") == {"steps": [1]}
+
+
+def test_batch_keeps_one_version_per_distinct_body(stand_in_db):
+    saved = progress_service.save_content_rows("lesson_content", [
+        ("Silver", {"steps": [1]}), ("Copper", {"steps": [1]}), ("Silver", {"steps": [2]}), ("Silver", {"steps": [1]}),
+    ])
+    assert saved == 4
+    assert versions(stand_in_db, "silver") == ([1, 2], 1)
+    assert versions(stand_in_db, "copper") == ([1], 1)
+
+
+def test_lock_errors_retry_the_batch(stand_in_db, monkeypatch):
+    store = progress_service._store_content_version
+    errors = [errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT]
+
+    def flaky(*args):
+        if errors:
+            raise Error(msg="lock", errno=errors.pop(0))
+        return store(*args)
+
+    monkeypatch.setattr(progress_service, "_store_content_version", flaky)
+    assert progress_service.save_content_rows("lesson_content", [("Gold", {"steps": [1]})]) == 1
+    assert versions(stand_in_db, "gold") == ([1], 1)
+
+    errors[:] = [errorcode.ER_DUP_ENTRY]
+    assert progress_service.save_content_rows("lesson_content", [("Gold", {"steps": [2]})]) == 0
+    assert versions(stand_in_db, "gold") == ([1], 1)
@@ -0,0 +1,63 @@
+# tests/test_json_repair.py
+import asyncio
+import pytest
+from app.services.ai_service import ai_service
+from app.utils.json_repair import JSONExtractionError, extract_json
+
+PAYLOAD = {"action": "chart_tasks", "topic": "Gold"}
+
+
+@pytest.mark.parametrize("text, value, status", [
+    ('{"a": 1}', {"a": 1}, "clean"),
+    ('```json\n{"a": 1}\n```', {"a": 1}, "extracted"),
+    ('Here you go: [1, 2] Enjoy!', [1, 2], "extracted"),
+    ('Note [see below]: {"a": [1, 2]} thanks', {"a": [1, 2]}, "extracted"),
+    ('{"a": [1, 2], "b": "cut', {"a": [1, 2]}, "repaired"),
+    ('Note [see below]: {"a": 1, "b": {"c": 2', {"a": 1, "b": {}}, "repaired"),
+])
+def test_extract_json(text, value, status):
+    assert extract_json(text) == (value, status)
+
+
+@pytest.mark.parametrize("text, truncated", [
+    ("no JSON here", False),
+    ("only [prose in brackets] here", False),
+    ('{"a": 1,, "b": 2}', False),
+])
+def test_extract_json_failures(text, truncated):
+    with pytest.raises(JSONExtractionError) as error:
+        extract_json(text)
+    assert error.value.truncated is truncated
+
+
+def test_cut_off_output_is_continued(monkeypatch):
+    requests = []
+
+    async def continue_output(payload, partial):
+        requests.append(partial)
+        return '```\n", "Mark the high"]}\n```'
+
+    monkeypatch.setattr(ai_service, "_continue_output", continue_output)
+    result, complete = asyncio.run(ai_service.finish_output(PAYLOAD, '{"chart_tasks": ["Open XAUUSD'))
+    assert result == {"chart_tasks": ["Open XAUUSD", "Mark the high"]}
+    assert complete
+    assert requests == ['{"chart_tasks": ["Open XAUUSD']
+
+
+def test_failed_continuation_returns_the_closed_off_output(monkeypatch):
+    async def continue_output(payload, partial):
+        raise ConnectionError("stream dropped")
+
+    monkeypatch.setattr(ai_service, "_continue_output", continue_output)
+    result, complete = asyncio.run(ai_service.finish_output(PAYLOAD, '{"chart_tasks": ["Open XAUUSD", "Mark'))
+    assert result == {"chart_tasks": ["Open XAUUSD"]}
+    assert not complete
+
+
+def test_malformed_output_is_not_continued(monkeypatch):
+    async def continue_output(payload, partial):
+        raise AssertionError("should not be called")
+
+    monkeypatch.setattr(ai_service, "_continue_output", continue_output)
+    with pytest.raises(JSONExtractionError):
+        asyncio.run(ai_service.finish_output(PAYLOAD, '{"chart_tasks": ["a"],, }'))
@@ -0,0 +1,22 @@
+# tests/test_pregenerate.py
+import asyncio
+from app.cli.pregenerate import Pregenerator, build_jobs
+from app.services.progress_service import progress_service
+
+
+def test_reused_topics_are_counted_and_stored(stand_in_db):
+    lesson = {"topic": "Gold market basics", "steps": [{"step": 1, "type": "concept", "content": "Gold"}]}
+    progress_service.save_lesson_content("Gold market basics", lesson)
+    progress_service.save_chart_tasks("Gold market basics", {"chart_tasks": ["Open XAUUSD"]})
+
+    plan = {
+        "module": "Metals",
+        "plan_data": {"weeks": [{"days": [{"day": 1, "topic": "Basics of the gold market"}]}]},
+    }
+    jobs = build_jobs([plan], include_assessments=False)
+    summary = asyncio.run(Pregenerator(max_retries=0).run(jobs))
+
+    assert summary["similar"] == 2
+    assert summary["failed"] == 0
+    assert progress_service.get_lesson_content("Basics of the gold market") == lesson
+    assert progress_service.get_chart_tasks("Basics of the gold market") == {"chart_tasks": ["Open XAUUSD"]}
@@ -0,0 +1,75 @@
+# tests/test_progress_summary.py
+import sqlite3
+from app.models.schemas import UserProgressRequest
+from app.services.analytics_service import analytics_service
+from app.services.progress_service import progress_key, progress_service
+from app.utils.progress_summary import summary_deltas
+
+
+def record(user_id="1", module="Gold", week=1, day=1, completed=False, quiz_score=None, time_spent=None):
+    return UserProgressRequest(
+        user_id=user_id, module=module, week=week, day=day,
+        lesson_completed=completed, quiz_score=quiz_score, time_spent=time_spent
+    )
+
+
+def summaries(stand_in_db):
+    connection = sqlite3.connect(stand_in_db.path)
+    columns = "lessons, completed, quiz_score_total, quiz_score_count, time_spent_total, time_spent_count"
+    return (
+        connection.execute(f"SELECT module, week, day, {columns} FROM progress_day_summary ORDER BY 1, 2, 3").fetchall(),
+        connection.execute(f"SELECT user_id, module, {columns} FROM progress_user_summary ORDER BY 1, 2").fetchall(),
+    )
+
+
+def test_deltas_count_the_difference_between_states():
+    days, users = summary_deltas([
+        (("1", "Gold", 1, 1), None, (True, 80, 600)),
+        (("2", "Gold", 1, 1), (False, None, 300), (True, 90, 300)),
+        (("2", "Gold", 1, 2), (True, 70, 100), (True, 70, 100)),
+    ])
+    assert days == {("Gold", 1, 1): [1, 2, 170, 2, 600, 1]}
+    assert users == {("1", "Gold"): [1, 1, 80, 1, 600, 1], ("2", "Gold"): [0, 1, 90, 1, 0, 0]}
+
+
+def test_progress_key_folds_like_the_unique_key():
+    assert progress_key("01", "Gold Basics", 1, 2) == progress_key(1, "gold basics", 1, 2)
+    assert progress_key("1", "Café", 1, 1) == progress_key("1", "cafe", 1, 1)
+    assert progress_key("1", "Gold", 1, 1) != progress_key("1", "Gold", 1, 2)
+
+
+def test_writes_keep_summaries_equal_to_a_rebuild(stand_in_db):
+    first = progress_service.update_user_progress_batch([
+        record("1", day=1, completed=True, quiz_score=80, time_spent=600),
+        record("1", day=2, time_spent=120),
+        record("2", day=1, quiz_score=40),
+    ])
+    assert (first["inserted"], first["updated"]) == (3, 0)
+
+    progress_service.update_user_progress(record("1", day=2, completed=True, quiz_score=90, time_spent=300))
+    second = progress_service.update_user_progress_batch([
+        record("2", day=1, completed=True, quiz_score=60),
+        record("2", day=1, completed=True, quiz_score=70),
+        record("1", day=1, completed=True, quiz_score=80, time_spent=600),
+    ])
+    assert {k: second[k] for k in ("inserted", "updated", "unchanged", "duplicate")} == {
+        "inserted": 0, "updated": 1, "unchanged": 1, "duplicate": 1
+    }
+
+    incremental = summaries(stand_in_db)
+    assert incremental[0] == [("Gold", 1, 1, 2, 2, 150, 2, 600, 1), ("Gold", 1, 2, 1, 1, 90, 1, 300, 1)]
+    analytics_service.rebuild()
+    assert summaries(stand_in_db) == incremental
+
+
+def test_reformatted_keys_update_the_stored_row(stand_in_db):
+    progress_service.update_user_progress_batch([record("1", completed=True, quiz_score=50)])
+
+    result = progress_service.update_user_progress_batch([record("01", completed=True, quiz_score=75)])
+    assert (result["inserted"], result["updated"]) == (0, 1)
+    progress_service.update_user_progress(record("001", completed=True, quiz_score=75, time_spent=30))
+
+    days, users = summaries(stand_in_db)
+    assert days == [("Gold", 1, 1, 1, 1, 75, 1, 30, 1)]
+    assert users == [(1, "Gold", 1, 1, 75, 1, 30, 1)]
+    assert analytics_service.get_user("1")["modules"][0]["lessons"] == 1
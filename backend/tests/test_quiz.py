@@ -0,0 +1,62 @@
+# tests/test_quiz.py
+import sqlite3
+from app.models.schemas import QuizSheet
+from app.services.progress_service import progress_service
+from app.services.quiz_service import AnswerKey, AnswerKeyIndex, quiz_service
+
+ASSESSMENT = {"module": "Metals", "assessment": {"questions": [
+    {"question": "1", "choices": ["Silver", "Gold", "Copper"], "answer": "B"},
+    {"question": "2", "choices": ["Yes", "No"], "answer": "yes"},
+    {"question": "3", "choices": ["Red", "Green"], "answer": "Green"},
+]}}
+
+
+def test_answers_match_by_text_or_letter():
+    key = AnswerKey.from_assessment(1, "Metals", ASSESSMENT)
+    correct = key.grade([
+        ["b", "A", " GREEN "],     # letters and text, case and whitespace folded
+        ["Gold", "no", None],      # wrong and unanswered questions
+        ["gold"],                  # short sheets are padded
+        ["b", "yes", "green", "extra"],
+    ])
+    assert correct.tolist() == [
+        [True, True, True],
+        [True, False, False],
+        [True, False, False],
+        [True, True, True],
+    ]
+
+
+def test_blank_answers_never_match_letterless_keys():
+    key = AnswerKey.from_assessment(1, "Metals", {"assessment": {"questions": [{"answer": "", "choices": []}]}})
+    assert key.grade([[""], [None]]).tolist() == [[False], [False]]
+
+
+def test_submit_grades_against_the_version_asked_for(stand_in_db, monkeypatch):
+    # A fresh answer key index, so keys compiled in other tests are not reused
+    monkeypatch.setattr(progress_service, "content_listeners", list(progress_service.content_listeners))
+    monkeypatch.setattr(quiz_service, "index", AnswerKeyIndex(ttl=None))
+    progress_service.save_assessment("Metals", ASSESSMENT)
+
+    first = quiz_service.submit(" metals ", [
+        QuizSheet(user_id="1", answers=["b", "yes", "red"]),
+        QuizSheet(user_id="2", answers=[]),
+    ])
+    assert [r["score"] for r in first["results"]] == [2, 0]
+    assert first["results"][0]["percent"] == 66.67
+    assert first["saved"] == 6
+
+    progress_service.save_assessment("Metals", {"module": "Metals", "assessment": {"questions": [
+        {"question": "1", "choices": ["Up", "Down"], "answer": "Down"},
+    ]}})
+    latest = quiz_service.submit("Metals", [QuizSheet(user_id="1", answers=["b"])])
+    assert latest["assessment_id"] != first["assessment_id"]
+    assert latest["questions"] == 1 and latest["results"][0]["score"] == 1
+
+    pinned = quiz_service.submit("Metals", [QuizSheet(user_id="1", answers=["b"])], first["assessment_id"])
+    assert pinned["questions"] == 3 and pinned["results"][0]["correct"] == [True, False, False]
+
+    rows = sqlite3.connect(stand_in_db.path).execute(
+        "SELECT assessment_id, COUNT(*) FROM quiz_responses GROUP BY assessment_id ORDER BY assessment_id"
+    ).fetchall()
+    assert rows == [(first["assessment_id"], 9), (latest["assessment_id"], 1)]
@@ -0,0 +1,71 @@
+# tests/test_session_tracker.py
+import asyncio
+import pytest
+from pydantic import ValidationError
+from app.models.schemas import HeartbeatRequest
+from app.services.session_tracker import SessionTracker
+
+
+class FlakyStore:
+    """flush_fn that rejects any batch containing one of ``bad_users``"""
+
+    def __init__(self, *bad_users):
+        self.bad_users = set(bad_users)
+        self.batches = []
+        self.rows = []
+
+    def __call__(self, rows):
+        self.batches.append(len(rows))
+        if any(row[0] in self.bad_users for row in rows):
+            raise ValueError("foreign key constraint fails")
+        self.rows.extend(rows)
+        return len(rows)
+
+
+def test_bad_row_does_not_block_the_batch():
+    store = FlakyStore("99")
+    tracker = SessionTracker(store, idle_timeout=30, max_attempts=3)
+    for user_id in ("1", "2", "99"):
+        tracker.record(user_id, "Gold", 1, now=0)
+        tracker.record(user_id, "Gold", 2, now=10)
+
+    assert asyncio.run(tracker.flush()) == 2
+    # One failed batch, then each row on its own
+    assert store.batches == [3, 1, 1, 1]
+    assert sorted((row[0], row[5]) for row in store.rows) == [("1", 10), ("2", 10)]
+    stats = tracker.stats()
+    assert (stats["dirty"], stats["failed_flushes"], stats["failed_rows"]) == (1, 1, 1)
+
+
+def test_failing_session_is_dropped_after_max_attempts():
+    store = FlakyStore("99")
+    tracker = SessionTracker(store, idle_timeout=30, max_attempts=2)
+    tracker.record("99", "Gold", 1, now=0)
+    tracker.record("99", "Gold", 1, now=10)
+
+    asyncio.run(tracker.flush())
+    assert tracker.stats()["dirty"] == 1
+    asyncio.run(tracker.flush())
+    stats = tracker.stats()
+    assert (stats["dirty"], stats["tracked"], stats["dropped"]) == (0, 0, 1)
+    # Single-row batches are not retried row by row
+    assert store.batches == [1, 1]
+
+
+def test_pending_time_is_kept_until_written():
+    store = FlakyStore("1")
+    tracker = SessionTracker(store, idle_timeout=30, max_attempts=5)
+    tracker.record("1", "Gold", 1, now=0)
+    tracker.record("1", "Gold", 2, now=10)
+    asyncio.run(tracker.flush())
+
+    store.bad_users.clear()
+    tracker.record("1", "Gold", 3, now=15)
+    assert asyncio.run(tracker.flush()) == 1
+    assert store.rows[0][2] == 3 and store.rows[0][5] == 15
+
+
+@pytest.mark.parametrize("user_id", ["abc", "01", "0", "1; DROP TABLE users", ""])
+def test_heartbeat_rejects_non_numeric_user_ids(user_id):
+    with pytest.raises(ValidationError):
+        HeartbeatRequest(user_id=user_id, topic="Gold", step=1)